@@ -4,8 +4,13 @@
  Python telegram menu interfaces.
  """
 from ._version import __version__, VERSION
-from .core import ButtonTypes, Button, ABCMessage
+from .broadcast import BroadcastJob
+from .core import ButtonTypes, Button, ABCMessage, PaginatedKeyboard
 from .handler import Handler
+from .i18n import Catalog
+from .manager import SessionManager
+from .polling import BacklogPolicy, PollingConfig
+from .replay import StubRequest, UpdateRecorder, UpdateReplayer
 from .session import Session
 
 __all__ = [
@@ -13,7 +18,16 @@ __all__ = [
     "VERSION",
     "Handler",
     "Session",
+    "SessionManager",
     "ButtonTypes",
     "Button",
     "ABCMessage",
+    "PaginatedKeyboard",
+    "BroadcastJob",
+    "Catalog",
+    "BacklogPolicy",
+    "PollingConfig",
+    "StubRequest",
+    "UpdateRecorder",
+    "UpdateReplayer",
 ]
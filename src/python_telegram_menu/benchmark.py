@@ -0,0 +1,383 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Simulated workload, run against a stub bot.
+"""
+
+import datetime
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Union
+
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import BaseScheduler
+from telegram import CallbackQuery, Chat, Message, Update, User
+
+from .core import ABCMessage, emoji_replace
+from .handler import Handler
+from .replay import ReplayReport, StubRequest
+from .session import Session
+
+BENCH_TOKEN = "123456:bench"
+
+
+class BenchInline(ABCMessage):
+    """
+    Inline message with a notification button.
+    """
+
+    LABEL = "details"
+
+    def __init__(self, handler: Handler) -> None:
+        super().__init__(handler, self.LABEL, inlined=True)
+        self.count = 0
+        self.add_button("Refresh", self.refresh)
+
+    def refresh(self) -> str:
+        self.count += 1
+        return f"Refreshed {self.count} times"
+
+    def update(self) -> str:
+        return f"Details, refreshed {self.count} times"
+
+
+class BenchItem(ABCMessage):
+    """
+    Sub-menu with an inline message and a back button.
+    """
+
+    def __init__(self, handler: Handler, index: int) -> None:
+        super().__init__(handler, f"item{index}")
+        self.index = index
+        self.add_button("Details", BenchInline(handler))
+        self.add_button_back()
+
+    def update(self) -> str:
+        return f"<b>Item {self.index}</b>"
+
+
+class BenchMenu(ABCMessage):
+    """
+    Start menu with keyboard_size sub-menus.
+    """
+
+    def __init__(self, handler: Handler, message_args: Any = None) -> None:
+        super().__init__(handler, "bench")
+        keyboard_size = message_args[0] if message_args else 8
+        for index in range(keyboard_size):
+            self.add_button(
+                f"Item {index}",
+                BenchItem(handler, index),
+                add_row=index % 2 == 0,
+            )
+
+    def update(self) -> str:
+        return "Benchmark menu"
+
+
+@dataclass
+class Workload:
+    """
+    Simulated users navigation.
+
+    Each chat starts the bot then, for each round, opens a sub-menu,
+    opens its inline message, presses the inline button and goes back.
+
+    Class members:
+        - chats: number of simulated users
+        - rounds: navigation rounds per user
+        - keyboard_size: number of sub-menus in the start menu
+        - latency: simulated Bot API request duration, seconds
+    """
+
+    chats: int = 50
+    rounds: int = 5
+    keyboard_size: int = 8
+    latency: float = 0.0
+
+    def session(self) -> Session:
+        """
+        Create and start session answered by a stub bot.
+        """
+        session = Session(BENCH_TOKEN, request=StubRequest(self.latency))
+        session.start(
+            BenchMenu,
+            start_message_args=[self.keyboard_size],
+            polling=False,
+            navigation_handler_class=Handler,
+        )
+        return session
+
+    @staticmethod
+    def _text(update_id: int, chat_id: int, text: str) -> Update:
+        """
+        Build user text message update.
+        """
+        chat = Chat(chat_id, "private", first_name=f"user{chat_id}")
+        message = Message(
+            update_id,
+            datetime.datetime.now(),
+            chat,
+            from_user=User(chat_id, f"user{chat_id}", False),
+            text=text,
+        )
+        return Update(update_id, message=message)
+
+    @staticmethod
+    def _callback(
+        update_id: int, chat_id: int, message_id: int, data: str
+    ) -> Update:
+        """
+        Build inline button press update.
+        """
+        chat = Chat(chat_id, "private")
+        user = User(chat_id, f"user{chat_id}", False)
+        message = Message(message_id, datetime.datetime.now(), chat)
+        query = CallbackQuery(
+            str(update_id),
+            user,
+            str(chat_id),
+            message=message,
+            data=data,
+        )
+        return Update(update_id, callback_query=query)
+
+    def updates(self, session: Session) -> Iterator[Update]:
+        """
+        Generate updates, inline tokens are read from the session.
+        """
+        update_id = 0
+        for chat_id in range(1, self.chats + 1):
+            update_id += 1
+            yield self._text(update_id, chat_id, "/start")
+        for round_index in range(self.rounds):
+            label = f"Item {round_index % self.keyboard_size}"
+            for chat_id in range(1, self.chats + 1):
+                update_id += 1
+                yield self._text(update_id, chat_id, label)
+                update_id += 1
+                yield self._text(update_id, chat_id, "Details")
+
+                handler = session.get_session(chat_id)
+                message = (
+                    handler.get_message(f"{BenchInline.LABEL}_Details")
+                    if handler is not None
+                    else None
+                )
+                if message is not None:
+                    token = handler.callback_router.register(
+                        message, message.keyboard[0][0]
+                    )
+                    update_id += 1
+                    yield self._callback(
+                        update_id, chat_id, message.message_id, token
+                    )
+                update_id += 1
+                yield self._text(update_id, chat_id, "Back")
+
+
+def run(workload: Workload, session: Session = None) -> Dict[str, Any]:
+    """
+    Dispatch workload updates one by one and measure them.
+
+    Parameters:
+        - workload: simulated navigation
+        - session: started session, created from workload if None
+
+    Returns:
+        - updates count, duration, throughput, latency percentiles in ms
+          and number of Bot API calls
+    """
+    own_session = session is None
+    if session is None:
+        session = workload.session()
+    dispatcher = session.updater.dispatcher
+    latencies = []
+    start = time.perf_counter()
+    for update in workload.updates(session):
+        begin = time.perf_counter()
+        dispatcher.process_update(update)
+        latencies.append(time.perf_counter() - begin)
+    duration = time.perf_counter() - start
+
+    calls = (
+        session.request.calls
+        if isinstance(session.request, StubRequest)
+        else []
+    )
+    if own_session:
+        session.scheduler.shutdown(wait=False)
+    percentiles = ReplayReport(latencies, calls).percentiles()
+    return {
+        "updates": len(latencies),
+        "seconds": round(duration, 3),
+        "throughput": round(len(latencies) / duration, 1) if duration else 0,
+        **{f"latency_{k}": v for k, v in percentiles.items() if k != "count"},
+        "api_calls": len(calls),
+    }
+
+
+KEYBOARD_SIZES = (4, 32)
+SESSION_COUNTS = (10, 1000)
+TOLERANCE = 0.5  # allowed slowdown ratio against baseline
+
+
+class KeyboardMessage(ABCMessage):
+    """
+    Inline message with keyboard_size emoji buttons.
+    """
+
+    def __init__(
+        self, handler: Handler, label: str, keyboard_size: int
+    ) -> None:
+        super().__init__(handler, label, inlined=True)
+        self.labels = [f":star: Option {x}" for x in range(keyboard_size)]
+        self.update()
+
+    def update(self) -> str:
+        self.keyboard = [[]]
+        for label in self.labels:
+            self.add_button(label)
+        return "Options"
+
+
+def _handler(
+    chat_id: int, scheduler: BaseScheduler, request: StubRequest
+) -> Handler:
+    """
+    Create handler answered by a stub bot.
+    """
+    return Handler(
+        BENCH_TOKEN, Chat(chat_id, "private"), scheduler, request=request
+    )
+
+
+def micro_cases(
+    keyboard_sizes: Sequence[int] = KEYBOARD_SIZES,
+    session_counts: Sequence[int] = SESSION_COUNTS,
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the hot path functions to time, by name and parameter.
+    """
+    request = StubRequest()
+    scheduler = BackgroundScheduler(timezone=pytz.utc)  # never started
+    cases: Dict[str, Callable[[], Any]] = {
+        "emoji_replace": lambda: emoji_replace(":arrow_forward: Next :star:")
+    }
+    for size in keyboard_sizes:
+        handler = _handler(1, scheduler, request)
+        message = KeyboardMessage(handler, "options", size)
+        content = message.update()
+        Handler._message_check_changes(message, content)
+        last_label = message.keyboard[-1][-1].label
+        for index in range(size):
+            handler._message_queue.append(
+                KeyboardMessage(handler, f"queued{index}", 1)
+            )
+
+        cases[f"add_button[keyboard={size}]"] = message.update
+        cases[f"gen_keyboard_content[keyboard={size}]"] = (
+            lambda x=message: x.gen_keyboard_content(inlined=True)
+        )
+        cases[f"get_button[keyboard={size}]"] = (
+            lambda x=message, y=last_label: x.get_button(y)
+        )
+        cases[f"_message_check_changes[keyboard={size}]"] = (
+            lambda x=message, y=content: Handler._message_check_changes(x, y)
+        )
+        cases[f"get_message[queue={size}]"] = (
+            lambda x=handler, y=f"queued{size - 1}": x.get_message(y)
+        )
+
+    for count in session_counts:
+        session = Session(BENCH_TOKEN, request=request)
+        session.sessions = [
+            _handler(x, scheduler, request) for x in range(count)
+        ]
+        cases[f"get_session[sessions={count}]"] = (
+            lambda x=session, y=count - 1: x.get_session(y)
+        )
+    return cases
+
+
+def measure(
+    func: Callable[[], Any], min_time: float = 0.02, repeat: int = 3
+) -> float:
+    """
+    Best time of one call, seconds.
+
+    Calls are batched until a batch lasts min_time, the best of repeat
+    batches is kept to filter out scheduling noise.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        duration = time.perf_counter() - start
+        if duration >= min_time:
+            break
+        number *= 10
+    best = duration
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def run_micro(
+    keyboard_sizes: Sequence[int] = KEYBOARD_SIZES,
+    session_counts: Sequence[int] = SESSION_COUNTS,
+    min_time: float = 0.02,
+    repeat: int = 3,
+) -> Dict[str, float]:
+    """
+    Time hot path functions.
+
+    Returns:
+        - best call duration by case name, seconds
+    """
+    return {
+        name: measure(func, min_time, repeat)
+        for name, func in micro_cases(keyboard_sizes, session_counts).items()
+    }
+
+
+def load_baseline(path: Union[str, Path]) -> Dict[str, float]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(path: Union[str, Path], results: Dict[str, float]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def check_regressions(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = TOLERANCE,
+) -> List[str]:
+    """
+    List cases slower than their baseline by more than tolerance.
+
+    Cases missing from the baseline are not checked.
+    """
+    regressions = []
+    for name, duration in results.items():
+        reference = baseline.get(name)
+        if reference is None or duration <= reference * (1 + tolerance):
+            continue
+        regressions.append(
+            f"{name}: {duration * 1e6:.2f} us, "
+            f"baseline {reference * 1e6:.2f} us "
+            f"(+{(duration / reference - 1) * 100:.0f}%)"
+        )
+    return regressions
@@ -0,0 +1,216 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Background broadcast jobs.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+import telegram
+
+if TYPE_CHECKING:
+    from .handler import Handler
+
+logger = logging.getLogger(__name__)
+
+TypeSend = Callable[["Handler"], Optional[telegram.Message]]
+
+
+class BroadcastJob:
+    """
+    Handle of a broadcast running in background.
+
+    Sessions are consumed one by one from the iterable by a bounded
+    number of worker threads, only counters are kept, so memory does
+    not grow with the number of recipients.
+
+    Class members:
+        - sent: number of messages delivered
+        - failed: number of sessions which could not be reached
+        - errors: failures count by error type
+        - total: number of sessions when the job started
+    """
+
+    def __init__(
+        self,
+        send: TypeSend,
+        sessions: Iterable["Handler"],
+        max_workers: int = 4,
+        max_rate: Optional[float] = None,
+        total: int = 0,
+        on_done: Optional[Callable[["BroadcastJob"], None]] = None,
+    ) -> None:
+        """
+        BroadcastJob object constructor.
+
+        Parameters:
+            - send: sends the broadcast content to one session
+            - sessions: recipients, iterated lazily
+            - max_workers: number of parallel sends
+            - max_rate: max messages per second, unlimited if None
+            - total: expected number of recipients, for progress
+            - on_done: called once the job is finished or cancelled
+        """
+        self._send = send
+        self._sessions = iter(sessions)
+        self._max_workers = max(1, max_workers)
+        self._interval = 1 / max_rate if max_rate else 0.0
+        self._on_done = on_done
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.errors: Dict[str, int] = Counter()
+
+        self._lock = threading.Lock()
+        self._next_send = 0.0
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._workers_running = 0
+        self._workers = [
+            threading.Thread(
+                target=self._worker, name=f"broadcast_{i}", daemon=True
+            )
+            for i in range(self._max_workers)
+        ]
+
+    def start(self) -> "BroadcastJob":
+        """
+        Start worker threads.
+        """
+        self._workers_running = len(self._workers)
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    @property
+    def done(self) -> int:
+        """
+        Number of sessions processed.
+        """
+        return self.sent + self.failed
+
+    @property
+    def progress(self) -> float:
+        """
+        Processed sessions ratio, between 0 and 1.
+        """
+        if self.finished:
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(1.0, self.done / self.total)
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def pause(self) -> None:
+        """
+        Suspend sending, sends in progress are completed.
+        """
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """
+        Resume a paused broadcast.
+        """
+        self._resumed.set()
+
+    def cancel(self) -> None:
+        """
+        Stop sending to remaining sessions.
+        """
+        self._cancelled.set()
+        self._resumed.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the broadcast is finished.
+
+        Returns:
+            - True if finished before timeout
+        """
+        return self._finished.wait(timeout)
+
+    def result(self) -> Dict[str, int]:
+        """
+        Aggregated broadcast counters.
+        """
+        with self._lock:
+            return {
+                "total": self.total,
+                "sent": self.sent,
+                "failed": self.failed,
+                **{f"error_{k}": v for k, v in self.errors.items()},
+            }
+
+    def _next_session(self) -> Optional["Handler"]:
+        """
+        Take next recipient and wait for the rate limit.
+        """
+        with self._lock:
+            session = next(self._sessions, None)
+            if session is None or not self._interval:
+                return session
+            now = time.monotonic()
+            delay = self._next_send - now
+            self._next_send = max(now, self._next_send) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+        return session
+
+    def _worker(self) -> None:
+        """
+        Send to sessions until exhausted or cancelled.
+        """
+        try:
+            while True:
+                self._resumed.wait()
+                if self._cancelled.is_set():
+                    break
+                session = self._next_session()
+                if session is None:
+                    break
+                try:
+                    message = self._send(session)
+                    error = None if message is not None else "NotSent"
+                except telegram.error.TelegramError as exc:
+                    logger.error(
+                        f"Broadcast to {session.chat_id} failed: {exc}"
+                    )
+                    error = type(exc).__name__
+                except Exception as exc:
+                    logger.exception(
+                        f"Broadcast to {session.chat_id} failed: {exc}"
+                    )
+                    error = type(exc).__name__
+                with self._lock:
+                    if error is None:
+                        self.sent += 1
+                    else:
+                        self.failed += 1
+                        self.errors[error] += 1
+        finally:
+            with self._lock:
+                self._workers_running -= 1
+                last = self._workers_running == 0
+            if last:
+                logger.info(f"Broadcast finished: {self.result()}")
+                self._finished.set()
+                if self._on_done is not None:
+                    self._on_done(self)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Message content cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    """
+    Computation in progress, waited by concurrent requests.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ContentCache:
+    """
+    TTL cache with single flight.
+
+    When several threads request the same missing key, only the first one
+    computes the value, the others wait for its result.
+
+    Class members:
+        - MAX_ENTRIES: number of keys kept, least recently used dropped
+    """
+
+    MAX_ENTRIES = 4096
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        """
+        ContentCache object constructor.
+
+        Parameters:
+            - max_entries: number of keys kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, key: Hashable, compute: Callable[[], Any], ttl: float
+    ) -> Any:
+        """
+        Get cached value, compute it if missing or expired.
+
+        Parameters:
+            - key: cache key
+            - compute: returns the value to cache
+            - ttl: value lifetime in seconds
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._entries[key] = (
+                        time.monotonic() + ttl,
+                        flight.value,
+                    )
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                del self._flights[key]
+            flight.event.set()
+        return flight.value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop key, or all keys if None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+content_cache = ContentCache()  # shared by all sessions
+keyboard_cache = ContentCache()  # reply markups, by labels and locale
@@ -0,0 +1,220 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Batched deletion of expired messages.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import telegram
+from apscheduler.schedulers.base import BaseScheduler
+from telegram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+class MessageCleaner:
+    """
+    Collect message deletions per chat and flush them in batches.
+
+    Deletions are queued by the handlers and sent from a scheduler job,
+    so expiry bursts never block update handling. Each flush uses the
+    bulk 'deleteMessages' endpoint when the Bot API server supports it,
+    and falls back to one 'deleteMessage' call per message otherwise.
+
+    Class members:
+        - FLUSH_INTERVAL: delay between two flushes
+        - BATCH_SIZE: max messages deleted by a single bulk request
+        - MAX_CALLS_PER_FLUSH: outbound requests budget for one flush
+    """
+
+    FLUSH_INTERVAL = 2  # seconds
+    BATCH_SIZE = 100  # deleteMessages limit
+    MAX_CALLS_PER_FLUSH = 20
+
+    def __init__(
+        self,
+        bot: Bot,
+        scheduler: BaseScheduler,
+        job_id: str = "message_cleaner",
+    ) -> None:
+        """
+        MessageCleaner object constructor.
+
+        Parameters:
+            - bot: bot used to send delete requests
+            - scheduler: scheduler running the flush job
+            - job_id: scheduler job identifier
+        """
+        self._bot = bot
+        self.job_id = job_id
+        self._pending: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+        self._bulk_supported = True
+
+        scheduler.add_job(
+            self.flush,
+            "interval",
+            id=job_id,
+            seconds=self.FLUSH_INTERVAL,
+            replace_existing=True,
+        )
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of messages waiting for deletion.
+        """
+        with self._lock:
+            return sum(len(x) for x in self._pending.values())
+
+    def schedule(self, chat_id: int, message_id: int) -> None:
+        """
+        Queue message for deletion.
+        """
+        if message_id < 0:
+            return
+        with self._lock:
+            message_ids = self._pending.setdefault(chat_id, [])
+            if message_id not in message_ids:
+                message_ids.append(message_id)
+
+    def discard(self, chat_id: int) -> None:
+        """
+        Drop queued deletions of chat.
+        """
+        with self._lock:
+            self._pending.pop(chat_id, None)
+
+    def flush(self) -> int:
+        """
+        Send queued deletions, within the requests budget.
+
+        A transient error ends the flush, its messages are queued again
+        for the next one.
+
+        Returns:
+            - number of requests sent to telegram
+        """
+        calls = 0
+        while calls < self.MAX_CALLS_PER_FLUSH:
+            batch = self._pop_batch()
+            if batch is None:
+                break
+            chat_id, message_ids = batch
+            sent, retry = self._delete_batch(
+                chat_id, message_ids, self.MAX_CALLS_PER_FLUSH - calls
+            )
+            calls += sent
+            if retry:
+                break
+        return calls
+
+    def _pop_batch(self) -> Optional[Tuple[int, List[int]]]:
+        """
+        Take the next batch of message ids from the pending queue.
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+            chat_id = next(iter(self._pending))
+            message_ids = self._pending[chat_id]
+            size = self.BATCH_SIZE if self._bulk_supported else 1
+            batch, rest = message_ids[:size], message_ids[size:]
+            if rest:
+                # move chat at the end to share budget between chats
+                del self._pending[chat_id]
+                self._pending[chat_id] = rest
+            else:
+                del self._pending[chat_id]
+            return chat_id, batch
+
+    def _requeue(self, chat_id: int, message_ids: List[int]) -> None:
+        """
+        Queue message ids again, before the ones of the chat queued since.
+        """
+        with self._lock:
+            queued = self._pending.get(chat_id, [])
+            self._pending[chat_id] = message_ids + [
+                x for x in queued if x not in message_ids
+            ]
+
+    @staticmethod
+    def _is_transient(error: telegram.error.TelegramError) -> bool:
+        """
+        True if the request may succeed later.
+        """
+        return isinstance(
+            error, (telegram.error.NetworkError, telegram.error.RetryAfter)
+        ) and not isinstance(error, telegram.error.BadRequest)
+
+    @staticmethod
+    def _is_unsupported(error: telegram.error.TelegramError) -> bool:
+        """
+        True if the Bot API server does not know the bulk method.
+        """
+        # unknown methods are answered with 404, raised as InvalidToken
+        return isinstance(error, telegram.error.InvalidToken) or (
+            "not found" in error.message.lower()
+            and not isinstance(error, telegram.error.BadRequest)
+        )
+
+    def _delete_batch(
+        self, chat_id: int, message_ids: List[int], budget: int
+    ) -> Tuple[int, bool]:
+        """
+        Delete messages of one chat.
+
+        Parameters:
+            - chat_id: chat of the messages
+            - message_ids: messages to delete
+            - budget: requests allowed
+
+        Returns:
+            - number of requests sent to telegram, retry later
+        """
+        if self._bulk_supported and len(message_ids) > 1:
+            try:
+                self._bot.request.post(
+                    f"{self._bot.base_url}/deleteMessages",
+                    {"chat_id": chat_id, "message_ids": message_ids},
+                )
+                return 1, False
+            except telegram.error.BadRequest as error:
+                logger.error(f"Failed bulk delete in {chat_id}: {error}")
+                return 1, False
+            except telegram.error.TelegramError as error:
+                if not self._is_unsupported(error):
+                    logger.warning(f"Bulk delete in {chat_id} failed: {error}")
+                    if self._is_transient(error):
+                        self._requeue(chat_id, message_ids)
+                        return 1, True
+                    return 1, False
+                logger.warning(
+                    f"Bulk delete unavailable ({error}), "
+                    f"falling back to single deletions"
+                )
+                self._bulk_supported = False
+
+        # the failed bulk request counts in the budget
+        calls = 0 if self._bulk_supported or len(message_ids) < 2 else 1
+        for index, message_id in enumerate(message_ids):
+            if calls >= budget:
+                self._requeue(chat_id, message_ids[index:])
+                break
+            calls += 1
+            try:
+                self._bot.delete_message(
+                    chat_id=chat_id, message_id=message_id
+                )
+            except telegram.error.BadRequest:
+                logger.debug(f"Message {message_id} already deleted")
+            except telegram.error.TelegramError as error:
+                logger.warning(f"Delete in {chat_id} failed: {error}")
+                if self._is_transient(error):
+                    self._requeue(chat_id, message_ids[index:])
+                    return calls, True
+        return calls, False
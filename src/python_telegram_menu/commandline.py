@@ -1,4 +1,10 @@
+import cProfile
+import io
+import json
 import logging
+import pstats
+import tracemalloc
+
 import click
 
 from ._version import __version__
@@ -6,8 +12,160 @@ from ._version import __version__
 logging.basicConfig()
 log = logging.getLogger(__name__)
 
+PROFILED_MODULES = r"python_telegram_menu[/\\](core|handler|session)\.py"
+
+
+def workload_options(func):
+    """
+    Add simulated workload options to command.
+    """
+    options = [
+        click.option("--chats", default=50, help="Simulated users."),
+        click.option("--rounds", default=5, help="Navigation rounds."),
+        click.option("--keyboard-size", default=8, help="Start menu size."),
+        click.option(
+            "--latency", default=0.0, help="Stub Bot API delay, seconds."
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def echo_table(rows: dict, as_json: bool) -> None:
+    """
+    Print metrics as a two columns table or as JSON.
+    """
+    if as_json:
+        click.echo(json.dumps(rows))
+        return
+    width = max(len(x) for x in rows)
+    for key, value in rows.items():
+        click.echo(f"{key:<{width}}  {value}")
+
 
 @click.group(context_settings=dict(help_option_names=["-h", "--help"]))
 @click.version_option(version=__version__)
 def python_telegram_menu():
     pass
+
+
+@python_telegram_menu.command()
+@workload_options
+@click.option("--json", "as_json", is_flag=True, help="Print JSON.")
+@click.option("--micro", is_flag=True, help="Time hot path functions.")
+@click.option("--baseline", default=None, help="Micro baseline JSON file.")
+@click.option("--save-baseline", is_flag=True, help="Overwrite baseline.")
+@click.option("--tolerance", default=0.5, help="Allowed slowdown ratio.")
+def bench(
+    chats,
+    rounds,
+    keyboard_size,
+    latency,
+    as_json,
+    micro,
+    baseline,
+    save_baseline,
+    tolerance,
+):
+    """
+    Run simulated navigation against a stub bot, print throughput.
+
+    With --micro, time hot path functions instead and compare them to
+    the baseline file, exit with an error on regression.
+    """
+    from . import benchmark
+
+    if save_baseline and baseline is None:
+        raise click.UsageError("--save-baseline requires --baseline.")
+    if not micro:
+        workload = benchmark.Workload(chats, rounds, keyboard_size, latency)
+        echo_table(benchmark.run(workload), as_json)
+        return
+
+    results = benchmark.run_micro()
+    echo_table(
+        {k: v if as_json else f"{v * 1e6:.2f} us" for k, v in results.items()},
+        as_json,
+    )
+    if baseline is None:
+        return
+    if save_baseline:
+        benchmark.save_baseline(baseline, results)
+        return
+    regressions = benchmark.check_regressions(
+        results, benchmark.load_baseline(baseline), tolerance
+    )
+    if regressions:
+        raise click.ClickException("Regressions:\n" + "\n".join(regressions))
+
+
+@python_telegram_menu.command()
+@workload_options
+@click.option("--top", default=20, help="Number of functions shown.")
+@click.option(
+    "--sort",
+    default="cumulative",
+    type=click.Choice(["cumulative", "tottime", "ncalls"]),
+)
+@click.option("--output", default=None, help="Save raw profile to file.")
+def profile(chats, rounds, keyboard_size, latency, top, sort, output):
+    """
+    Profile simulated navigation, print core/handler/session hot spots.
+    """
+    from .benchmark import Workload, run
+
+    workload = Workload(chats, rounds, keyboard_size, latency)
+    session = workload.session()
+    profiler = cProfile.Profile()
+    profiler.runcall(run, workload, session)
+    session.scheduler.shutdown(wait=False)
+    if output:
+        profiler.dump_stats(output)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(sort).print_stats(PROFILED_MODULES, top)
+    click.echo(stream.getvalue())
+
+
+@python_telegram_menu.command()
+@workload_options
+@click.option("--top", default=10, help="Number of allocation sites.")
+@click.option("--json", "as_json", is_flag=True, help="Print JSON.")
+def memory(chats, rounds, keyboard_size, latency, top, as_json):
+    """
+    Run simulated navigation, print memory used per session.
+    """
+    from .benchmark import Workload, run
+
+    workload = Workload(chats, rounds, keyboard_size, latency)
+    session = workload.session()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run(workload, session)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    session.scheduler.shutdown(wait=False)
+    report = session.memory_report()
+
+    package = [tracemalloc.Filter(True, "*python_telegram_menu*")]
+    sites = after.filter_traces(package).compare_to(
+        before.filter_traces(package), "lineno"
+    )
+    total = sum(x.size_diff for x in after.compare_to(before, "filename"))
+    rows = {
+        "sessions": len(session.sessions),
+        "total_kib": round(total / 1024, 1),
+        "per_session_kib": round(total / 1024 / max(1, chats), 1),
+        **{
+            f"deep_{k}_kib": round(v / 1024 / max(1, report["sampled"]), 1)
+            for k, v in report["bytes"].items()
+        },
+    }
+    for stat in sites[:top]:
+        frame = stat.traceback[0]
+        rows[f"{frame.filename}:{frame.lineno}"] = (
+            f"{round(stat.size_diff / 1024, 1)} KiB"
+        )
+    echo_table(rows, as_json)
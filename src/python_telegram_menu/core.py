@@ -8,16 +8,20 @@ Data structures and abstract interface.
 import re
 import logging
 import datetime
+import functools
 import emoji
 import telegram
 import validators
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Any, Callable, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable
+from typing import List, Optional, Sequence, Union
 from telegram import InlineKeyboardMarkup, KeyboardButton
 from telegram import ReplyKeyboardMarkup, WebAppInfo
 
+from .cache import content_cache, keyboard_cache
+
 if TYPE_CHECKING:
     from .handler import Handler
 
@@ -38,6 +42,8 @@ class ButtonTypes(Enum):
     PICTURE = auto()
     STICKER = auto()
     POLL = auto()
+    DOCUMENT = auto()
+    VIDEO = auto()
 
 
 @dataclass
@@ -51,6 +57,7 @@ class Button:
         - args: argument passed to the callback
         - notification: send notification to user
         - web_url - web application
+        - cpu_bound: run callback in a worker process, if enabled
     """
 
     def __init__(
@@ -61,6 +68,7 @@ class Button:
         args: Any = None,
         notification: bool = True,
         web_url: str = "",
+        cpu_bound: bool = False,
     ) -> None:
         """
         Button object constructor.
@@ -71,6 +79,7 @@ class Button:
         self.args = args
         self.notification = notification
         self.web_url = web_url
+        self.cpu_bound = cpu_bound
 
 
 def emoji_replace(label: str) -> str:
@@ -84,6 +93,122 @@ def emoji_replace(label: str) -> str:
     return label
 
 
+class PaginatedKeyboard:
+    """
+    Keyboard showing one page of a large buttons source.
+
+    Only the visible page is turned into buttons: sequences are sliced,
+    other iterables are consumed up to the requested page and the items
+    already read are kept to go back. Navigation buttons are added when
+    a previous or a next page exists.
+
+    Class members:
+        - PREVIOUS_LABEL: previous page button label
+        - NEXT_LABEL: next page button label
+        - page: index of the visible page
+    """
+
+    PREVIOUS_LABEL = ":arrow_backward:"
+    NEXT_LABEL = ":arrow_forward:"
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        callback: TypeCallback = None,
+        button_type: ButtonTypes = ButtonTypes.NOTIFICATION,
+        page_size: int = 10,
+        label: Callable[[Any], str] = str,
+    ) -> None:
+        """
+        PaginatedKeyboard object constructor.
+
+        Parameters:
+            - source: items, one button per item
+            - callback: method called with the item on button selection
+            - button_type: items buttons type
+            - page_size: number of items buttons per page
+            - label: returns button label of an item
+        """
+        self.callback = callback
+        self.button_type = button_type
+        self.page_size = max(1, page_size)
+        self.label = label
+        self.page = 0
+        self._sequence = source if isinstance(source, Sequence) else None
+        self._iterator = None if self._sequence is not None else iter(source)
+        self._items_read: List[Any] = []
+        self._message: Optional["ABCMessage"] = None
+
+    def _get_items(self, start: int, stop: int) -> List[Any]:
+        """
+        Get source items between start and stop indexes.
+        """
+        if self._sequence is not None:
+            return list(self._sequence[start:stop])
+        while self._iterator is not None and len(self._items_read) < stop:
+            try:
+                self._items_read.append(next(self._iterator))
+            except StopIteration:
+                self._iterator = None
+        return self._items_read[start:stop]
+
+    def render(self, message: "ABCMessage") -> None:
+        """
+        Add visible page and navigation buttons to message keyboard.
+        """
+        self._message = message
+        start = self.page * self.page_size
+        items = self._get_items(start, start + self.page_size + 1)
+        if not items and self.page:
+            self.page = 0
+            items = self._get_items(0, self.page_size + 1)
+
+        for index, item in enumerate(items[: self.page_size]):
+            # menus call their buttons callbacks without args
+            callback = (
+                self.callback
+                if message.inlined or not callable(self.callback)
+                else functools.partial(self.callback, item)
+            )
+            message.add_button(
+                self.label(item),
+                callback,
+                self.button_type,
+                args=item,
+                add_row=index == 0,
+            )
+        if self.page:
+            message.add_button(
+                self.PREVIOUS_LABEL, self.previous_page, add_row=True
+            )
+        if len(items) > self.page_size:
+            message.add_button(
+                self.NEXT_LABEL, self.next_page, add_row=not self.page
+            )
+
+    def previous_page(self) -> str:
+        """
+        Show previous page.
+        """
+        return self._turn(-1)
+
+    def next_page(self) -> str:
+        """
+        Show next page.
+        """
+        return self._turn(1)
+
+    def _turn(self, step: int) -> str:
+        """
+        Change visible page, menus are sent again with the new keyboard.
+        Inline messages are edited by the handler after the callback.
+        """
+        self.page = max(0, self.page + step)
+        if self._message is not None and not self._message.inlined:
+            self._message.handler.refresh_menu()
+        return f"Page {self.page + 1}"
+
+
 class ABCMessage(ABC):
     """
     Abstract message class.
@@ -95,9 +220,23 @@ class ABCMessage(ABC):
         - inlined: create an inlined message instead of a menu message
         - home_after: go back to home menu after executing the action
         - notification: show a notification in Telegram interface
+        - UPDATE_CACHE_TTL: reuse update() content for that many seconds,
+          no caching if None or once the message shows paginated keyboards.
+          update() is not called on cache hits, per user or shared: the
+          keyboard it builds is not rebuilt until the content expires,
+          even when the message is edited after a NOTIFICATION button.
+          Build keyboards in the constructor, or keep dynamic labels
+          only in messages without cache.
+        - UPDATE_CACHE_SHARED: share cached content between all users,
+          by message class and update_cache_key(), instead of per user
+        - KEYBOARD_CACHE_TTL: reply keyboards markups are shared between
+          users by labels and locale for that many seconds
     """
 
     EXPIRING_DELAY = 12
+    UPDATE_CACHE_TTL: Optional[float] = None
+    UPDATE_CACHE_SHARED = False
+    KEYBOARD_CACHE_TTL = 3600.0
     date_time: datetime.datetime
 
     def __init__(
@@ -130,6 +269,7 @@ class ABCMessage(ABC):
             else datetime.timedelta(minutes=self.EXPIRING_DELAY)
         )
         self._status = None
+        self._paginated = False
         self.start_message_args = args
 
     @abstractmethod
@@ -142,6 +282,34 @@ class ABCMessage(ABC):
         """
         raise NotImplementedError
 
+    def update_cache_key(self) -> Hashable:
+        """
+        Arguments identifying the content computed by update().
+        """
+        return repr(self.start_message_args)
+
+    def get_content(self) -> str:
+        """
+        Get message content, from cache if enabled.
+        """
+        if self.UPDATE_CACHE_TTL is None or self._paginated:
+            return self.update()  # pages are rendered by update()
+        key: Hashable = (
+            type(self),
+            self.update_cache_key(),
+            self.handler.catalog,  # catalogs differ between bots
+            self.handler.locale,
+        )
+        if not self.UPDATE_CACHE_SHARED:
+            key = (key, self.handler.chat_id, self.label)
+        return content_cache.get(key, self.update, self.UPDATE_CACHE_TTL)
+
+    def translate(self, text: str) -> str:
+        """
+        Text translated to the user locale, for update() contents.
+        """
+        return self.handler.translate(text)
+
     def text_input(self, text: str) -> None:
         """
         Receive text from console.
@@ -169,6 +337,19 @@ class ABCMessage(ABC):
             iter(y for x in self.keyboard for y in x if y.label == label), None
         )
 
+    def add_pages(self, pages: PaginatedKeyboard) -> None:
+        """
+        Add visible page of a paginated keyboard.
+
+        Call it from update(), so page changes are rendered. The content
+        of the message is not cached anymore.
+
+        Parameters:
+            - pages: paginated keyboard, kept by the message
+        """
+        self._paginated = True
+        pages.render(self)
+
     def add_button_back(self, **kwargs: Any) -> None:
         """
         Add a button to go back to previous menu.
@@ -198,6 +379,7 @@ class ABCMessage(ABC):
         send_notification: bool = False,
         add_row: bool = False,
         web_url: str = "",
+        cpu_bound: bool = False,
     ) -> None:
         """
         Add button to keyboard container.
@@ -210,6 +392,7 @@ class ABCMessage(ABC):
             - send_notification: send/not notification
             - add_row: add/not add new row in keyboard container
             - web_url: web url
+            - cpu_bound: callback is a picklable CPU heavy function
         """
         buttons_per_row = 2 if not self.inlined else 4
         if not isinstance(self.keyboard, list) or not self.keyboard:
@@ -224,6 +407,7 @@ class ABCMessage(ABC):
                         args,
                         send_notification,
                         web_url,
+                        cpu_bound,
                     )
                 ]
             )
@@ -236,6 +420,7 @@ class ABCMessage(ABC):
                     args,
                     send_notification,
                     web_url,
+                    cpu_bound,
                 )
             )
 
@@ -243,61 +428,101 @@ class ABCMessage(ABC):
         """
         Requested handler controller to update current message.
         """
-        return self.notification.edit_message(self)
+        return self.handler.edit_message(self)
 
     def gen_keyboard_content(
         self, inlined: Optional[bool] = None
     ) -> Union[ReplyKeyboardMarkup, InlineKeyboardMarkup]:
         """
-        Generate keyboard content.
+        Generate keyboard content, with labels in the user locale.
+
+        Reply keyboards only depend on labels, web urls, placeholder,
+        catalog and locale: their markup is built once and shared between
+        users.
+        Inline keyboards hold per chat callback tokens and are built
+        for each message.
         """
         if inlined is None:
             inlined = self.inlined
-        keyboard_buttons = []
-        button_object = (
-            telegram.InlineKeyboardButton if inlined else KeyboardButton
-        )
-
         for row in self.keyboard:
             if not self.input_field and row:
                 self.input_field = row[0].label
 
-            button_array = []
+        if not inlined:
+            key = (
+                tuple(
+                    tuple((y.label, y.web_url) for y in x)
+                    for x in self.keyboard
+                ),
+                self.input_field,
+                self.handler.catalog,  # catalogs differ between bots
+                self.handler.locale,
+            )
+            return keyboard_cache.get(
+                key, self._gen_reply_keyboard, self.KEYBOARD_CACHE_TTL
+            )
 
+        keyboard_buttons = []
+        ranks: Dict[str, int] = {}  # buttons already seen by label
+        for row in self.keyboard:
+            button_array = []
             for btn in row:
+                text = self.handler.translate(btn.label)
                 if btn.web_url and validators.url(btn.web_url):
                     button_array.append(
-                        button_object(
-                            text=btn.label,
-                            web_app=WebAppInfo(url=btn.web_url),
-                            callback_data=f"{self.label}.{btn.label}",
+                        telegram.InlineKeyboardButton(
+                            text=text, web_app=WebAppInfo(url=btn.web_url)
                         )
                     )
                 else:
+                    # short token routed by the handler, see CallbackRouter
+                    rank = ranks.get(btn.label, 0)
+                    ranks[btn.label] = rank + 1
+                    token = self.handler.callback_router.register(
+                        self, btn, rank
+                    )
                     button_array.append(
-                        button_object(
-                            text=btn.label,
-                            callback_data=f"{self.label}.{btn.label}",
+                        telegram.InlineKeyboardButton(
+                            text=text, callback_data=token
                         )
                     )
             keyboard_buttons.append(button_array)
 
-            if inlined:
-                return InlineKeyboardMarkup(
-                    inline_keyboard=keyboard_buttons, resize_keyboard=False
-                )
+        return InlineKeyboardMarkup(
+            inline_keyboard=keyboard_buttons, resize_keyboard=False
+        )
 
-            if self.input_field and self.input_field != "<disable>":
-                return ReplyKeyboardMarkup(
-                    keyboard=keyboard_buttons,
-                    resize_keyboard=True,
-                    input_field_placeholder=self.input_field,
+    def _gen_reply_keyboard(self) -> ReplyKeyboardMarkup:
+        """
+        Build reply keyboard markup.
+        """
+        translate = self.handler.translate
+        keyboard_buttons = [
+            [
+                (
+                    KeyboardButton(
+                        text=translate(btn.label),
+                        web_app=WebAppInfo(url=btn.web_url),
+                    )
+                    if btn.web_url and validators.url(btn.web_url)
+                    else KeyboardButton(text=translate(btn.label))
                 )
+                for btn in row
+            ]
+            for row in self.keyboard
+        ]
 
+        if self.input_field and self.input_field != "<disable>":
             return ReplyKeyboardMarkup(
-                keyboard=keyboard_buttons, resize_keyboard=True
+                keyboard=keyboard_buttons,
+                resize_keyboard=True,
+                input_field_placeholder=translate(self.input_field),
             )
 
+        return ReplyKeyboardMarkup(
+            keyboard=keyboard_buttons, resize_keyboard=True
+        )
+
     def init_date_time(self) -> None:
         """
         Set message initial date time.
@@ -0,0 +1,270 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Background execution of button callbacks.
+"""
+
+import heapq
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Task:
+    """
+    Callback execution state, shared by the worker and the watchdog.
+    """
+
+    def __init__(
+        self,
+        on_result: Callable[[Any], None],
+        on_timeout: Optional[Callable[[], None]],
+    ) -> None:
+        self.on_result = on_result
+        self.on_timeout = on_timeout
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def close(self) -> bool:
+        """
+        Mark task as closed, returns False if already closed.
+        """
+        with self.lock:
+            if self.closed:
+                return False
+            self.closed = True
+            return True
+
+
+class CallbackExecutor:
+    """
+    Run button callbacks on a bounded thread pool with a timeout.
+
+    Results are delivered through on_result when the callback returns
+    before its deadline. Otherwise on_timeout is called once and the
+    late result is dropped. Python threads cannot be interrupted, so a
+    callback running past its deadline keeps its worker until it ends.
+    Callbacks which timed out while queued are not run, and the queue
+    is bounded so that overload is refused instead of piling up.
+
+    Class members:
+        - MAX_WORKERS: default number of worker threads
+        - TIMEOUT: default deadline, counted from submission
+        - MAX_PENDING: default number of callbacks waiting for a worker
+    """
+
+    MAX_WORKERS = 4
+    TIMEOUT = 30.0  # seconds
+    MAX_PENDING = 100
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        timeout: float = TIMEOUT,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        """
+        CallbackExecutor object constructor.
+
+        Parameters:
+            - max_workers: number of worker threads
+            - timeout: seconds before a callback result is dropped
+            - max_pending: callbacks waiting for a worker, more are refused
+        """
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="callback"
+        )
+        self._deadlines: List[Tuple[float, int, _Task]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="callback_watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def submit(
+        self,
+        func: Callable[[], Any],
+        on_result: Callable[[Any], None],
+        on_timeout: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """
+        Schedule callback execution.
+
+        Parameters:
+            - func: callback to run
+            - on_result: receives the callback result
+            - on_timeout: called if the deadline is reached first
+            - timeout: overrides the executor timeout
+
+        Raises:
+            - RuntimeError: max_pending callbacks are already waiting
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise RuntimeError("Too many pending callbacks")
+            self._pending += 1
+        task = _Task(on_result, on_timeout)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        with self._condition:
+            heapq.heappush(
+                self._deadlines, (deadline, next(self._counter), task)
+            )
+            self._condition.notify()
+        try:
+            return self._pool.submit(self._run, func, task)
+        except RuntimeError:  # shut down
+            with self._pending_lock:
+                self._pending -= 1
+            task.close()
+            raise
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of callbacks waiting for a worker.
+        """
+        return self._pending
+
+    def _run(self, func: Callable[[], Any], task: _Task) -> None:
+        """
+        Run callback and deliver its result if still expected.
+        """
+        with self._pending_lock:
+            self._pending -= 1
+        if task.closed:
+            logger.warning("Button callback skipped, timed out while queued")
+            return
+        try:
+            result = func()
+        except Exception as error:
+            logger.error(f"Button callback failed: {error}")
+            task.close()
+            return
+        if not task.close():
+            logger.warning("Button callback result dropped after timeout")
+            return
+        try:
+            task.on_result(result)
+        except Exception as error:
+            logger.error(f"Button callback result not sent: {error}")
+
+    def _watch(self) -> None:
+        """
+        Fire timeouts of callbacks which passed their deadline.
+        """
+        while True:
+            with self._condition:
+                while not self._deadlines:
+                    self._condition.wait()
+                deadline, _, task = self._deadlines[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._deadlines)
+            if task.close() and task.on_timeout is not None:
+                try:
+                    task.on_timeout()
+                except Exception as error:
+                    logger.error(f"Timeout notification failed: {error}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting callbacks.
+        """
+        self._pool.shutdown(wait=wait)
+
+
+class ProcessOffloader:
+    """
+    Run CPU bound button callbacks in worker processes.
+
+    Such callbacks do not hold the GIL of the bot process, so other chats
+    keep being served while a chart renders. They are pickled to the
+    workers: use module level functions taking the button args and
+    returning picture bytes or a file path, not message methods.
+
+    Class members:
+        - MAX_WORKERS: default number of worker processes
+        - PER_CHAT_LIMIT: default number of running callbacks per chat
+    """
+
+    MAX_WORKERS = 2
+    PER_CHAT_LIMIT = 1
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        per_chat_limit: int = PER_CHAT_LIMIT,
+    ) -> None:
+        """
+        ProcessOffloader object constructor.
+
+        Parameters:
+            - max_workers: number of worker processes
+            - per_chat_limit: running callbacks allowed for one chat
+        """
+        self.per_chat_limit = per_chat_limit
+        # spawn: forking a process running threads is not safe
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._running: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def busy(self, chat_id: int) -> bool:
+        """
+        True if the chat reached its running callbacks limit.
+        """
+        with self._lock:
+            return self._running.get(chat_id, 0) >= self.per_chat_limit
+
+    def run(
+        self, chat_id: int, func: Callable[..., Any], args: Any = None
+    ) -> Any:
+        """
+        Run callback in a worker process and wait for its result.
+
+        Parameters:
+            - chat_id: chat requesting the callback
+            - func: picklable callback
+            - args: callback argument, if not None
+
+        Raises:
+            - RuntimeError: chat running callbacks limit reached
+        """
+        with self._lock:
+            running = self._running.get(chat_id, 0)
+            if running >= self.per_chat_limit:
+                raise RuntimeError(f"Chat {chat_id} callbacks limit reached")
+            self._running[chat_id] = running + 1
+        try:
+            if args is not None:
+                return self._pool.submit(func, args).result()
+            return self._pool.submit(func).result()
+        finally:
+            with self._lock:
+                self._running[chat_id] -= 1
+                if not self._running[chat_id]:
+                    del self._running[chat_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop worker processes.
+        """
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Guards applied to updates before session handlers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, ChatMigrated, NetworkError
+from telegram.error import TelegramError, Unauthorized
+from telegram.update import Update
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateDeduplicator:
+    """
+    Remember recently processed update ids.
+
+    Ids are kept in a ring buffer mirrored by a set: membership checks
+    are O(1) and memory is bounded by CAPACITY.
+
+    Memory is empty after a restart: with a state file, the highest
+    processed id is saved by save() and reloaded, polling resumes after
+    it so that processed updates are not delivered again. Updates
+    processed after the last save are processed again after a crash.
+    Telegram picks update ids at random after a week without updates,
+    so a state older than STATE_TTL is ignored.
+
+    Class members:
+        - CAPACITY: number of update ids remembered
+        - STATE_TTL: age of the state file after which it is ignored
+        - duplicates: number of duplicated updates detected
+        - last_id: highest processed update id, 0 if none
+    """
+
+    CAPACITY = 10000
+    STATE_TTL = 7 * 24 * 3600  # seconds
+
+    def __init__(
+        self, capacity: int = CAPACITY, state_path: Optional[str] = None
+    ) -> None:
+        """
+        UpdateDeduplicator object constructor.
+
+        Parameters:
+            - capacity: number of update ids remembered
+            - state_path: file keeping the last processed update id
+        """
+        self._order: Deque[int] = deque()
+        self._ids: Set[int] = set()
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self.duplicates = 0
+        self.state_path = state_path
+        self.last_id = self._load()
+        self._saved_id = self.last_id
+
+    def _load(self) -> int:
+        """
+        Read last processed update id from state file, 0 if expired.
+        """
+        if self.state_path is None:
+            return 0
+        try:
+            age = time.time() - os.path.getmtime(self.state_path)
+            if age > self.STATE_TTL:
+                logger.info(f"Update state {self.state_path} expired")
+                return 0
+            with open(self.state_path, encoding="utf-8") as state:
+                return int(state.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as error:
+            logger.error(f"Update state {self.state_path} not read: {error}")
+            return 0
+
+    def save(self) -> None:
+        """
+        Write last processed update id to state file, if changed.
+        """
+        last_id = self.last_id
+        if self.state_path is None or last_id == self._saved_id:
+            return
+        temporary = f"{self.state_path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as state:
+                state.write(str(last_id))
+            os.replace(temporary, self.state_path)
+        except OSError as error:
+            logger.error(f"Update state {self.state_path} not saved: {error}")
+            return
+        self._saved_id = last_id
+
+    def is_duplicate(self, update_id: int) -> bool:
+        """
+        Check update id and remember it.
+
+        Returns:
+            - True if update id was already seen
+        """
+        with self._lock:
+            if update_id in self._ids:
+                self.duplicates += 1
+                return True
+            self.last_id = max(self.last_id, update_id)
+            self._ids.add(update_id)
+            self._order.append(update_id)
+            if len(self._order) > self._capacity:
+                self._ids.discard(self._order.popleft())
+            return False
+
+
+class ChatUnreachable(TelegramError):
+    """
+    Request not sent, chat is dead or its circuit is open.
+    """
+
+
+class ChatHealth:
+    """
+    Track outbound requests failures per chat.
+
+    Permanent errors (bot blocked, user deactivated, chat not found)
+    mark the chat dead at once. Other Unauthorized errors, e.g. a
+    revoked bot token, are not related to the chat and are ignored. A
+    migrated chat is reported with its new id. After FAILURE_THRESHOLD
+    consecutive transient errors the chat circuit is opened and requests
+    are refused for COOLDOWN seconds. A dead chat stays dead until it
+    sends a new update.
+
+    Class members:
+        - FAILURE_THRESHOLD: consecutive transient errors opening circuit
+        - COOLDOWN: seconds before requests are allowed again
+        - PERMANENT_ERRORS: BadRequest messages meaning chat is gone
+        - UNAUTHORIZED_ERRORS: Unauthorized messages meaning chat is gone
+    """
+
+    FAILURE_THRESHOLD = 5
+    COOLDOWN = 300.0  # seconds
+    PERMANENT_ERRORS = ("chat not found", "user not found")
+    UNAUTHORIZED_ERRORS = (
+        "bot was blocked by the user",
+        "user is deactivated",
+        "bot was kicked",
+    )
+
+    def __init__(
+        self,
+        on_dead: Optional[Callable[[int], None]] = None,
+        on_migrated: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        """
+        ChatHealth object constructor.
+
+        Parameters:
+            - on_dead: called with chat id when chat is marked dead
+            - on_migrated: called with old and new chat ids when a group
+              chat is migrated to a supergroup
+        """
+        self._on_dead = on_dead
+        self._on_migrated = on_migrated
+        self._dead: Set[int] = set()
+        self._failures: Dict[int, int] = {}
+        self._open_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.refused = 0
+
+    def is_permanent(self, error: TelegramError) -> bool:
+        """
+        True if error means the chat will never be reachable again.
+        """
+        messages: Tuple[str, ...] = ()
+        if isinstance(error, Unauthorized):
+            messages = self.UNAUTHORIZED_ERRORS
+        elif isinstance(error, BadRequest):
+            messages = self.PERMANENT_ERRORS
+        return any(x in error.message.lower() for x in messages)
+
+    def allows(self, chat_id: int) -> bool:
+        """
+        True if requests to chat can be sent.
+        """
+        if chat_id in self._dead:
+            return False
+        open_until = self._open_until.get(chat_id)
+        if open_until is None:
+            return True
+        if open_until > time.monotonic():
+            return False
+        with self._lock:
+            # half open: let next request test the chat
+            self._open_until.pop(chat_id, None)
+        return True
+
+    def record_success(self, chat_id: int) -> None:
+        """
+        Reset chat failures.
+        """
+        if chat_id in self._failures:
+            with self._lock:
+                self._failures.pop(chat_id, None)
+
+    def record_failure(self, chat_id: int, error: TelegramError) -> None:
+        """
+        Count failed request, mark chat dead or open its circuit.
+        """
+        if isinstance(error, ChatMigrated):
+            logger.info(f"Chat {chat_id} migrated to {error.new_chat_id}")
+            if self._on_migrated is not None:
+                self._on_migrated(chat_id, error.new_chat_id)
+            return
+        if self.is_permanent(error):
+            with self._lock:
+                if chat_id in self._dead:
+                    return
+                self._dead.add(chat_id)
+                self._failures.pop(chat_id, None)
+            logger.warning(f"Chat {chat_id} unreachable: {error}")
+            if self._on_dead is not None:
+                self._on_dead(chat_id)
+            return
+        if not isinstance(error, NetworkError) or isinstance(
+            error, BadRequest
+        ):
+            return  # request error, not related to chat health
+        with self._lock:
+            failures = self._failures.get(chat_id, 0) + 1
+            self._failures[chat_id] = failures
+            if failures >= self.FAILURE_THRESHOLD:
+                self._failures.pop(chat_id)
+                self._open_until[chat_id] = time.monotonic() + self.COOLDOWN
+                logger.warning(f"Chat {chat_id} circuit opened")
+
+    def revive(self, chat_id: int) -> None:
+        """
+        Forget chat state, on new update from the chat.
+        """
+        if chat_id in self._dead or chat_id in self._open_until:
+            with self._lock:
+                self._dead.discard(chat_id)
+                self._open_until.pop(chat_id, None)
+
+    def report(self) -> Dict[str, int]:
+        """
+        Chats health counters.
+        """
+        with self._lock:
+            return {
+                "dead": len(self._dead),
+                "open": len(self._open_until),
+                "failing": len(self._failures),
+                "refused": self.refused,
+            }
+
+
+class GuardedBot:
+    """
+    Bot proxy checking chat health around each request.
+
+    Requests to an unreachable chat raise ChatUnreachable without any
+    round trip to Telegram.
+    """
+
+    def __init__(self, bot: Bot, chat_id: int, health: ChatHealth) -> None:
+        """
+        GuardedBot object constructor.
+
+        Parameters:
+            - bot: bot sending requests
+            - chat_id: chat the requests are sent to
+            - health: chats health tracker
+        """
+        self._bot = bot
+        self.chat_id = chat_id
+        self._health = health
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._bot, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        def request(*args: Any, **kwargs: Any) -> Any:
+            if not self._health.allows(self.chat_id):
+                self._health.refused += 1
+                raise ChatUnreachable(f"Chat {self.chat_id} unreachable")
+            try:
+                result = attribute(*args, **kwargs)
+            except TelegramError as error:
+                self._health.record_failure(self.chat_id, error)
+                raise
+            self._health.record_success(self.chat_id)
+            return result
+
+        return request
+
+
+class AdmissionControl:
+    """
+    Shed updates when the session cannot keep up.
+
+    Updates are counted when queued by the fetcher and checked when the
+    dispatcher takes them: the updates still queued behind show the
+    load. An inline button press is shed when its chat has MAX_PER_CHAT
+    newer updates waiting, or when MAX_PENDING updates are waiting
+    overall. Navigation messages are shed only past twice these limits,
+    so they have priority over heavy callbacks.
+
+    Class members:
+        - MAX_PER_CHAT: queued updates of a chat before shedding callbacks
+        - MAX_PENDING: queued updates allowed before shedding callbacks
+        - shed: shed updates count by reason
+    """
+
+    MAX_PER_CHAT = 5
+    MAX_PENDING = 1000
+
+    def __init__(
+        self, max_per_chat: int = MAX_PER_CHAT, max_pending: int = MAX_PENDING
+    ) -> None:
+        """
+        AdmissionControl object constructor.
+
+        Parameters:
+            - max_per_chat: queued updates allowed for one chat
+            - max_pending: queued updates allowed overall
+        """
+        self.max_per_chat = max_per_chat
+        self.max_pending = max_pending
+        self._pending: Dict[int, int] = {}
+        self.pending = 0
+        self.shed: Dict[str, int] = {"chat": 0, "global": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chat_id(update: Update) -> Optional[int]:
+        chat = update.effective_chat
+        return chat.id if chat is not None else None
+
+    def enter(self, update: Update) -> None:
+        """
+        Count update put in the dispatcher queue.
+        """
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            return
+        with self._lock:
+            self._pending[chat_id] = self._pending.get(chat_id, 0) + 1
+            self.pending += 1
+
+    def leave(self, update: Update) -> Optional[str]:
+        """
+        Uncount update taken by the dispatcher and check if it is shed.
+
+        Returns:
+            - shed reason, None if update is admitted
+        """
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            return None
+        with self._lock:
+            chat_pending = self._pending.get(chat_id, 0)
+            if chat_pending:
+                chat_pending -= 1
+                self.pending -= 1
+                if chat_pending:
+                    self._pending[chat_id] = chat_pending
+                else:
+                    del self._pending[chat_id]
+
+            factor = 1 if update.callback_query is not None else 2
+            reason = None
+            if chat_pending >= self.max_per_chat * factor:
+                reason = "chat"
+            elif self.pending >= self.max_pending * factor:
+                reason = "global"
+            if reason is not None:
+                self.shed[reason] += 1
+            return reason
+
+    def report(self) -> Dict[str, int]:
+        """
+        Queued and shed updates counters.
+        """
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "shed_chat": self.shed["chat"],
+                "shed_global": self.shed["global"],
+            }
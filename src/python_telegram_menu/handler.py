@@ -5,13 +5,13 @@
 Handler for telegram bot session.
 """
 
-import datetime
 import imghdr
 import logging
 import mimetypes
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import telegram.ext
 import validators
@@ -21,8 +21,16 @@ from telegram import Message, ReplyKeyboardMarkup
 from telegram.parsemode import ParseMode
 from telegram.utils.request import Request
 
-from .core import ABCMessage, ButtonTypes
-from .core import TypeCallback, emoji_replace
+from .cleanup import MessageCleaner
+from .executor import CallbackExecutor, ProcessOffloader
+from .guards import ChatHealth, GuardedBot
+from .i18n import Catalog
+from .core import ABCMessage, Button, ButtonTypes
+from .core import emoji_replace
+from .media import MediaValidationCache, TypeMedia
+from .menus import MenuGraph
+from .polls import OpenPoll, PollRegistry, TypePollCallback
+from .routing import CallbackRouter
 
 HOME_URL = "https://github.com/pyrepo-git/python_telegram_menu"
 logger = logging.getLogger(__name__)
@@ -36,9 +44,34 @@ class Handler:
     POLL_DEALING = 10  # seconds
     MESSAGE_CHECK_TIMEOUT = POLL_DEALING
     CONNECTION_POOL_SIZE = 8
+    MAX_PARALLEL_UPLOADS = 4  # local files streamed at the same time
+    UPLOAD_TIMEOUT = 30  # seconds waiting for an upload slot
+    SEND_FAILED_TEXT = "Sending failed, please retry later."
+    media_cache = MediaValidationCache()  # shared by all chats
+    CHAT_ACTION_PERIOD = 5  # seconds, displayed duration by Telegram
+    CHAT_ACTIONS = {
+        ButtonTypes.PICTURE: ChatAction.UPLOAD_PHOTO,
+        ButtonTypes.STICKER: ChatAction.UPLOAD_PHOTO,
+        ButtonTypes.VIDEO: ChatAction.UPLOAD_VIDEO,
+        ButtonTypes.DOCUMENT: ChatAction.UPLOAD_DOCUMENT,
+        ButtonTypes.MESSAGE: ChatAction.TYPING,
+    }
 
     def __init__(
-        self, tg_key: str, chat: Chat, scheduler: BaseScheduler
+        self,
+        tg_key: str,
+        chat: Chat,
+        scheduler: BaseScheduler,
+        cleaner: Optional[MessageCleaner] = None,
+        callback_executor: Optional[CallbackExecutor] = None,
+        process_offloader: Optional[ProcessOffloader] = None,
+        chat_health: Optional[ChatHealth] = None,
+        request: Optional[Request] = None,
+        menu_graph: Optional[MenuGraph] = None,
+        poll_registry: Optional[PollRegistry] = None,
+        catalog: Optional[Catalog] = None,
+        locale: str = "",
+        upload_slots: Optional[threading.BoundedSemaphore] = None,
     ) -> None:
         """
         Handler class initialization.
@@ -47,29 +80,105 @@ class Handler:
             - tg_key:
             - chat:
             - scheduler:
-        """
-        request = Request(con_pool_size=self.CONNECTION_POOL_SIZE)
+            - cleaner: shared deletion queue, created for the chat if None
+            - callback_executor: runs slow button callbacks after the
+              callback query is answered, synchronous execution if None
+            - process_offloader: runs cpu_bound button callbacks in
+              worker processes, in the handler thread if None
+            - chat_health: stops requests to unreachable chats, if set
+            - request: shared connection pool, created for the chat if None
+            - menu_graph: if set, free text matching a menu label opens it
+            - poll_registry: shared open polls, created for the chat if None
+            - catalog: labels translations, labels are not translated if None
+            - locale: user locale, see Catalog.locale
+            - upload_slots: shared local files uploads slots, created for
+              the chat with MAX_PARALLEL_UPLOADS slots if None
+        """
+        if request is None:
+            request = Request(con_pool_size=self.CONNECTION_POOL_SIZE)
         self._bot = Bot(token=tg_key, request=request)
-        self._poll: Optional[Message] = None
-        self._poll_callback: Optional[TypeCallback] = None
+        if chat_health is not None:
+            self._bot = GuardedBot(self._bot, chat.id, chat_health)
         self.scheduler = scheduler
         self.chat_id = chat.id
         self.user_name = chat.first_name
-        self.poll_name = f"poll_{self.user_name}"
+        # jobs of several bots may share the scheduler, token starts
+        # with the bot id
+        bot_id = tg_key.split(":", 1)[0]
+        self.polls_job_name = f"polls_{bot_id}_{self.chat_id}"
+        self.expiry_job_name = f"state_nav_update_{bot_id}_{self.chat_id}"
+        self.cleaner_job_name = f"cleaner_{bot_id}_{self.chat_id}"
 
         logger.info(f"Opening chat with user {self.user_name}")
 
         self._menu_queue: List[ABCMessage] = []  # user selected menus
         self._message_queue: List[ABCMessage] = []  # app messages sent
+        self.callback_router = CallbackRouter()  # inline buttons tokens
+        self.callback_executor = callback_executor
+        self.process_offloader = process_offloader
+        self._chat_actions: Dict[str, float] = {}  # action end time
+        self.menu_graph = menu_graph
+        self.catalog = catalog
+        self.locale = locale or (catalog.default_locale if catalog else "")
+        self.upload_slots = (
+            upload_slots
+            if upload_slots is not None
+            else threading.BoundedSemaphore(self.MAX_PARALLEL_UPLOADS)
+        )
+
+        self.cleaner = (
+            cleaner
+            if cleaner is not None
+            else MessageCleaner(
+                self._bot, scheduler, job_id=self.cleaner_job_name
+            )
+        )
+        self.polls = (
+            poll_registry
+            if poll_registry is not None
+            else PollRegistry(
+                self.cleaner, scheduler, job_id=self.polls_job_name
+            )
+        )
 
         scheduler.add_job(
             self._expiry_date_checker,
             "interval",
-            id="state_nav_update",
+            id=self.expiry_job_name,
             seconds=self.MESSAGE_CHECK_TIMEOUT,
             replace_existing=True,
         )
 
+    def close(self) -> None:
+        """
+        Stop scheduler jobs of the chat.
+        """
+        logger.info(f"Closing chat with user {self.user_name}")
+        self.polls.discard(self.chat_id)
+        for job_name in (
+            self.expiry_job_name,
+            self.polls_job_name,
+            self.cleaner_job_name,
+        ):
+            if self.scheduler.get_job(job_name) is not None:
+                self.scheduler.remove_job(job_name)
+
+    def migrate_chat(self, chat_id: int) -> None:
+        """
+        Send requests to the supergroup a group chat was migrated to.
+
+        Messages of the old chat can no longer be edited nor deleted:
+        inline messages and open polls are forgotten.
+        """
+        logger.info(f"Chat {self.chat_id} moved to {chat_id}")
+        self.polls.discard(self.chat_id)
+        for message in self._message_queue:
+            self.callback_router.forget(message)
+        self._message_queue = []
+        self.chat_id = chat_id
+        if isinstance(self._bot, GuardedBot):
+            self._bot.chat_id = chat_id
+
     @staticmethod
     def filter_unicode(string: str) -> str:
         """
@@ -78,78 +187,150 @@ class Handler:
         return string.encode("ascii", "ignore").decode("utf-8")
 
     @staticmethod
-    def _message_check_changes(message: ABCMessage, content: str) -> bool:
+    def _message_diff(message: ABCMessage, content: str) -> Tuple[bool, bool]:
+        """
+        Check which of message content and keyboard changed since last edit.
+
+        Returns:
+            - content changed, keyboard changed
+        """
+        cnt_changed = content != message.content_previous
+        kb_changed = [
+            [(y.label, y.web_url) for y in x]
+            for x in message.keyboard_previous
+        ] != [[(y.label, y.web_url) for y in x] for x in message.keyboard]
+
+        if cnt_changed:
+            message.content_previous = content
+        if kb_changed:
+            message.keyboard_previous = [x[:] for x in message.keyboard]
+        return cnt_changed, kb_changed
+
+    @classmethod
+    def _message_check_changes(cls, message: ABCMessage, content: str) -> bool:
         """
         Check is message content and keyboard has changed since last edit.
         """
-        cnt_identical = content == message.content_previous
-        kb_identical = [
-            y.label for x in message.keyboard_previous for y in x
-        ] == [y.label for x in message.keyboard for y in x]
+        return any(cls._message_diff(message, content))
 
-        if cnt_identical and kb_identical:
-            return False
+    @staticmethod
+    def _sticker_validate(sticker_path: str) -> TypeMedia:
+        """
+        Get sticker url or local file, None if path is not valid.
+        """
+        if not sticker_path.lower().endswith(".webp"):
+            return None
+        if validators.url(sticker_path):
+            return sticker_path  # todo: add check if url exist
+        if Path(sticker_path).is_file() and imghdr.what(sticker_path):
+            return Path(sticker_path)
+        return None
 
-        message.content_previous = content
-        message.keyboard_previous = message.keyboard.copy()
-        return True
+    @staticmethod
+    def _picture_validate(picture_path: str) -> TypeMedia:
+        """
+        Get picture url or local file, None if path is not valid.
+        """
+        if validators.url(picture_path):
+            # check if the url has image format
+            mimetype, _ = mimetypes.guess_type(picture_path)
+            if mimetype and mimetype.startswith("image"):
+                return picture_path
+            return None
+        if Path(picture_path).is_file() and imghdr.what(picture_path):
+            return Path(picture_path)
+        return None
+
+    @staticmethod
+    def _video_validate(video_path: str) -> TypeMedia:
+        """
+        Get video url or local file, None if path is not valid.
+        """
+        mimetype, _ = mimetypes.guess_type(video_path)
+        if mimetype is None or not mimetype.startswith("video"):
+            return None
+        if validators.url(video_path):
+            return video_path
+        if Path(video_path).is_file():
+            return Path(video_path)
+        return None
 
     @staticmethod
-    def _sticker_check_replace(sticker_path: str) -> Union[str, bytes]:
+    def _document_validate(document_path: str) -> TypeMedia:
+        """
+        Get document url or local file, None if path is not valid.
+        """
+        if validators.url(document_path):
+            return document_path
+        if Path(document_path).is_file():
+            return Path(document_path)
+        return None
+
+    @classmethod
+    def _sticker_check_replace(cls, sticker_path: str) -> Union[str, Path]:
         """
         Check correctness sticker path.
         If not replace be default.
         """
-        try:
-            if not sticker_path.lower().endswith(".webp"):
-                raise ValueError("Sticker has no .webp format")
-            if validators.url(sticker_path):
-                return sticker_path  # todo: add check if url exist
-            if Path(sticker_path).is_file() and imghdr.what(sticker_path):
-                with open(sticker_path, "rb") as file_h:
-                    return file_h.read()
-            raise ValueError("Pats is not a picture")
-        except ValueError:
+        sticker = cls.media_cache.resolve(
+            "sticker", sticker_path, cls._sticker_validate
+        )
+        if sticker is None:
             url_default = f"{HOME_URL}/resources/stats_default.webp"
             logger.error(
                 f"Picture path '{sticker_path}' not valid."
                 f"Replaced by default {url_default}"
             )
             return url_default
+        return sticker
 
-    @staticmethod
-    def _picture_check_replace(picture_path: str) -> Union[str, bytes]:
+    @classmethod
+    def _picture_check_replace(cls, picture_path: str) -> Union[str, Path]:
         """
         Check correctness picture path.
         If not replace be default.
         """
-        try:
-            if validators.url(picture_path):
-                # check if the url has image format
-                mimetype, _ = mimetypes.guess_type(picture_path)
-                if mimetype and mimetype.startswith("image"):
-                    return picture_path
-                raise ValueError("Url is not a picture")
-
-            if Path(picture_path).is_file() and imghdr.what(picture_path):
-                with open(picture_path, "rb") as file_h:
-                    return file_h.read()
-
-            raise ValueError("Url not picture path")
-
-        except ValueError:
+        picture = cls.media_cache.resolve(
+            "picture", picture_path, cls._picture_validate
+        )
+        if picture is None:
             url_default = f"{HOME_URL}/resources/stats_default.png"
             logger.error(
                 f"Picture path '{picture_path}' invalid."
                 f"Replaced by default {url_default}"
             )
             return url_default
+        return picture
+
+    @classmethod
+    def _video_check_replace(cls, video_path: str) -> TypeMedia:
+        """
+        Check correctness video path.
+        """
+        video = cls.media_cache.resolve(
+            "video", video_path, cls._video_validate
+        )
+        if video is None:
+            logger.error(f"Video path '{video_path}' invalid.")
+        return video
+
+    @classmethod
+    def _document_check_replace(cls, document_path: str) -> TypeMedia:
+        """
+        Check correctness document path.
+        """
+        document = cls.media_cache.resolve(
+            "document", document_path, cls._document_validate
+        )
+        if document is None:
+            logger.error(f"Document path '{document_path}' invalid.")
+        return document
 
     def _expiry_date_checker(self) -> None:
         """
         Check expiry message date abd delete on expired.
         """
-        for message in self._message_queue:
+        for message in self._message_queue[:]:
             if message.is_expired():
                 self._delete_queued_message(message)
 
@@ -164,18 +345,19 @@ class Handler:
 
     def _delete_queued_message(self, message: ABCMessage) -> None:
         """
-        Delete and remove message from queue.
+        Remove message from queue and schedule its deletion.
         """
         message.kill_message()
         if message in self._message_queue:
-            self.delete_message(message.message_id)
-        del message
+            self._message_queue.remove(message)
+            self.callback_router.forget(message)
+            self.cleaner.schedule(self.chat_id, message.message_id)
 
     def goto_menu(self, message: ABCMessage) -> int:
         """
         Send and add message to queue.
         """
-        content = message.update()
+        content = message.get_content()
 
         logger.info(f"Opening menu {message.label}")
 
@@ -189,6 +371,18 @@ class Handler:
         self._menu_queue.append(message)
         return mes.message_id
 
+    def refresh_menu(self) -> int:
+        """
+        Send current menu again, with its updated keyboard.
+        """
+        message = self._menu_queue[-1]
+        content = message.get_content()
+        keyboard = message.gen_keyboard_content(inlined=False)
+        mes = self.send_message(
+            emoji_replace(content), keyboard, notification=message.notification
+        )
+        return mes.message_id
+
     def goto_home(self) -> int:
         """
         Returns to home menu.
@@ -208,7 +402,7 @@ class Handler:
         """
         Send app message.
         """
-        content = emoji_replace(message.update())
+        content = emoji_replace(message.get_content())
 
         info = self.filter_unicode(f"Send message '{message.label}':'{label}'")
         logger.info(str(info))
@@ -218,7 +412,7 @@ class Handler:
 
         exist = self.get_message(message.label)
         if exist is not None:
-            self._delete_queued_message(message)
+            self._delete_queued_message(exist)
 
         message.init_date_time()
         keyboard = message.gen_keyboard_content(inlined=True)
@@ -227,7 +421,7 @@ class Handler:
         self._message_queue.append(message)
 
         message.content_previous = content
-        message.keyboard_previous = message.keyboard.copy()
+        message.keyboard_previous = [x[:] for x in message.keyboard]
         return message.message_id
 
     def send_message(
@@ -257,30 +451,56 @@ class Handler:
         if mes is None:
             return False
 
-        content = emoji_replace(mes.update())
-        if not self._message_check_changes(mes, content):
+        content = emoji_replace(mes.get_content())
+        cnt_changed, kb_changed = self._message_diff(mes, content)
+        if not cnt_changed and not kb_changed:
             return False
 
         keyboard_format = mes.gen_keyboard_content()
 
         try:
-            self._bot.edit_message_text(
-                text=content,
-                chart_id=self.chat_id,
-                message_id=mes.message_id,
-                parse_mode=ParseMode.HTML,
-                reply_markup=keyboard_format,
-            )
+            if cnt_changed:
+                # Telegram drops the inline keyboard if markup is omitted
+                self._bot.edit_message_text(
+                    text=content,
+                    chat_id=self.chat_id,
+                    message_id=mes.message_id,
+                    parse_mode=ParseMode.HTML,
+                    reply_markup=keyboard_format,
+                )
+            else:
+                self._bot.edit_message_reply_markup(
+                    chat_id=self.chat_id,
+                    message_id=mes.message_id,
+                    reply_markup=keyboard_format,
+                )
         except telegram.error.BadRequest as error:
             logger.error(error)
             return False
         return True
 
+    def translate(self, text: str) -> str:
+        """
+        Text translated to the user locale.
+        """
+        if self.catalog is None:
+            return text
+        return self.catalog.translate(text, self.locale)
+
+    def source_label(self, text: str) -> str:
+        """
+        Source label of a translated button text.
+        """
+        if self.catalog is None:
+            return text
+        return self.catalog.source(text, self.locale)
+
     def select_menu_button(self, label: str) -> Optional[int]:
         """
         Menu button by label.
         """
         msg_id = 0
+        label = self.source_label(label)
         if label == "Back":
             if len(self._menu_queue) == 1:
                 return self._menu_queue[0].message_id  # we are already at home
@@ -308,20 +528,70 @@ class Handler:
                 return msg_id
 
         # label does not match any sub-menu
+        if self.menu_graph is not None and not self._expects_input():
+            node = self.menu_graph.route(label)
+            if node is not None:
+                return self.goto_path(node.path)
+
         # just process user input
         self.capture_user_input(label)
         return None
 
-    def capture_user_input(self, label: str) -> None:
+    def _last_message(self) -> ABCMessage:
         """
-        Process user input in last message updated.
+        Last menu or app message sent.
         """
         last_menu_message = self._menu_queue[-1]
         if self._message_queue:
             last_app_message = self._message_queue[-1]
             if last_app_message.date_time > last_menu_message.date_time:
                 last_menu_message = last_app_message
-        last_menu_message.text_input(label)
+        return last_menu_message
+
+    def _expects_input(self) -> bool:
+        """
+        True if the last message processes text input.
+        """
+        last_message = type(self._last_message())
+        return last_message.text_input is not ABCMessage.text_input
+
+    def goto_path(
+        self, path: Tuple[str, ...], root: Optional[ABCMessage] = None
+    ) -> Optional[int]:
+        """
+        Open message reached by pressing path buttons from the start menu.
+
+        Parent menus are stacked without being sent: "Back" sends them.
+
+        Parameters:
+            - path: button labels pressed from the start menu
+            - root: start menu not sent yet, first menu of the stack if None
+
+        Returns:
+            - sent message id, None if path is not found
+        """
+        chain = [root if root is not None else self._menu_queue[0]]
+        for label in path:
+            button = chain[-1].get_button(label)
+            if button is None:
+                chain[-1].get_content()  # keyboard may be built on update
+                button = chain[-1].get_button(label)
+            if button is None or not isinstance(button.callback, ABCMessage):
+                logger.warning(f"Menu path {path} not found")
+                return None
+            chain.append(button.callback)
+
+        target = chain.pop()
+        if target.inlined:
+            return self._send_app_message(target, path[-1])
+        self._menu_queue = chain
+        return self.goto_menu(target)
+
+    def capture_user_input(self, label: str) -> None:
+        """
+        Process user input in last message updated.
+        """
+        self._last_message().text_input(label)
 
     def app_message_webapp_callback(
         self, webapp_data: str, button_text: str
@@ -330,6 +600,7 @@ class Handler:
         Execute web app callback.
         """
         last_menu = self._menu_queue[-1]
+        button_text = self.source_label(button_text)
         webapp_message = next(
             iter(
                 y
@@ -346,109 +617,259 @@ class Handler:
             )
 
     def app_message_button_callback(
-        self, callback_label: str, callback_id: str
+        self, callback_data: str, callback_id: str
     ) -> None:
         """
         Execute action after message button selected.
         """
-        label_message, label_action = callback_label.split(".")
+        route = self.callback_router.resolve(callback_data)
+        if route is None:
+            logger.error(f"Button with callback data {callback_data} expired")
+            self._bot.answer_callback_query(
+                callback_id, text="Message expired"
+            )
+            return
+
+        message, bt_found = route
         log_message = self.filter_unicode(
             f"Received action request from "
-            f"'{label_message}':'{label_action}'"
+            f"'{message.label}':'{bt_found.label}'"
         )
         logger.info(log_message)
 
-        message = self.get_message(label_message)
-        if message is None:
-            logger.error(f"Message with label {label_message} not found")
-            return
-
-        bt_found = message.get_button(label_action)
-        if bt_found is None:
-            logger.error(f"Button with label {label_action} not found")
-            return
-
-        if bt_found.button_type in [ButtonTypes.PICTURE, ButtonTypes.STICKER]:
-            self._bot.send_chat_action(
-                chat_id=self.chat_id, action=ChatAction.UPLOAD_PHOTO
-            )
-        elif bt_found.button_type == ButtonTypes.MESSAGE:
-            self._bot.send_chat_action(
-                chat_id=self.chat_id, action=ChatAction.TYPING
+        if bt_found.button_type == ButtonTypes.POLL:
+            self.send_poll(
+                question=bt_found.args[0],
+                options=bt_found.args[1],
+                callback=bt_found.callback,
             )
-        elif bt_found.button_type == ButtonTypes.POLL:
-            self.send_poll(question=bt_found.args[0], options=bt_found.args[1])
-            self._poll_callback = bt_found.callback
             self._bot.answer_callback_query(
                 callback_id, text="Select an answer..."
             )
             return
 
-        if bt_found.args is not None:
-            action_status = bt_found.callback(bt_found.args)
-        else:
-            action_status = bt_found.callback()
+        if (
+            bt_found.cpu_bound
+            and self.process_offloader is not None
+            and self.process_offloader.busy(self.chat_id)
+        ):
+            self._bot.answer_callback_query(
+                callback_id, text="Still working on previous request..."
+            )
+            return
+
+        self.send_chat_action(bt_found.button_type)
+
+        if (
+            self.callback_executor is not None
+            and bt_found.button_type != ButtonTypes.NOTIFICATION
+        ):
+            # acknowledge first, result is sent when ready
+            self._bot.answer_callback_query(callback_id)
+            try:
+                self.callback_executor.submit(
+                    lambda: self._run_button_callback(bt_found),
+                    on_result=lambda x: self._on_button_result(bt_found, x),
+                    on_timeout=lambda: self._on_button_timeout(bt_found),
+                )
+            except RuntimeError as error:
+                logger.warning(f"Button '{bt_found.label}' refused: {error}")
+                self._on_button_timeout(bt_found)
+            return
+
+        action_status = self._run_button_callback(bt_found)
+        answer = self._send_button_result(bt_found, action_status)
+        self._bot.answer_callback_query(callback_id, text=answer)
+
+        if bt_found.button_type == ButtonTypes.NOTIFICATION:
+            # update expiry period and update
+            message.init_date_time()
+            self.edit_message(message)
+
+    def _run_button_callback(self, button: Button) -> Any:
+        """
+        Execute button callback with its arguments.
+        """
+        if button.cpu_bound and self.process_offloader is not None:
+            return self.process_offloader.run(
+                self.chat_id, button.callback, button.args
+            )
+        if button.args is not None:
+            return button.callback(button.args)
+        return button.callback()
 
+    def _send_button_result(self, button: Button, action_status: Any) -> str:
+        """
+        Send button callback result.
+
+        Returns:
+            - callback query answer
+        """
         # send picture if custom label found
-        if bt_found.button_type == ButtonTypes.PICTURE:
-            self.send_photo(
-                picture_path=action_status, notification=bt_found.notification
+        if button.button_type == ButtonTypes.PICTURE:
+            sent = self.send_photo(
+                picture_path=action_status, notification=button.notification
             )
-            self._bot.answer_callback_query(callback_id, text="Picture sent!")
-            return
-        if bt_found.button_type == ButtonTypes.STICKER:
-            self.send_sticker(
-                sticker_path=action_status, notification=bt_found.notification
+            return "Picture sent!" if sent else self.SEND_FAILED_TEXT
+        if button.button_type == ButtonTypes.STICKER:
+            sent = self.send_sticker(
+                sticker_path=action_status, notification=button.notification
             )
-            self._bot.answer_callback_query(callback_id, text="Sticker sent!")
-            return
-        if bt_found.button_type == ButtonTypes.MESSAGE:
-            self.send_message(
-                action_status, notification=bt_found.notification
+            return "Sticker sent!" if sent else self.SEND_FAILED_TEXT
+        if button.button_type == ButtonTypes.VIDEO:
+            sent = self.send_video(
+                video_path=action_status, notification=button.notification
             )
-            self._bot.answer_callback_query(callback_id, text="Message sent!")
-            return
-        self._bot.answer_callback_query(callback_id, text=action_status)
+            return "Video sent!" if sent else self.SEND_FAILED_TEXT
+        if button.button_type == ButtonTypes.DOCUMENT:
+            sent = self.send_document(
+                document_path=action_status, notification=button.notification
+            )
+            return "Document sent!" if sent else self.SEND_FAILED_TEXT
+        if button.button_type == ButtonTypes.MESSAGE:
+            self.send_message(action_status, notification=button.notification)
+            return "Message sent!"
+        return action_status
 
-        # update expiry period and update
-        message.init_date_time()
-        self.edit_message(message)
+    def _on_button_result(self, button: Button, action_status: Any) -> None:
+        """
+        Send result of a callback run by the executor.
 
-    def send_photo(
-        self, picture_path: str, notification: bool = True
+        The callback query is already answered, so a failed sending is
+        reported by a message.
+        """
+        answer = self._send_button_result(button, action_status)
+        if answer == self.SEND_FAILED_TEXT:
+            self.send_message(f"{button.label}: {answer}", notification=False)
+
+    def _on_button_timeout(self, button: Button) -> None:
+        """
+        Notify user that button action did not complete in time.
+        """
+        logger.error(f"Button '{button.label}' callback timed out")
+        self.send_message(
+            f"{button.label}: no result, please retry later.",
+            notification=False,
+        )
+
+    def send_chat_action(self, button_type: ButtonTypes) -> None:
+        """
+        Show activity matching button type.
+
+        An action is displayed by Telegram for CHAT_ACTION_PERIOD, so the
+        same action is not sent again before the period is over.
+        """
+        action = self.CHAT_ACTIONS.get(button_type)
+        if action is None:
+            return
+        now = time.monotonic()
+        if self._chat_actions.get(action, 0.0) > now:
+            return
+        self._chat_actions[action] = now + self.CHAT_ACTION_PERIOD
+        self._bot.send_chat_action(chat_id=self.chat_id, action=action)
+
+    def _send_media(
+        self,
+        send_method: Callable[..., telegram.Message],
+        field: str,
+        media: Union[str, bytes, Path],
+        notification: bool = True,
     ) -> Optional[telegram.Message]:
         """
-        Send picture.
+        Send media by url or by streaming a local file.
+
+        Local files are opened only for the upload duration and the
+        number of simultaneous uploads is bounded by upload_slots. A slot
+        is waited for at most UPLOAD_TIMEOUT seconds, the file is not
+        sent if none is released in time.
+
+        Returns:
+            - message sent, None if sending failed
         """
-        picture_object = self._picture_check_replace(picture_path=picture_path)
         try:
-            return self._bot.send_photo(
+            if isinstance(media, Path):
+                if not self.upload_slots.acquire(timeout=self.UPLOAD_TIMEOUT):
+                    logger.error(
+                        f"Upload of {field} {media} to {self.chat_id} "
+                        "failed, no upload slot released in time"
+                    )
+                    return None
+                try:
+                    with media.open("rb") as file_h:
+                        return send_method(
+                            chat_id=self.chat_id,
+                            disable_notification=not notification,
+                            **{field: file_h},
+                        )
+                finally:
+                    self.upload_slots.release()
+            return send_method(
                 chat_id=self.chat_id,
-                photo=picture_object,
                 disable_notification=not notification,
+                **{field: media},
             )
         except telegram.error.BadRequest as error:
-            logger.error(f"Failed send picture {picture_path}:{error}")
+            logger.error(f"Failed send {field} {media}:{error}")
 
         return None
 
+    def send_photo(
+        self, picture_path: Union[str, bytes], notification: bool = True
+    ) -> Optional[telegram.Message]:
+        """
+        Send picture from url, local file or image content.
+        """
+        picture_object = (
+            picture_path
+            if isinstance(picture_path, bytes)
+            else self._picture_check_replace(picture_path=picture_path)
+        )
+        return self._send_media(
+            self._bot.send_photo, "photo", picture_object, notification
+        )
+
     def send_sticker(
-        self, sticker_path: str, notification: bool = True
+        self, sticker_path: Union[str, bytes], notification: bool = True
     ) -> Optional[telegram.Message]:
         """
-        Send sticker.
+        Send sticker from url, local file or webp content.
         """
-        sticker_object = self._sticker_check_replace(sticker_path=sticker_path)
-        try:
-            return self._bot.send_sticker(
-                chat_id=self.chat_id,
-                sticker=sticker_object,
-                disable_notification=not notification,
-            )
-        except telegram.error.BadRequest as error:
-            logger.error(f"failed send sticker {sticker_path}:{error}")
+        sticker_object = (
+            sticker_path
+            if isinstance(sticker_path, bytes)
+            else self._sticker_check_replace(sticker_path=sticker_path)
+        )
+        return self._send_media(
+            self._bot.send_sticker, "sticker", sticker_object, notification
+        )
 
-        return None
+    def send_video(
+        self, video_path: str, notification: bool = True
+    ) -> Optional[telegram.Message]:
+        """
+        Send video.
+        """
+        video_object = self._video_check_replace(video_path=video_path)
+        if video_object is None:
+            return None
+        return self._send_media(
+            self._bot.send_video, "video", video_object, notification
+        )
+
+    def send_document(
+        self, document_path: str, notification: bool = True
+    ) -> Optional[telegram.Message]:
+        """
+        Send document.
+        """
+        document_object = self._document_check_replace(
+            document_path=document_path
+        )
+        if document_object is None:
+            return None
+        return self._send_media(
+            self._bot.send_document, "document", document_object, notification
+        )
 
     def get_message(self, label: str) -> Optional[ABCMessage]:
         """
@@ -458,73 +879,70 @@ class Handler:
             iter(x for x in self._message_queue if x.label == label), None
         )
 
-    def send_poll(self, question: str, options: List[str]) -> None:
+    def send_poll(
+        self,
+        question: str,
+        options: List[str],
+        callback: TypePollCallback = None,
+        group: Optional[str] = None,
+    ) -> Optional[Message]:
         """
         Send poll to user with questions and options.
-        """
-        if self.scheduler.get_job(self.poll_name) is not None:
-            self.poll_delete()
 
+        Polls are closed on first answer or after POLL_DEALING seconds,
+        several polls of a chat may be open at once.
+
+        Parameters:
+            - question: poll question
+            - options: answers texts
+            - callback: called with the answer text
+            - group: counts votes with other polls of the group
+
+        Returns:
+            - sent poll message
+        """
         options = [emoji_replace(x) for x in options]
-        self._poll = self._bot.send_poll(
+        message = self._bot.send_poll(
             chat_id=self.chat_id,
             question=emoji_replace(question),
             options=options,
             is_anonymous=False,
             open_period=self.POLL_DEALING,
         )
-
-        next_time = datetime.datetime.now()
-        next_time += datetime.timedelta(seconds=self.POLL_DEALING + 1)
-
-        self.scheduler.add_job(
-            self.poll_delete,
-            "date",
-            id=self.poll_name,
-            next_run_time=next_time,
-            replace_existing=True,
+        if message is None or message.poll is None:
+            return message
+        self.polls.register(
+            OpenPoll(
+                message.poll.id,
+                self.chat_id,
+                message.message_id,
+                message.poll.question,
+                options,
+                callback,
+                time.monotonic() + self.POLL_DEALING + 1,
+                group,
+            )
         )
+        return message
 
     def poll_delete(self) -> None:
         """
-        On poll timeout expired.
+        Close open polls of the chat and delete them.
         """
-        if self._poll is not None:
-            try:
-                logger.info(f"Deleting poll '{self._poll.poll.question}'")
-                self._bot.delete_message(
-                    chat_id=self.chat_id, message_id=self._poll.message_id
-                )
-            except telegram.error.BadRequest:
-                logger.error(
-                    f"Poll message {self._poll.message_id} already deleted"
-                )
+        self.polls.close(self.chat_id)
 
-    def poll_answer(self, answer_id: int) -> None:
+    def poll_answer(self, answer_id: int, poll_id: str = "") -> None:
         """
         Run when received poll message.
-        """
-        if (
-            self._poll is None
-            or self._poll_callback is None
-            or not callable(self._poll_callback)
-        ):
-            logger.error("Poll not defined")
-            return
 
-        answer_ascii = self._poll.poll.options[answer_id].text
-        answer_ascii.encode("ascii", "ignore").decode()
-
-        logger.info(
-            f"{self.user_name}'s answer to question "
-            f"'{self._poll.poll.question}' is '{answer_ascii}'"
-        )
-
-        self._poll_callback(self._poll.poll.options[answer_id].text)
-        time.sleep(1)
-        self.poll_delete()
-
-        if self.scheduler.get_job(self.poll_name) is not None:
-            self.scheduler.remove_job(self.poll_name)
-
-        self._poll = None
+        Parameters:
+            - answer_id: selected option index
+            - poll_id: answered poll, last poll sent to the chat if empty
+        """
+        if not poll_id:
+            polls = self.polls.chat_polls(self.chat_id)
+            if not polls:
+                logger.error("Poll not defined")
+                return
+            poll_id = max(polls, key=lambda x: x.message_id).poll_id
+        self.polls.answer(poll_id, [answer_id])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Translation catalog of menus labels.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Union
+
+from .core import emoji_replace
+
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    """
+    Labels translations by locale, compiled once.
+
+    Source labels are the ones given to add_button and ABCMessage: they
+    identify buttons whatever the user locale. Emoji aliases of sources
+    and translations are replaced when the catalog is compiled, so each
+    translation is a single dict lookup. Reverse tables map the texts
+    sent back by reply keyboards to their source labels, so two source
+    labels may not share a translation.
+
+    Class members:
+        - default_locale: locale of the source labels
+        - locales: supported locales
+    """
+
+    def __init__(
+        self,
+        translations: Mapping[str, Mapping[str, str]],
+        default_locale: str = "en",
+    ) -> None:
+        """
+        Catalog object constructor.
+
+        Parameters:
+            - translations: translated text by source text, by locale,
+              e.g. {"fr": {"Back": "Retour"}}
+            - default_locale: locale of the source labels
+
+        Raises:
+            - AttributeError: two source labels have the same translation
+        """
+        self.default_locale = default_locale.lower()
+        self._translations: Dict[str, Dict[str, str]] = {}
+        self._sources: Dict[str, Dict[str, str]] = {}
+        for locale, texts in translations.items():
+            compiled = {
+                emoji_replace(k): emoji_replace(v) for k, v in texts.items()
+            }
+            sources: Dict[str, str] = {}
+            for source, text in compiled.items():
+                if sources.setdefault(text, source) != source:
+                    raise AttributeError(
+                        f"Catalog {locale}: '{sources[text]}' and "
+                        f"'{source}' are both translated to '{text}'."
+                    )
+            self._sources[locale.lower()] = sources
+            # texts given to translate() may still hold emoji aliases
+            compiled.update((k, compiled[emoji_replace(k)]) for k in texts)
+            self._translations[locale.lower()] = compiled
+        self.locales = {self.default_locale, *self._translations}
+        logger.info(f"Catalog compiled, locales: {sorted(self.locales)}")
+
+    @classmethod
+    def from_directory(
+        cls, path: Union[str, Path], default_locale: str = "en"
+    ) -> "Catalog":
+        """
+        Load catalog from <locale>.json files of a directory.
+
+        Parameters:
+            - path: directory of JSON objects mapping source to translation
+            - default_locale: locale of the source labels
+        """
+        translations = {
+            x.stem: json.loads(x.read_text(encoding="utf-8"))
+            for x in sorted(Path(path).glob("*.json"))
+        }
+        return cls(translations, default_locale)
+
+    def locale(self, language_code: Optional[str]) -> str:
+        """
+        Supported locale closest to a Telegram user language code.
+
+        "pt-br" falls back to "pt", unsupported languages to the default.
+        """
+        if not language_code:
+            return self.default_locale
+        code = language_code.lower().replace("_", "-")
+        if code in self.locales:
+            return code
+        base = code.split("-", 1)[0]
+        return base if base in self.locales else self.default_locale
+
+    def translate(self, text: str, locale: str) -> str:
+        """
+        Translation of a source text, the text itself if missing.
+        """
+        return self._translations.get(locale, {}).get(text, text)
+
+    def source(self, text: str, locale: str) -> str:
+        """
+        Source of a translated text, the text itself if unknown.
+        """
+        return self._sources.get(locale, {}).get(text, text)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Host several bots in one process.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+from telegram.update import Update
+from telegram.utils.request import Request
+
+from .executor import CallbackExecutor, ProcessOffloader
+from .polling import PollingConfig
+from .session import Session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionManager:
+    """
+    Run many bot sessions over shared infrastructure.
+
+    Sessions share one scheduler, one HTTP connection pool, the button
+    callbacks pools and a fixed number of dispatch threads: each bot only
+    adds its long polling thread and its state. Updates are routed to the
+    dispatch thread owning their (bot, chat) pair, so the updates of a
+    chat are handled in order while chats are served in parallel.
+
+    Class members:
+        - DISPATCH_WORKERS: default number of dispatch threads
+        - POOL_SIZE: default connections kept, above the number of bots
+          since each long polling request holds one
+        - sessions: hosted sessions by bot id
+    """
+
+    DISPATCH_WORKERS = 4
+    POOL_SIZE = 32
+
+    def __init__(
+        self,
+        dispatch_workers: int = DISPATCH_WORKERS,
+        pool_size: int = POOL_SIZE,
+        polling_config: Optional[PollingConfig] = None,
+        callback_workers: int = 0,
+        callback_timeout: float = CallbackExecutor.TIMEOUT,
+        process_workers: int = 0,
+        process_per_chat: int = ProcessOffloader.PER_CHAT_LIMIT,
+        request: Optional[Request] = None,
+    ) -> None:
+        """
+        SessionManager object constructor.
+
+        Parameters:
+            - dispatch_workers: number of threads handling updates
+            - pool_size: HTTP connections kept by the shared pool
+            - polling_config: updates polling settings of all bots
+            - callback_workers: if > 0, shared slow callbacks threads
+            - callback_timeout: seconds before a slow callback is dropped
+            - process_workers: if > 0, shared cpu_bound callbacks processes
+            - process_per_chat: cpu_bound callbacks running for one chat
+            - request: shared connection pool, created if None
+        """
+        self.polling_config = polling_config or PollingConfig()
+        self.request = request or Request(
+            con_pool_size=pool_size,
+            read_timeout=self.polling_config.read_timeout,
+            connect_timeout=self.polling_config.connect_timeout,
+        )
+        self.scheduler = BackgroundScheduler(timezone=pytz.utc)
+        self.callback_executor = (
+            CallbackExecutor(callback_workers, callback_timeout)
+            if callback_workers > 0
+            else None
+        )
+        self.process_offloader = (
+            ProcessOffloader(process_workers, process_per_chat)
+            if process_workers > 0
+            else None
+        )
+        self.sessions: Dict[str, Session] = {}
+        self._queues: List["queue.Queue[Optional[Tuple[Session, Any]]]"] = [
+            queue.Queue() for _ in range(max(1, dispatch_workers))
+        ]
+        self._workers: List[threading.Thread] = []
+
+    def add_session(self, tg_key: str, **kwargs: Any) -> Session:
+        """
+        Create session of a bot, start it with Session.start.
+
+        Parameters:
+            - tg_key: Telegram bot API key
+            - kwargs: other Session arguments
+
+        Raises:
+            - AttributeError: bot already hosted
+        """
+        bot_id = tg_key.split(":", 1)[0]
+        if bot_id in self.sessions:
+            raise AttributeError(f"Bot {bot_id} already hosted.")
+        session = Session(
+            tg_key,
+            polling_config=self.polling_config,
+            request=self.request,
+            scheduler=self.scheduler,
+            callback_executor=self.callback_executor,
+            process_offloader=self.process_offloader,
+            **kwargs,
+        )
+        session.fetcher.route(lambda x: self.dispatch(session, x))
+        self.sessions[session.bot_id] = session
+        return session
+
+    def remove_session(self, bot_id: str) -> None:
+        """
+        Stop polling updates of a bot and drop its chat sessions.
+        """
+        session = self.sessions.pop(bot_id, None)
+        if session is None:
+            return
+        session.updater.running = False
+        for chat_session in session.sessions[:]:
+            session.drop_session(chat_session.chat_id)
+        session.schedule_memory_report(interval=None)
+        session.deduplicator.save()
+        for job_id in (
+            session.cleaner.job_id,
+            session.polls.job_id,
+            session.update_state_job,
+        ):
+            if self.scheduler.get_job(job_id) is not None:
+                self.scheduler.remove_job(job_id)
+
+    def dispatch(self, session: Session, update: Any) -> None:
+        """
+        Queue update, or polling error, for the thread owning its chat.
+        """
+        chat_id = 0
+        if isinstance(update, Update) and update.effective_chat is not None:
+            chat_id = update.effective_chat.id
+        shard = hash((session.bot_id, chat_id)) % len(self._queues)
+        self._queues[shard].put((session, update))
+
+    def _dispatch_worker(self, updates: "queue.Queue") -> None:
+        """
+        Handle queued updates until stopped.
+        """
+        while True:
+            item = updates.get()
+            try:
+                if item is None:
+                    return
+                session, update = item
+                session.updater.dispatcher.process_update(update)
+            finally:
+                updates.task_done()
+
+    def start(self) -> None:
+        """
+        Start shared scheduler and dispatch threads.
+        """
+        if not self.scheduler.running:
+            self.scheduler.start()
+        if self._workers:
+            return
+        for index, updates in enumerate(self._queues):
+            worker = threading.Thread(
+                target=self._dispatch_worker,
+                args=(updates,),
+                name=f"dispatch_{index}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Session manager started, {len(self._queues)} workers")
+
+    def join(self) -> None:
+        """
+        Block until queued updates are handled.
+        """
+        for updates in self._queues:
+            updates.join()
+
+    def stop(self) -> None:
+        """
+        Stop polling of all bots, then shared threads and pools.
+        """
+        for session in self.sessions.values():
+            session.updater.running = False
+        for updates in self._queues:
+            updates.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        if self.callback_executor is not None:
+            self.callback_executor.shutdown(wait=False)
+        if self.process_offloader is not None:
+            self.process_offloader.shutdown(wait=False)
+        logger.info("Session manager stopped")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Media paths validation cache.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+TypeMedia = Optional[Union[str, Path]]
+
+
+class _Entry(NamedTuple):
+    media: TypeMedia
+    mtime: Optional[int]
+    expiry: float
+
+
+class MediaValidationCache:
+    """
+    Remember media validation results.
+
+    Local files are revalidated only when their modification time
+    changes, urls and invalid paths are kept for URL_TTL seconds.
+
+    Class members:
+        - URL_TTL: lifetime of url and invalid path results
+        - MAX_ENTRIES: number of paths kept, least recently used dropped
+    """
+
+    URL_TTL = 300  # seconds
+    MAX_ENTRIES = 1024
+
+    def __init__(self) -> None:
+        """
+        MediaValidationCache object constructor.
+        """
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        """
+        Get file modification time, None if file not accessible.
+        """
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def resolve(
+        self,
+        kind: str,
+        path: str,
+        validate: Callable[[str], TypeMedia],
+    ) -> TypeMedia:
+        """
+        Get validated media for path.
+
+        Parameters:
+            - kind: media kind, separates validation rules
+            - path: url or local file path
+            - validate: returns url or Path if valid, None otherwise
+
+        Returns:
+            - validation result, from cache if still valid
+        """
+        key = (kind, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            if entry.mtime is not None:
+                valid = self._mtime(entry.media) == entry.mtime
+            else:
+                valid = entry.expiry > time.monotonic()
+            if valid:
+                self.hits += 1
+                return entry.media
+
+        self.misses += 1
+        media = validate(path)
+        if isinstance(media, Path):
+            entry = _Entry(media, self._mtime(media), 0.0)
+        else:
+            entry = _Entry(media, None, time.monotonic() + self.URL_TTL)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return media
+
+    def clear(self) -> None:
+        """
+        Drop all cached results.
+        """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Sessions memory accounting.
+"""
+
+import enum
+import logging
+import sys
+import threading
+import types
+from typing import TYPE_CHECKING, Any, Dict, Set, Tuple
+
+from apscheduler.schedulers.base import BaseScheduler
+from telegram import Bot
+from telegram.utils.request import Request
+
+from .cleanup import MessageCleaner
+from .core import ABCMessage
+from .executor import CallbackExecutor, ProcessOffloader
+from .guards import ChatHealth
+from .i18n import Catalog
+from .polls import PollRegistry
+
+if TYPE_CHECKING:
+    from .handler import Handler
+
+# shared between sessions or not owned by them, never walked
+SHARED_TYPES: Tuple[type, ...] = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    enum.Enum,
+    logging.Logger,
+    BaseScheduler,
+    MessageCleaner,
+    Catalog,
+    PollRegistry,
+    CallbackExecutor,
+    ProcessOffloader,
+    ChatHealth,
+    type(threading.Lock()),
+    threading.Thread,
+)
+
+
+def deep_size(
+    obj: Any, seen: Set[int], stop: Tuple[type, ...] = SHARED_TYPES
+) -> int:
+    """
+    Size of object and of the objects it references, in bytes.
+
+    Objects already in seen are not counted again, so that several calls
+    sharing seen split memory between categories without overlap.
+
+    Parameters:
+        - obj: walked object
+        - seen: ids of objects already counted, updated
+        - stop: types of objects not counted nor walked
+    """
+    size = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, stop):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item, 0)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif isinstance(item, types.MethodType):
+            pending.append(item.__self__)
+        elif not isinstance(item, (str, bytes, int, float)):
+            if hasattr(item, "__dict__"):
+                pending.append(item.__dict__)
+            for slot in getattr(type(item), "__slots__", ()):
+                if slot != "__dict__" and hasattr(item, slot):
+                    pending.append(getattr(item, slot))
+    return size
+
+
+def session_footprint(
+    handler: "Handler", shared_bot: bool = False
+) -> Dict[str, int]:
+    """
+    Deep size of a chat session, by category.
+
+    Parameters:
+        - handler: chat session
+        - shared_bot: bot and connection pool are shared, not counted
+
+    Returns:
+        - bytes used by the last sent markups, the inline messages
+          queue, the menu stack, the bot and the rest of the handler
+    """
+    stop = SHARED_TYPES
+    if shared_bot:
+        stop += (Bot, Request)
+    seen: Set[int] = {id(handler)}  # messages refer to their handler
+    menus = list(handler._menu_queue)
+    messages = list(handler._message_queue)
+
+    # markup only, buttons callbacks are counted with their messages
+    markup_stop = stop + (ABCMessage, types.MethodType)
+    cached = sum(
+        deep_size(x.keyboard_previous, seen, markup_stop)
+        + deep_size(x.content_previous, seen, markup_stop)
+        for x in menus + messages
+    )
+    footprint = {
+        "cached_markup": cached,
+        # inline messages are also menu buttons callbacks, count them
+        # in the queue first
+        "inline_queue": deep_size(messages, seen, stop),
+        "menu_stack": deep_size(menus, seen, stop),
+        "bot": deep_size(getattr(handler, "_bot", None), seen, stop),
+    }
+    footprint["other"] = sys.getsizeof(handler, 0) + deep_size(
+        handler.__dict__, seen, stop
+    )
+    footprint["total"] = sum(footprint.values())
+    return footprint
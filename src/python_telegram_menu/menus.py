@@ -0,0 +1,248 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Menus graph reachable from the start message.
+"""
+
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+from typing import Type
+
+from .core import ABCMessage
+from .search import SearchIndex, plain_text, words
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MenuNode:
+    """
+    Menu reachable from the start message.
+
+    Class members:
+        - path: button labels pressed from the start message
+        - label: message label
+        - message_class: message type
+        - inlined: sent as inline message instead of a menu
+        - content: message content, HTML tags removed
+    """
+
+    path: Tuple[str, ...]
+    label: str
+    message_class: Type[ABCMessage]
+    inlined: bool
+    content: str = ""
+
+    @property
+    def title(self) -> str:
+        """
+        Label of the button opening the menu, message label for the root.
+        """
+        return self.path[-1] if self.path else self.label
+
+
+class MenuGraph:
+    """
+    Menus reachable from a start message, walked once.
+
+    The graph is compiled from a prototype start message, built for a
+    chat which never receives messages. Menu contents are rendered once
+    for indexing: contents depending on the user are indexed as seen by
+    the prototype. Graphs are shared by the sessions of the process.
+
+    Class members:
+        - MAX_MENUS: walk limit, for generated menus
+        - ROUTE_SIMILARITY: fuzzy match score ratio to route free text
+        - LINK_PATTERN: characters allowed in /start deep link payloads
+        - nodes: menus in breadth first order, start message first
+    """
+
+    MAX_MENUS = 1000
+    ROUTE_SIMILARITY = 0.7  # per word, for free text to open a menu
+    ROUTE_MIN_WORD = 3  # shortest word of fuzzy matched free text
+    LINK_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+    _compiled: Dict[Hashable, "MenuGraph"] = {}
+    _compile_lock = threading.Lock()
+
+    def __init__(self, root: ABCMessage) -> None:
+        """
+        MenuGraph object constructor.
+
+        Parameters:
+            - root: prototype start message
+        """
+        self.nodes: List[MenuNode] = []
+        self._by_path: Dict[Tuple[str, ...], MenuNode] = {}
+        self._search_index: Optional[SearchIndex] = None
+        self._label_index: Optional[SearchIndex] = None
+        self._labels: Dict[str, List[MenuNode]] = {}
+        self._links: Optional[Dict[str, MenuNode]] = None
+        self._lock = threading.Lock()
+        self._walk(root)
+
+    @classmethod
+    def compile(
+        cls, key: Hashable, build_root: Callable[[], ABCMessage]
+    ) -> "MenuGraph":
+        """
+        Get graph compiled for key, compile it on first request.
+
+        Parameters:
+            - key: identifies the start message, class and arguments
+            - build_root: builds the prototype start message
+        """
+        with cls._compile_lock:
+            graph = cls._compiled.get(key)
+            if graph is None:
+                graph = cls._compiled[key] = cls(build_root())
+                logger.info(f"Menu graph compiled, {len(graph.nodes)} menus")
+            return graph
+
+    @staticmethod
+    def _render(message: ABCMessage) -> str:
+        """
+        Render message content, which also builds its keyboard.
+        """
+        try:
+            return plain_text(message.get_content())
+        except Exception as error:
+            logger.debug(f"Menu {message.label} not rendered: {error}")
+            return ""
+
+    def _walk(self, root: ABCMessage) -> None:
+        """
+        Add menus reachable from root, breadth first.
+        """
+        pending: Deque[Tuple[Tuple[str, ...], ABCMessage]] = deque(
+            [((), root)]
+        )
+        seen = {id(root)}
+        while pending and len(self.nodes) < self.MAX_MENUS:
+            path, message = pending.popleft()
+            node = MenuNode(
+                path,
+                message.label,
+                type(message),
+                message.inlined,
+                self._render(message),
+            )
+            self.nodes.append(node)
+            self._by_path[path] = node
+            for button in (y for x in message.keyboard for y in x):
+                child = button.callback
+                if isinstance(child, ABCMessage) and id(child) not in seen:
+                    seen.add(id(child))
+                    pending.append((path + (button.label,), child))
+
+    def get(self, path: Tuple[str, ...]) -> Optional[MenuNode]:
+        """
+        Menu opened by pressing path buttons from the start message.
+        """
+        return self._by_path.get(tuple(path))
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """
+        Index of menus by title and content, built on first use.
+        """
+        with self._lock:
+            if self._search_index is None:
+                index = SearchIndex()
+                for node in self.nodes[1:]:
+                    index.add(node, node.title, node.content)
+                self._search_index = index
+            return self._search_index
+
+    def index_labels(self) -> SearchIndex:
+        """
+        Index of menus by title only, built on first call.
+        """
+        with self._lock:
+            if self._label_index is None:
+                index = SearchIndex()
+                for node in self.nodes[1:]:
+                    index.add(node, node.title)
+                    key = " ".join(words(node.title))
+                    self._labels.setdefault(key, []).append(node)
+                self._label_index = index
+            return self._label_index
+
+    def route(self, text: str) -> Optional[MenuNode]:
+        """
+        Menu whose button label matches free text.
+
+        Exact labels, emojis and case aside, are found by a dict lookup.
+        Otherwise the best fuzzy match is kept if every word matches and
+        no other menu scores as well.
+
+        Returns:
+            - matching menu, None if none or ambiguous
+        """
+        index = self.index_labels()
+        query = words(text)
+        if not query:
+            return None
+        exact = self._labels.get(" ".join(query), [])
+        if exact:
+            return exact[0] if len(exact) == 1 else None
+        if min(len(x) for x in query) < self.ROUTE_MIN_WORD:
+            return None  # short words, e.g. "hi", are not menu names
+
+        ranked = index.ranked(text, limit=2)
+        if not ranked:
+            return None
+        threshold = len(query) * index.TITLE_WEIGHT * self.ROUTE_SIMILARITY
+        node, score = ranked[0]
+        if score < threshold or (len(ranked) > 1 and ranked[1][1] == score):
+            return None
+        return node
+
+    @staticmethod
+    def link_payload(path: Tuple[str, ...]) -> str:
+        """
+        Deep link payload of the menu opened by path buttons.
+
+        Label words are joined by "_" and path levels by "-", e.g.
+        "settings-dark_mode" for the "Dark mode" button of "Settings".
+        """
+        return "-".join("_".join(words(x)) for x in path)
+
+    def index_links(self) -> Dict[str, MenuNode]:
+        """
+        Menus by deep link payload, built on first call.
+
+        Menus are linked by path payload and by lower case message class
+        name, if the class opens a single menu. Inline messages are not
+        linked: they are sent below a menu.
+        """
+        with self._lock:
+            if self._links is not None:
+                return self._links
+            menus = [x for x in self.nodes[1:] if not x.inlined]
+            links = {self.link_payload(x.path): x for x in menus}
+            classes: Dict[str, List[MenuNode]] = {}
+            for node in menus:
+                key = node.message_class.__name__.lower()
+                classes.setdefault(key, []).append(node)
+            for key, nodes in classes.items():
+                if len(nodes) == 1:
+                    links.setdefault(key, nodes[0])
+            self._links = {
+                k: v
+                for k, v in links.items()
+                if self.LINK_PATTERN.fullmatch(k)
+            }
+            logger.info(f"{len(self._links)} menus deep linked")
+            return self._links
+
+    def resolve_link(self, payload: str) -> Optional[MenuNode]:
+        """
+        Menu opened by a /start deep link payload, None if unknown.
+        """
+        return self.index_links().get(payload)
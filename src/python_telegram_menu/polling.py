@@ -0,0 +1,362 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Updates intake from Telegram.
+"""
+
+import datetime
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import telegram.ext
+from telegram import Bot
+from telegram.error import TelegramError, Unauthorized
+from telegram.ext import Dispatcher, Updater
+from telegram.update import Update
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BacklogPolicy:
+    """
+    Updates pending on Telegram servers when the session starts.
+
+    Class members:
+        - max_age: drop updates older than max_age seconds
+        - coalesce: keep only the latest navigation update of each chat,
+          text messages and inline button presses
+    """
+
+    max_age: Optional[float] = None
+    coalesce: bool = False
+
+    BATCH_SIZE = 100  # getUpdates limit
+
+    @staticmethod
+    def _is_navigation(update: Update) -> bool:
+        """
+        True for updates opening menus or pressing buttons.
+        """
+        return update.callback_query is not None or (
+            update.message is not None and update.message.text is not None
+        )
+
+    def _is_stale(self, update: Update, now: datetime.datetime) -> bool:
+        """
+        True if update was sent more than max_age seconds ago.
+
+        Inline button presses and poll answers carry no date, their age
+        is unknown and they are kept.
+        """
+        if self.max_age is None or update.message is None:
+            return False
+        age = now - update.message.date
+        return age.total_seconds() > self.max_age
+
+    def drain(self, bot: Bot, offset: int = 0) -> Tuple[List[Update], int]:
+        """
+        Read and acknowledge pending updates, keep the ones to process.
+
+        Updates are read batch by batch: only the kept ones are stored,
+        so memory depends on the number of active chats, not on the
+        backlog size.
+
+        Parameters:
+            - bot: bot reading the updates
+            - offset: first update id to read
+
+        Returns:
+            - kept updates in arrival order, next update offset
+        """
+        dropped = 0
+        kept: Dict[object, Update] = {}
+        while True:
+            batch = bot.get_updates(
+                offset=offset, limit=self.BATCH_SIZE, timeout=0
+            )
+            if not batch:
+                break
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for update in batch:
+                offset = update.update_id + 1
+                if self._is_stale(update, now):
+                    dropped += 1
+                    continue
+                key: object = update.update_id
+                if (
+                    self.coalesce
+                    and self._is_navigation(update)
+                    and update.effective_chat is not None
+                ):
+                    key = ("chat", update.effective_chat.id)
+                    if key in kept:
+                        dropped += 1
+                        del kept[key]  # keep arrival order of latest
+                kept[key] = update
+
+        # the last empty read acknowledged the backlog on telegram servers
+        logger.info(f"Backlog: {len(kept)} updates kept, {dropped} dropped")
+        return list(kept.values()), offset
+
+
+@dataclass
+class PollingConfig:
+    """
+    Updates polling settings.
+
+    Class members:
+        - limit: max updates returned by one getUpdates request
+        - timeout: long polling duration, seconds
+        - read_latency: extra read time allowed for long polling requests
+        - read_timeout: read timeout of other requests, seconds
+        - connect_timeout: connection timeout, seconds
+        - poll_interval: pause between two getUpdates requests, seconds
+        - allowed_updates: update types requested, if None only the
+          types handled by the session dispatcher
+    """
+
+    limit: int = 100
+    timeout: float = 10
+    read_latency: float = 2.0
+    read_timeout: float = 5
+    connect_timeout: float = 5
+    poll_interval: float = 0.0
+    allowed_updates: Optional[List[str]] = None
+
+
+HANDLER_UPDATE_TYPES = {
+    telegram.ext.CommandHandler: ["message"],
+    telegram.ext.MessageHandler: ["message"],
+    telegram.ext.CallbackQueryHandler: ["callback_query"],
+    telegram.ext.InlineQueryHandler: ["inline_query"],
+    telegram.ext.PollAnswerHandler: ["poll_answer"],
+    telegram.ext.PollHandler: ["poll"],
+}
+
+
+def handled_update_types(dispatcher: Dispatcher) -> Optional[List[str]]:
+    """
+    Get update types matching the dispatcher handlers.
+
+    Type handlers, which see every update, are not taken into account.
+
+    Returns:
+        - update types, None if a handler type is unknown
+    """
+    update_types: List[str] = []
+    for handlers in dispatcher.handlers.values():
+        for handler in handlers:
+            if isinstance(handler, telegram.ext.TypeHandler):
+                continue
+            types = next(
+                (
+                    v
+                    for k, v in HANDLER_UPDATE_TYPES.items()
+                    if isinstance(handler, k)
+                ),
+                None,
+            )
+            if types is None:
+                return None
+            update_types += [x for x in types if x not in update_types]
+    return update_types
+
+
+class IntakeMeter:
+    """
+    Measure updates intake throughput.
+
+    Class members:
+        - WINDOW: throughput averaging period, seconds
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self) -> None:
+        """
+        IntakeMeter object constructor.
+        """
+        self.updates = 0
+        self.requests = 0
+        self.fetch_time = 0.0
+        self._batches: Deque[Tuple[float, int]] = deque()
+        self._first_batch: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, count: int, duration: float) -> None:
+        """
+        Record one getUpdates request.
+
+        Parameters:
+            - count: number of updates received
+            - duration: request duration, seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._first_batch is None:
+                self._first_batch = now - duration
+            self.updates += count
+            self.requests += 1
+            self.fetch_time += duration
+            if count:
+                self._batches.append((now, count))
+            while self._batches and self._batches[0][0] < now - self.WINDOW:
+                self._batches.popleft()
+
+    @property
+    def throughput(self) -> float:
+        """
+        Updates received per second over the last WINDOW seconds.
+
+        Until WINDOW seconds are recorded, the rate is averaged over the
+        time elapsed since the first request.
+        """
+        with self._lock:
+            if self._first_batch is None:
+                return 0.0
+            now = time.monotonic()
+            covered = min(self.WINDOW, now - self._first_batch)
+            if covered <= 0:
+                return 0.0
+            start = now - self.WINDOW
+            return sum(x[1] for x in self._batches if x[0] >= start) / covered
+
+    def report(self) -> Dict[str, float]:
+        """
+        Intake counters.
+        """
+        return {
+            "updates": self.updates,
+            "requests": self.requests,
+            "fetch_time": round(self.fetch_time, 3),
+            "throughput": round(self.throughput, 3),
+        }
+
+
+class UpdateFetcher:
+    """
+    Pull updates from Telegram into the dispatcher queue.
+
+    The fetching thread only reads updates and queues them: the
+    dispatcher thread handles a batch while the next one is fetched.
+    It is stopped by Updater.stop(), like the built-in polling.
+
+    Class members:
+        - RETRY_DELAY_MAX: max pause after consecutive network errors
+    """
+
+    RETRY_DELAY_MAX = 30.0  # seconds
+
+    def __init__(
+        self,
+        updater: Updater,
+        config: PollingConfig,
+        on_queued: Optional[Callable[[Update], None]] = None,
+    ) -> None:
+        """
+        UpdateFetcher object constructor.
+
+        Parameters:
+            - updater: session updater, provides bot and dispatcher
+            - config: polling settings
+            - on_queued: called for each update put in the queue
+        """
+        self._updater = updater
+        self.config = config
+        self.on_queued = on_queued
+        self._target: Optional[Callable[[object], None]] = None
+        self.meter = IntakeMeter()
+        self.offset = 0
+        self.allowed_updates = config.allowed_updates
+
+    def start(self, offset: int = 0) -> None:
+        """
+        Start dispatcher and fetching threads.
+
+        Parameters:
+            - offset: first update id to fetch
+        """
+        self.offset = offset
+        if self.allowed_updates is None:
+            self.allowed_updates = handled_update_types(
+                self._updater.dispatcher
+            )
+        self._updater.bot.delete_webhook()
+        self._updater.running = True
+        if self._target is None:
+            threading.Thread(
+                target=self._updater.dispatcher.start,
+                name="dispatcher",
+                daemon=True,
+            ).start()
+        threading.Thread(
+            target=self._fetch, name="update_fetcher", daemon=True
+        ).start()
+        logger.info(
+            f"Polling started, limit {self.config.limit}, "
+            f"updates {self.allowed_updates}"
+        )
+
+    def route(self, target: Callable[[object], None]) -> None:
+        """
+        Send updates and polling errors to target instead of the updater
+        queue, the updater dispatcher thread is then not started.
+        """
+        self._target = target
+
+    def _queue(self, item: object) -> None:
+        if self._target is not None:
+            self._target(item)
+        else:
+            self._updater.update_queue.put(item)
+
+    def put(self, update: Update) -> None:
+        """
+        Queue update for the dispatcher.
+        """
+        if self.on_queued is not None:
+            self.on_queued(update)
+        self._queue(update)
+
+    def _fetch(self) -> None:
+        """
+        Fetch updates until the updater is stopped.
+        """
+        delay = self.config.poll_interval
+        while self._updater.running:
+            start = time.monotonic()
+            try:
+                updates = self._updater.bot.get_updates(
+                    offset=self.offset,
+                    limit=self.config.limit,
+                    timeout=self.config.timeout,
+                    read_latency=self.config.read_latency,
+                    allowed_updates=self.allowed_updates,
+                )
+            except Unauthorized:
+                logger.error("Bot token rejected, polling stopped")
+                self._updater.running = False
+                return
+            except TelegramError as error:
+                logger.error(f"Failed getting updates: {error}")
+                self._queue(error)
+                delay = min(max(1.0, delay * 2), self.RETRY_DELAY_MAX)
+                time.sleep(delay)
+                continue
+
+            delay = self.config.poll_interval
+            self.meter.record(len(updates), time.monotonic() - start)
+            if not self._updater.running:
+                break  # updates pulled again on restart
+            for update in updates:
+                self.put(update)
+            if updates:
+                self.offset = updates[-1].update_id + 1
+            if delay:
+                time.sleep(delay)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Registry of open polls.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from apscheduler.schedulers.base import BaseScheduler
+
+from .cleanup import MessageCleaner
+
+logger = logging.getLogger(__name__)
+
+TypePollCallback = Optional[Callable[[str], Any]]
+
+
+@dataclass
+class OpenPoll:
+    """
+    Poll sent and not answered yet.
+
+    Class members:
+        - poll_id: Telegram poll identifier
+        - chat_id: chat the poll was sent to
+        - message_id: poll message identifier
+        - question: poll question
+        - options: answers texts
+        - callback: called with the selected answer text
+        - deadline: monotonic time the poll is closed at
+        - group: votes aggregation key, for broadcast polls
+    """
+
+    poll_id: str
+    chat_id: int
+    message_id: int
+    question: str
+    options: List[str]
+    callback: TypePollCallback
+    deadline: float
+    group: Optional[str] = None
+
+
+class PollRegistry:
+    """
+    Open polls indexed by poll id, closed by a single timer.
+
+    Answers are routed with one dict lookup, a chat may have several
+    open polls. A single scheduler job closes expired polls from a
+    deadline heap, and answered or expired poll messages are deleted by
+    the batched message cleaner. Votes of polls sharing a group, e.g.
+    sent by a broadcast, are counted together and kept once closed.
+
+    Class members:
+        - CLOSE_INTERVAL: delay between two expired polls checks
+    """
+
+    CLOSE_INTERVAL = 1  # seconds
+
+    def __init__(
+        self,
+        cleaner: MessageCleaner,
+        scheduler: BaseScheduler,
+        job_id: str = "poll_registry",
+    ) -> None:
+        """
+        PollRegistry object constructor.
+
+        Parameters:
+            - cleaner: deletes closed polls messages
+            - scheduler: scheduler running the closing job
+            - job_id: scheduler job identifier
+        """
+        self.cleaner = cleaner
+        self.job_id = job_id
+        self._polls: Dict[str, OpenPoll] = {}
+        self._by_chat: Dict[int, Set[str]] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self._votes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        scheduler.add_job(
+            self.close_expired,
+            "interval",
+            id=job_id,
+            seconds=self.CLOSE_INTERVAL,
+            replace_existing=True,
+        )
+
+    def __len__(self) -> int:
+        return len(self._polls)
+
+    def register(self, poll: OpenPoll) -> None:
+        """
+        Track poll until answered or expired.
+        """
+        with self._lock:
+            self._polls[poll.poll_id] = poll
+            self._by_chat.setdefault(poll.chat_id, set()).add(poll.poll_id)
+            heapq.heappush(self._deadlines, (poll.deadline, poll.poll_id))
+            if poll.group is not None:
+                votes = self._votes.setdefault(poll.group, {})
+                for option in poll.options:
+                    votes.setdefault(option, 0)
+
+    def chat_polls(self, chat_id: int) -> List[OpenPoll]:
+        """
+        Open polls of chat.
+        """
+        with self._lock:
+            return [self._polls[x] for x in self._by_chat.get(chat_id, ())]
+
+    def _pop(self, poll_id: str) -> Optional[OpenPoll]:
+        """
+        Stop tracking poll, lock held. Its deadline stays in the heap.
+        """
+        poll = self._polls.pop(poll_id, None)
+        if poll is not None:
+            chat_polls = self._by_chat.get(poll.chat_id, set())
+            chat_polls.discard(poll_id)
+            if not chat_polls:
+                self._by_chat.pop(poll.chat_id, None)
+        return poll
+
+    def answer(self, poll_id: str, option_ids: List[int]) -> bool:
+        """
+        Count answer, close poll and run its callback.
+
+        Returns:
+            - True if the poll was open
+        """
+        with self._lock:
+            poll = self._pop(poll_id)
+            if poll is None:
+                return False
+            answers = [
+                poll.options[x]
+                for x in option_ids
+                if 0 <= x < len(poll.options)
+            ]
+            # votes of a forgotten group are not counted anymore
+            votes = self._votes.get(poll.group, {})
+            for answer in answers:
+                if answer in votes:
+                    votes[answer] += 1
+
+        logger.info(
+            f"Answer of chat {poll.chat_id} to '{poll.question}': {answers}"
+        )
+        self.cleaner.schedule(poll.chat_id, poll.message_id)
+        if callable(poll.callback) and answers:
+            poll.callback(answers[0])
+        return True
+
+    def close(self, chat_id: int) -> int:
+        """
+        Close open polls of chat and delete their messages.
+
+        Returns:
+            - number of polls closed
+        """
+        with self._lock:
+            polls = [
+                self._pop(x) for x in list(self._by_chat.get(chat_id, ()))
+            ]
+        for poll in polls:
+            if poll is not None:
+                self.cleaner.schedule(poll.chat_id, poll.message_id)
+        return len(polls)
+
+    def discard(self, chat_id: int) -> None:
+        """
+        Stop tracking polls of chat, messages are kept.
+        """
+        with self._lock:
+            for poll_id in list(self._by_chat.get(chat_id, ())):
+                self._pop(poll_id)
+
+    def close_expired(self, now: Optional[float] = None) -> int:
+        """
+        Close polls past their deadline and delete their messages.
+
+        Returns:
+            - number of polls closed
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, poll_id = heapq.heappop(self._deadlines)
+                poll = self._pop(poll_id)
+                if poll is not None:  # else already answered
+                    expired.append(poll)
+        for poll in expired:
+            logger.info(f"Poll '{poll.question}' expired in {poll.chat_id}")
+            self.cleaner.schedule(poll.chat_id, poll.message_id)
+        return len(expired)
+
+    def results(self, group: str) -> Dict[str, int]:
+        """
+        Votes of a polls group by answer text, open polls included.
+        """
+        with self._lock:
+            return dict(self._votes.get(group, {}))
+
+    def forget(self, group: str) -> None:
+        """
+        Drop votes of a polls group, its open polls stay answerable.
+        """
+        with self._lock:
+            self._votes.pop(group, None)
@@ -0,0 +1,382 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Record and replay updates streams.
+"""
+
+import difflib
+import itertools
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO, Tuple
+from typing import Union
+
+from telegram import Chat, InputFile
+from telegram.ext import TypeHandler
+from telegram.ext.callbackcontext import CallbackContext
+from telegram.update import Update
+from telegram.utils.request import Request
+
+if TYPE_CHECKING:
+    from .session import Session
+
+logger = logging.getLogger(__name__)
+
+TypeCall = Tuple[str, Dict[str, Any]]
+
+
+class StubRequest(Request):
+    """
+    Connection pool answering Bot API requests locally.
+
+    Outbound calls are recorded instead of being sent, and answered with
+    fabricated results so that sessions run without network.
+
+    Class members:
+        - calls: recorded (method, parameters) requests
+        - latency: simulated network delay of each request, seconds
+    """
+
+    __slots__ = ("latency", "calls", "_message_ids", "_lock")
+
+    BOT_USER = {
+        "id": 1,
+        "is_bot": True,
+        "first_name": "stub",
+        "username": "stub_bot",
+    }
+
+    def __init__(self, latency: float = 0.0, con_pool_size: int = 16):
+        """
+        StubRequest object constructor.
+
+        Parameters:
+            - latency: simulated network delay, seconds
+            - con_pool_size: accepted by the updater, no connection made
+        """
+        super().__init__(con_pool_size=con_pool_size)
+        self.latency = latency
+        self.calls: List[TypeCall] = []
+        self._message_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        """
+        Replace uploaded files by their names, keep other values.
+        """
+        if isinstance(value, InputFile):
+            return f"<file {value.filename}>"
+        if hasattr(value, "to_dict"):
+            return value.to_dict()
+        return value
+
+    def _message(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fabricate message sent or edited by the bot.
+        """
+        message_id = data.get("message_id") or next(self._message_ids)
+        message = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(data.get("chat_id", 0)), "type": "private"},
+            "from": self.BOT_USER,
+        }
+        if "text" in data:
+            message["text"] = data["text"]
+        if "question" in data:
+            message["poll"] = self._poll({**data, "message_id": message_id})
+        return message
+
+    @staticmethod
+    def _poll(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fabricate poll sent by the bot.
+        """
+        options = data.get("options", [])
+        if isinstance(options, str):
+            options = json.loads(options)
+        return {
+            "id": f"poll{data.get('chat_id', 0)}_{data.get('message_id', 0)}",
+            "question": data.get("question", ""),
+            "options": [{"text": x, "voter_count": 0} for x in options],
+            "total_voter_count": 0,
+            "is_closed": False,
+            "is_anonymous": False,
+            "type": "regular",
+            "allows_multiple_answers": False,
+        }
+
+    def post(
+        self, url: str, data: Dict[str, Any], timeout: float = None
+    ) -> Union[Dict[str, Any], List[Any], bool]:
+        """
+        Record request and return its fabricated result.
+        """
+        method = url.rsplit("/", 1)[-1]
+        data = {k: self._normalize(v) for k, v in (data or {}).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        if method == "getUpdates":
+            return []
+        with self._lock:
+            self.calls.append((method, data))
+            if method == "getMe":
+                return self.BOT_USER
+            if method == "stopPoll":
+                return {**self._poll(data), "is_closed": True}
+            if method.startswith("edit") or (
+                method.startswith("send") and method != "sendChatAction"
+            ):
+                return self._message(data)
+        return True
+
+    def retrieve(self, url: str, timeout: float = None) -> bytes:
+        return b""
+
+    def stop(self) -> None:
+        pass
+
+
+class UpdateRecorder:
+    """
+    Write updates received by a session as JSON lines.
+
+    Each line holds the update and its arrival time, in seconds from the
+    first recorded update. Anonymized recordings replace the ids of every
+    chat and user, senders of forwarded messages included, by sequential
+    ids and drop their names, texts are kept since they drive the menus
+    navigation.
+
+    Class members:
+        - CHAT_TYPES: type values identifying chat objects
+    """
+
+    GROUP = -2  # before the session guard, shed updates are recorded too
+    CHAT_TYPES = (
+        Chat.PRIVATE,
+        Chat.GROUP,
+        Chat.SUPERGROUP,
+        Chat.CHANNEL,
+        Chat.SENDER,
+    )
+
+    def __init__(
+        self, output: Union[str, Path, TextIO], anonymize: bool = False
+    ) -> None:
+        """
+        UpdateRecorder object constructor.
+
+        Parameters:
+            - output: file path or opened text file
+            - anonymize: replace chat and user ids
+        """
+        self._file = (
+            open(output, "a", encoding="utf-8")
+            if isinstance(output, (str, Path))
+            else output
+        )
+        self.anonymize = anonymize
+        self.recorded = 0
+        self._ids: Dict[int, int] = {}
+        self._start: Optional[float] = None
+        self._lock = threading.Lock()
+        self._handler = TypeHandler(Update, self._on_update)
+
+    def attach(self, session: "Session") -> None:
+        """
+        Record updates dispatched by session.
+        """
+        session.updater.dispatcher.add_handler(self._handler, self.GROUP)
+
+    def detach(self, session: "Session") -> None:
+        """
+        Stop recording updates of session.
+        """
+        session.updater.dispatcher.remove_handler(self._handler, self.GROUP)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _anonymous_id(self, real_id: int) -> int:
+        """
+        Get stable anonymous id, keeping the chat type sign.
+        """
+        anonymous_id = self._ids.setdefault(abs(real_id), len(self._ids) + 1)
+        return -anonymous_id if real_id < 0 else anonymous_id
+
+    def _anonymized(self, value: Any) -> Any:
+        """
+        Copy update dict with anonymous chats and users.
+
+        Users are recognized by their is_bot field and chats by their
+        type, wherever they are embedded, e.g. forward_from_chat.
+        """
+        if isinstance(value, list):
+            return [self._anonymized(x) for x in value]
+        if not isinstance(value, dict):
+            return value
+        value = {k: self._anonymized(v) for k, v in value.items()}
+        value.pop("forward_sender_name", None)
+        if isinstance(value.get("id"), int) and (
+            "is_bot" in value or value.get("type") in self.CHAT_TYPES
+        ):
+            value["id"] = self._anonymous_id(value["id"])
+            for field in ("username", "last_name", "title"):
+                value.pop(field, None)
+            if "first_name" in value:
+                value["first_name"] = f"user{abs(value['id'])}"
+        return value
+
+    def record(self, update: Update) -> None:
+        """
+        Write update line.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._start is None:
+                self._start = now
+            data = update.to_dict()
+            if self.anonymize:
+                data = self._anonymized(data)
+            line = {"at": round(now - self._start, 6), "update": data}
+            self._file.write(json.dumps(line) + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def _on_update(self, update: Update, _: CallbackContext) -> None:
+        self.record(update)
+
+
+class ReplayReport:
+    """
+    Replay processing latencies and outbound calls.
+
+    Class members:
+        - latencies: per update, from scheduled arrival to handled, seconds
+        - calls: Bot API requests made by the session
+    """
+
+    def __init__(self, latencies: List[float], calls: List[TypeCall]):
+        self.latencies = latencies
+        self.calls = calls
+
+    def percentiles(self) -> Dict[str, float]:
+        """
+        Latency distribution, milliseconds.
+        """
+        values = sorted(self.latencies)
+        if not values:
+            return {"count": 0}
+
+        def rank(ratio: float) -> float:
+            index = min(len(values) - 1, int(ratio * len(values)))
+            return round(values[index] * 1000, 3)
+
+        return {
+            "count": len(values),
+            "p50": rank(0.5),
+            "p90": rank(0.9),
+            "p99": rank(0.99),
+            "max": rank(1.0),
+        }
+
+    def save_calls(self, path: Union[str, Path]) -> None:
+        """
+        Write outbound calls as JSON lines, to diff with another version.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for method, data in self.calls:
+                file.write(json.dumps([method, data], sort_keys=True) + "\n")
+
+
+def load_calls(path: Union[str, Path]) -> List[TypeCall]:
+    """
+    Read outbound calls saved by ReplayReport.save_calls.
+    """
+    with open(path, encoding="utf-8") as file:
+        return [tuple(json.loads(x)) for x in file if x.strip()]
+
+
+def diff_calls(expected: List[TypeCall], actual: List[TypeCall]) -> List[str]:
+    """
+    Unified diff of two outbound calls sequences, empty if identical.
+    """
+    return list(
+        difflib.unified_diff(
+            [json.dumps(list(x), sort_keys=True) for x in expected],
+            [json.dumps(list(x), sort_keys=True) for x in actual],
+            "expected",
+            "actual",
+            lineterm="",
+        )
+    )
+
+
+class UpdateReplayer:
+    """
+    Feed recorded updates to a session.
+
+    Updates are dispatched in the calling thread, at their recorded pace
+    divided by speed, or back to back if speed is None. The session
+    should use a StubRequest, so that outbound calls are recorded, and be
+    started without polling.
+    """
+
+    def __init__(
+        self,
+        session: "Session",
+        recording: Union[str, Path],
+        speed: Optional[float] = 1.0,
+    ) -> None:
+        """
+        UpdateReplayer object constructor.
+
+        Parameters:
+            - session: session receiving the updates
+            - recording: JSON lines file written by UpdateRecorder
+            - speed: replay speed factor, max speed if None
+        """
+        self.session = session
+        self.recording = recording
+        self.speed = speed
+
+    def run(self) -> ReplayReport:
+        """
+        Replay all updates and report.
+        """
+        dispatcher = self.session.updater.dispatcher
+        bot = self.session.updater.bot
+        request = self.session.request
+        calls_start = (
+            len(request.calls) if isinstance(request, StubRequest) else 0
+        )
+        latencies: List[float] = []
+        start = time.monotonic()
+        with open(self.recording, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                scheduled = time.monotonic()
+                if self.speed:
+                    scheduled = start + entry["at"] / self.speed
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                dispatcher.process_update(Update.de_json(entry["update"], bot))
+                latencies.append(time.monotonic() - scheduled)
+
+        calls = (
+            request.calls[calls_start:]
+            if isinstance(request, StubRequest)
+            else []
+        )
+        report = ReplayReport(latencies, calls)
+        logger.info(f"Replay done: {report.percentiles()}")
+        return report
@@ -0,0 +1,119 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Inline buttons callback routing table.
+"""
+
+import secrets
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .core import ABCMessage, Button
+
+TypeRoute = Tuple["ABCMessage", "Button"]
+
+
+class CallbackRouter:
+    """
+    Map short callback tokens to inline message buttons.
+
+    Each inline button gets an integer id, unique in the session and
+    stable across keyboard refreshes, sent as callback_data instead of
+    the labels. Buttons are identified by label and, for buttons sharing
+    a label in one message, by their rank among them. Ids are encoded in base 36, so the payload stays far
+    below the 64 bytes limit whatever the labels are.
+
+    Tokens start with a random nonce drawn per router: keyboards sent
+    by a previous session of the chat, or before a restart, are
+    rejected instead of resolving to the button now holding their id.
+
+    Class members:
+        - TOKEN_BASE: ids encoding base
+        - NONCE_LENGTH: random characters prefixing tokens
+        - nonce: tokens prefix of this router
+    """
+
+    TOKEN_BASE = 36
+    NONCE_LENGTH = 6
+
+    def __init__(self) -> None:
+        """
+        CallbackRouter object constructor.
+        """
+        self.nonce = self._encode(
+            secrets.randbelow(self.TOKEN_BASE**self.NONCE_LENGTH)
+        ).rjust(self.NONCE_LENGTH, "0")
+        self._next_id = 0
+        self._ids: Dict[Tuple[int, str, int], int] = {}
+        self._keys: Dict[int, Tuple[int, str, int]] = {}
+        self._routes: Dict[int, TypeRoute] = {}
+        self._message_ids: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    @staticmethod
+    def _encode(route_id: int) -> str:
+        """
+        Encode integer id to base 36 token.
+        """
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        token = ""
+        while True:
+            route_id, rest = divmod(route_id, CallbackRouter.TOKEN_BASE)
+            token = digits[rest] + token
+            if route_id == 0:
+                return token
+
+    def register(
+        self, message: "ABCMessage", button: "Button", rank: int = 0
+    ) -> str:
+        """
+        Register button and return its callback token.
+
+        Parameters:
+            - message: inline message owning the button
+            - button: keyboard button
+            - rank: number of buttons before it with the same label
+
+        Returns:
+            - callback_data token
+        """
+        key = (id(message), button.label, rank)
+        with self._lock:
+            route_id = self._ids.get(key)
+            if route_id is None:
+                route_id = self._next_id
+                self._next_id += 1
+                self._ids[key] = route_id
+                self._keys[route_id] = key
+                self._message_ids.setdefault(id(message), []).append(route_id)
+            self._routes[route_id] = (message, button)
+        return self.nonce + self._encode(route_id)
+
+    def resolve(self, token: str) -> Optional[TypeRoute]:
+        """
+        Get message and button matching callback token.
+
+        Returns:
+            - route, None if unknown or issued by another router
+        """
+        if not isinstance(token, str) or not token.startswith(self.nonce):
+            return None
+        try:
+            route_id = int(token[self.NONCE_LENGTH :], self.TOKEN_BASE)
+        except (TypeError, ValueError):
+            return None
+        return self._routes.get(route_id)
+
+    def forget(self, message: "ABCMessage") -> None:
+        """
+        Remove all routes of message.
+        """
+        with self._lock:
+            for route_id in self._message_ids.pop(id(message), []):
+                self._routes.pop(route_id)
+                self._ids.pop(self._keys.pop(route_id), None)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python 3
+# -*- coding: utf-8 -*-
+
+"""
+Menus full text search.
+"""
+
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def plain_text(content: str) -> str:
+    """
+    Remove HTML tags from message content.
+    """
+    return TAG_PATTERN.sub("", content).strip()
+
+
+def words(text: str) -> List[str]:
+    """
+    Lower case words of text, emojis and punctuation removed.
+    """
+    return WORD_PATTERN.findall(plain_text(text).lower())
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Character trigrams of word, padded to match its first letters.
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Prefix and trigram index over documents titles and contents.
+
+    Each word prefix maps to the documents containing a word starting
+    with it, answering queries being typed with a dict lookup. Trigrams
+    match misspelled words. Title matches weight more than content ones.
+
+    Class members:
+        - PREFIX_MAX: longest indexed prefix, longer query words are cut
+        - MIN_SIMILARITY: trigrams ratio for a misspelled word to match
+        - TITLE_WEIGHT: title match weight, content match weight is 1
+    """
+
+    PREFIX_MAX = 16
+    MIN_SIMILARITY = 0.5
+    TITLE_WEIGHT = 2.0
+
+    def __init__(self) -> None:
+        """
+        SearchIndex object constructor.
+        """
+        self.documents: List[Any] = []
+        self._prefixes: Dict[str, Dict[int, float]] = {}
+        self._trigrams: Dict[str, Dict[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, document: Any, title: str, content: str = "") -> None:
+        """
+        Index document.
+
+        Parameters:
+            - document: returned by search
+            - title: short text, e.g. button label
+            - content: long text, e.g. message content
+        """
+        doc_id = len(self.documents)
+        self.documents.append(document)
+        for text, weight in ((content, 1.0), (title, self.TITLE_WEIGHT)):
+            for word in words(text):
+                for size in range(1, min(len(word), self.PREFIX_MAX) + 1):
+                    docs = self._prefixes.setdefault(word[:size], {})
+                    docs[doc_id] = max(docs.get(doc_id, 0.0), weight)
+                for trigram in trigrams(word):
+                    docs = self._trigrams.setdefault(trigram, {})
+                    docs[doc_id] = max(docs.get(doc_id, 0.0), weight)
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        """
+        Documents matching one query word, by score.
+        """
+        exact = self._prefixes.get(word[: self.PREFIX_MAX], {})
+        scores = {x: 2 * y for x, y in exact.items()}
+        if len(word) < 3:
+            return scores
+
+        query_trigrams = trigrams(word)
+        hits: Dict[int, float] = {}
+        for trigram in query_trigrams:
+            for doc_id, weight in self._trigrams.get(trigram, {}).items():
+                hits[doc_id] = hits.get(doc_id, 0.0) + weight
+        for doc_id, hit in hits.items():
+            similarity = hit / len(query_trigrams)
+            if doc_id not in scores and similarity >= self.MIN_SIMILARITY:
+                scores[doc_id] = similarity
+        return scores
+
+    def ranked(self, query: str, limit: int = 10) -> List[Tuple[Any, float]]:
+        """
+        Documents best matching query, with their scores.
+
+        A query word matching a title word prefix scores 2 * TITLE_WEIGHT,
+        a misspelled one its trigrams ratio times the field weight.
+
+        Parameters:
+            - query: searched words, the last one may be incomplete
+            - limit: max number of documents returned
+        """
+        totals: Dict[int, float] = {}
+        for word in words(query):
+            for doc_id, score in self._word_scores(word).items():
+                totals[doc_id] = totals.get(doc_id, 0.0) + score
+        ranked = sorted(totals, key=lambda x: (-totals[x], x))
+        return [(self.documents[x], totals[x]) for x in ranked[:limit]]
+
+    def search(self, query: str, limit: int = 10) -> List[Any]:
+        """
+        Documents best matching query.
+        """
+        return [x for x, _ in self.ranked(query, limit)]
@@ -6,18 +6,36 @@ Activate telegram bot session.
 """
 
 import logging
-from typing import Any, List, Optional, Type
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Type
 
 import telegram.ext
-from telegram import Bot
+from apscheduler.schedulers.base import BaseScheduler
+from telegram import Bot, Chat, InlineQueryResultArticle
+from telegram import InputTextMessageContent
 from telegram.error import Unauthorized
 from telegram.ext import CallbackQueryHandler, CommandHandler
-from telegram.ext import Dispatcher, MessageHandler
+from telegram.ext import Dispatcher, DispatcherHandlerStop
+from telegram.ext import InlineQueryHandler
+from telegram.ext import MessageHandler, TypeHandler
 from telegram.ext.callbackcontext import CallbackContext
 from telegram.update import Update
+from telegram.utils.request import Request
 
+from .broadcast import BroadcastJob, TypeSend
+from .cache import ContentCache
+from .cleanup import MessageCleaner
 from .core import ABCMessage
+from .executor import CallbackExecutor, ProcessOffloader
+from .guards import AdmissionControl, ChatHealth, UpdateDeduplicator
 from .handler import Handler
+from .i18n import Catalog
+from .memory import session_footprint
+from .menus import MenuGraph
+from .polling import BacklogPolicy, PollingConfig, UpdateFetcher
+from .polls import PollRegistry, TypePollCallback
+from .search import words
 
 logger = logging.getLogger(__name__)
 
@@ -30,22 +48,63 @@ class Session:
     Class members:
         - updater:
         - _tg_key: bot telegram key
+        - request: shared connection pool, if set
+        - fetcher: updates polling thread
+        - admission: sheds updates when the dispatcher lags behind
+        - deduplicator: recently processed update ids
+        - chat_health: unreachable chats tracker, drops their sessions
+        - cleaner: expired messages deletion queue shared by sessions
+        - polls: open polls of all sessions, by poll id
+        - upload_slots: local files uploads slots shared by sessions,
+          sized by the handler class MAX_PARALLEL_UPLOADS on start
+        - catalog: labels translations, if enabled
+        - callback_executor: slow button callbacks pool, if enabled
+        - process_offloader: cpu_bound button callbacks pool, if enabled
         - sessions: connection sessions container
+        - inline_results_cache: recent inline queries results
         - message: message class
         - message_args: message class args
         - handler: handler class
+        - TIMEOUT_READ: default read timeout of PollingConfig
+        - TIMEOUT_CONNECT: default connection timeout of PollingConfig
     """
 
     TIMEOUT_READ = 5
     TIMEOUT_CONNECT = TIMEOUT_READ
+    GUARD_GROUP = -1  # handlers group run before session handlers
+    BUSY_TEXT = "Too many requests, please retry in a moment."
     INIT_STRING = "start"
     BROADCAST_STRING = "broadcast"
+    BROADCAST_WORKERS = 4
+    BROADCAST_RATE = 25  # messages per second, Telegram allows ~30
+    MEMORY_REPORT_JOB = "memory_report"
+    UPDATE_STATE_JOB = "update_state"
+    UPDATE_STATE_INTERVAL = 5  # seconds between saves of the last update
+    MEMORY_REPORT_INTERVAL = 600  # seconds
+    MEMORY_REPORT_SAMPLE = 100  # sessions walked per periodic report
+    MEMORY_REPORT_TOP = 5
+    INLINE_CACHE_TIME = 300  # seconds
+    INLINE_CACHE_ENTRIES = 1024  # recent queries kept
+    INLINE_MAX_RESULTS = 20
+    INLINE_DESCRIPTION_LENGTH = 100
 
     def __init__(
         self,
         tg_key: str,
         start_message: str = INIT_STRING,
         broadcast_string: str = BROADCAST_STRING,
+        broadcast_admins: Optional[List[int]] = None,
+        callback_workers: int = 0,
+        callback_timeout: float = CallbackExecutor.TIMEOUT,
+        process_workers: int = 0,
+        process_per_chat: int = ProcessOffloader.PER_CHAT_LIMIT,
+        polling_config: Optional[PollingConfig] = None,
+        admission: Optional[AdmissionControl] = None,
+        request: Optional[Request] = None,
+        scheduler: Optional[BaseScheduler] = None,
+        callback_executor: Optional[CallbackExecutor] = None,
+        process_offloader: Optional[ProcessOffloader] = None,
+        update_state_path: Optional[str] = None,
     ) -> None:
         """
         Session object constructor.
@@ -54,22 +113,56 @@ class Session:
             - tg_key: Telegram bot API key
             - start_message: for init session message
             - broadcast_string: for broadcast session message
+            - broadcast_admins: chat ids allowed to use broadcast command
+            - callback_workers: if > 0, answer inline callbacks first and
+              run slow button callbacks on that many threads
+            - callback_timeout: seconds before a slow callback is dropped
+            - process_workers: if > 0, run cpu_bound button callbacks on
+              that many worker processes
+            - process_per_chat: cpu_bound callbacks running for one chat
+            - polling_config: updates polling and requests timeouts,
+              defaults with TIMEOUT_READ and TIMEOUT_CONNECT if None
+            - admission: queued updates limits, defaults if None
+            - request: connection pool shared by the updater and the
+              sessions, e.g. replay.StubRequest, one pool per chat if None
+            - scheduler: shared jobs scheduler, the updater one if None
+            - callback_executor: shared slow callbacks pool, overrides
+              callback_workers
+            - process_offloader: shared cpu_bound callbacks pool,
+              overrides process_workers
+            - update_state_path: file keeping the last processed update
+              id, polling resumes after it on restart
         """
         if not isinstance(tg_key, str):
             raise KeyError("Telegram API Key must be a string.")
 
-        self.updater = telegram.ext.Updater(
-            tg_key,
-            use_context=True,
-            request_kwargs={
-                "read_timeout": self.TIMEOUT_READ,
-                "connection_timeout": self.TIMEOUT_CONNECT,
-            },
+        self.polling_config = polling_config or PollingConfig(
+            read_timeout=self.TIMEOUT_READ,
+            connect_timeout=self.TIMEOUT_CONNECT,
+        )
+        self.request = request
+        if request is not None:
+            self.updater = telegram.ext.Updater(
+                bot=telegram.ext.ExtBot(tg_key, request=request),
+                use_context=True,
+            )
+        else:
+            self.updater = telegram.ext.Updater(
+                tg_key,
+                use_context=True,
+                request_kwargs={
+                    "read_timeout": self.polling_config.read_timeout,
+                    "connect_timeout": self.polling_config.connect_timeout,
+                },
+            )
+        self.admission = admission or AdmissionControl()
+        self.fetcher = UpdateFetcher(
+            self.updater, self.polling_config, self.admission.enter
         )
 
         bot: Bot = self.updater.bot
         dispatcher: Dispatcher = self.updater.dispatcher
-        self.scheduler = self.updater.job_queue.scheduler
+        self.scheduler = scheduler or self.updater.job_queue.scheduler
 
         try:
             logger.info(
@@ -81,10 +174,51 @@ class Session:
             ) from error
 
         self._tg_key = tg_key
+        self.bot_id = tg_key.split(":", 1)[0]  # token starts with bot id
+        self.memory_report_job = f"{self.MEMORY_REPORT_JOB}_{self.bot_id}"
+        self.cleaner = MessageCleaner(
+            bot, self.scheduler, job_id=f"message_cleaner_{self.bot_id}"
+        )
+        self.polls = PollRegistry(
+            self.cleaner, self.scheduler, job_id=f"polls_{self.bot_id}"
+        )
+        self.deduplicator = UpdateDeduplicator(state_path=update_state_path)
+        self.update_state_job = f"{self.UPDATE_STATE_JOB}_{self.bot_id}"
+        if update_state_path is not None:
+            self.scheduler.add_job(
+                self.deduplicator.save,
+                "interval",
+                id=self.update_state_job,
+                seconds=self.UPDATE_STATE_INTERVAL,
+                replace_existing=True,
+            )
+        self.chat_health = ChatHealth(
+            on_dead=self.drop_session, on_migrated=self.migrate_session
+        )
+        # replaced, never mutated: readers iterate without locking
         self.sessions: List[Handler] = []
+        self._sessions_lock = threading.Lock()
+        self.upload_slots: Optional[threading.BoundedSemaphore] = None
+        self.broadcast_admins = set(broadcast_admins or [])
+        if callback_executor is None and callback_workers > 0:
+            callback_executor = CallbackExecutor(
+                callback_workers, callback_timeout
+            )
+        self.callback_executor = callback_executor
+        if process_offloader is None and process_workers > 0:
+            process_offloader = ProcessOffloader(
+                process_workers, process_per_chat
+            )
+        self.process_offloader = process_offloader
         self.start_message_class: Optional[Type[ABCMessage]] = None
         self.start_message_args: Optional[List[Any]] = None
         self.navigation_handler_class: Optional[Type["Handler"]] = None
+        self.text_routing = False
+        self.deep_links = False
+        self.catalog: Optional[Catalog] = None
+        self.inline_cache_time = self.INLINE_CACHE_TIME
+        self.inline_max_results = self.INLINE_MAX_RESULTS
+        self.inline_results_cache = ContentCache(self.INLINE_CACHE_ENTRIES)
 
         # add command handlers
         dispatcher.add_handler(
@@ -92,7 +226,7 @@ class Session:
         )
 
         dispatcher.add_handler(
-            CommandHandler(broadcast_string, self._on_start_message)
+            CommandHandler(broadcast_string, self._on_broadcast_command)
         )
 
         dispatcher.add_handler(
@@ -112,6 +246,11 @@ class Session:
             telegram.ext.PollAnswerHandler(self._on_poll_answer)
         )
 
+        dispatcher.add_handler(
+            TypeHandler(Update, self._on_update_guard),
+            group=self.GUARD_GROUP,
+        )
+
         dispatcher.add_error_handler(self._on_error)
 
     def start(
@@ -121,6 +260,7 @@ class Session:
         polling: bool = True,
         idle: bool = False,
         navigation_handler_class: Optional[Type["Handler"]] = None,
+        backlog_policy: Optional[BacklogPolicy] = None,
     ) -> None:
         """
         Activate scheduler and dispatcher.
@@ -132,6 +272,8 @@ class Session:
             - idle: if True - blocks until one of the signals are
               received and stops the updater
             - handler_class: optional class extended base handler class
+            - backlog_policy: filter updates received while the bot was
+              offline, all of them are processed if None
         """
         self.start_message_class = start_message
         self.start_message_args = start_message_args
@@ -145,17 +287,64 @@ class Session:
             raise AttributeError("message_args is not a list!")
         if not issubclass(self.navigation_handler_class, Handler):
             raise AttributeError("handler must be a Handler type!")
+        self.upload_slots = threading.BoundedSemaphore(
+            self.navigation_handler_class.MAX_PARALLEL_UPLOADS
+        )
 
+        if self.text_routing:
+            self.menu_graph().index_labels()
+        if self.deep_links:
+            self.menu_graph().index_links()
         if not self.scheduler.running:
             self.scheduler.start()
         if polling:
-            self.updater.start_polling()
+            # acknowledge updates processed before a restart
+            offset = (
+                self.deduplicator.last_id + 1
+                if self.deduplicator.last_id
+                else 0
+            )
+            if backlog_policy is not None:
+                updates, offset = backlog_policy.drain(
+                    self.updater.bot, offset
+                )
+                for update in updates:
+                    self.fetcher.put(update)
+            self.fetcher.start(offset)
         if idle:
             self.updater.idle()
 
-    def _on_start_message(self, update: Update, _: CallbackContext) -> None:
+    def intake_metrics(self) -> Dict[str, float]:
+        """
+        Updates polling, queue and shedding counters.
+        """
+        return {**self.fetcher.meter.report(), **self.admission.report()}
+
+    def _on_update_guard(self, update: Update, _: CallbackContext) -> None:
         """
-        Start bot telegram session.
+        Stop processing of already processed updates, and of updates
+        shed by admission control. Mark sending chat as reachable.
+        """
+        shed_reason = self.admission.leave(update)
+        if self.deduplicator.is_duplicate(update.update_id):
+            logger.warning(f"Update {update.update_id} already processed")
+            raise DispatcherHandlerStop()
+        if shed_reason is not None:
+            logger.warning(f"Update {update.update_id} shed ({shed_reason})")
+            if update.callback_query is not None:
+                update.callback_query.answer(text=self.BUSY_TEXT)
+            raise DispatcherHandlerStop()
+        if update.effective_chat is not None:
+            # chat is active again, e.g. user unblocked the bot
+            self.chat_health.revive(update.effective_chat.id)
+
+    def _on_start_message(
+        self, update: Update, context: CallbackContext
+    ) -> None:
+        """
+        Start bot telegram session, at the deep linked menu if any.
+
+        A session already opened for the chat is closed and replaced.
         """
         chat = update.effective_chat
 
@@ -164,21 +353,273 @@ class Session:
         if self.navigation_handler_class is None:
             raise AttributeError("Error! Handler class not defined.")
 
+        with self._sessions_lock:
+            previous = [x for x in self.sessions if x.chat_id == chat.id]
+            self.sessions = [x for x in self.sessions if x.chat_id != chat.id]
+        for handler in previous:
+            handler.close()  # before its jobs names are reused
+
         session = self.navigation_handler_class(
-            self._tg_key, chat, self.scheduler
+            self._tg_key,
+            chat,
+            self.scheduler,
+            cleaner=self.cleaner,
+            callback_executor=self.callback_executor,
+            process_offloader=self.process_offloader,
+            chat_health=self.chat_health,
+            request=self.request,
+            menu_graph=self.menu_graph() if self.text_routing else None,
+            poll_registry=self.polls,
+            catalog=self.catalog,
+            locale=self._user_locale(update),
+            upload_slots=self.upload_slots,
         )
-        self.sessions.append(session)
-
+        with self._sessions_lock:
+            self.sessions = self.sessions + [session]
+        start_message = self._build_start_message(session)
+        node = None
+        if self.deep_links and context.args:
+            node = self.menu_graph().resolve_link(context.args[0])
+        if node is None or session.goto_path(node.path, start_message) is None:
+            session.goto_menu(start_message)
+
+    def _build_start_message(self, session: Handler) -> ABCMessage:
+        """
+        Create start message of a chat session.
+        """
         if self.start_message_class is None:
             raise AttributeError("Error! Message class not defined.")
         if self.start_message_args is not None:
-            start_message = self.start_message_class(
+            return self.start_message_class(
                 session, message_args=self.start_message_args
             )
+        return self.start_message_class(session)
+
+    def _build_prototype_menu(self) -> ABCMessage:
+        """
+        Create start message for a chat which is never messaged.
+        """
+        if self.navigation_handler_class is None:
+            raise AttributeError("Error! Handler class not defined.")
+        prototype = self.navigation_handler_class(
+            self._tg_key,
+            Chat(0, Chat.PRIVATE),
+            self.scheduler,
+            cleaner=self.cleaner,
+            request=self.request,
+            poll_registry=self.polls,
+        )
+        prototype.close()  # no jobs for the prototype chat
+        return self._build_start_message(prototype)
+
+    def menu_graph(self) -> MenuGraph:
+        """
+        Menus reachable from the start message, compiled once per process.
+        """
+        return MenuGraph.compile(
+            (self.start_message_class, repr(self.start_message_args)),
+            self._build_prototype_menu,
+        )
+
+    def enable_text_routing(self) -> None:
+        """
+        Open the menu whose label matches free text typed by users.
+
+        Text is routed unless the last message processes text input.
+        The menus graph is compiled when the session starts.
+        """
+        self.text_routing = True
+        if self.start_message_class is not None:
+            self.menu_graph().index_labels()
+
+    def enable_deep_links(self) -> None:
+        """
+        Open the menu linked by the /start command payload.
+
+        Links look like https://t.me/<bot>?start=<payload>, with payloads
+        given by MenuGraph.link_payload or the lower case menu class name.
+        Only the linked menu is sent: its parents are sent on "Back".
+        The links table is compiled when the session starts.
+        """
+        self.deep_links = True
+        if self.start_message_class is not None:
+            self.menu_graph().index_links()
+
+    def enable_translations(self, catalog: Catalog) -> None:
+        """
+        Translate buttons labels to the language of each user.
+
+        The user locale is read from its Telegram language code when its
+        session starts. Message contents are translated by update(), see
+        ABCMessage.translate.
+
+        Parameters:
+            - catalog: translations, compiled once for all sessions
+        """
+        self.catalog = catalog
+
+    def _user_locale(self, update: Update) -> str:
+        """
+        Supported locale of the user sending update.
+        """
+        if self.catalog is None:
+            return ""
+        user = update.effective_user
+        return self.catalog.locale(user.language_code if user else None)
+
+    def enable_inline_queries(
+        self,
+        cache_time: int = INLINE_CACHE_TIME,
+        max_results: int = INLINE_MAX_RESULTS,
+    ) -> None:
+        """
+        Answer inline queries with the menus matching the typed text.
+
+        Call before start: polled update types are set when it starts.
+        Inline mode must be enabled for the bot with @BotFather.
+
+        Parameters:
+            - cache_time: seconds Telegram and the session cache results
+            - max_results: number of results per query
+        """
+        self.inline_cache_time = cache_time
+        self.inline_max_results = max_results
+        self.updater.dispatcher.add_handler(
+            InlineQueryHandler(self._on_inline_query)
+        )
+
+    def _inline_results(self, query: str) -> List[InlineQueryResultArticle]:
+        """
+        Build inline results of menus matching query.
+        """
+        graph = self.menu_graph()
+        if query:
+            nodes = graph.search_index.search(query, self.inline_max_results)
         else:
-            start_message = self.start_message_class(session)
+            nodes = graph.nodes[1 : self.inline_max_results + 1]
+        return [
+            InlineQueryResultArticle(
+                id=str(index),
+                title=node.title,
+                description=node.content[: self.INLINE_DESCRIPTION_LENGTH],
+                input_message_content=InputTextMessageContent(
+                    node.content or node.title
+                ),
+            )
+            for index, node in enumerate(nodes)
+        ]
 
-        session.goto_menu(start_message)
+    def _on_inline_query(self, update: Update, _: CallbackContext) -> None:
+        """
+        Answer inline query from the recent queries cache or the index.
+        """
+        query = " ".join(words(update.inline_query.query))
+        results = self.inline_results_cache.get(
+            query,
+            lambda: self._inline_results(query),
+            self.inline_cache_time,
+        )
+        update.inline_query.answer(results, cache_time=self.inline_cache_time)
+
+    def drop_session(self, chat_id: int) -> None:
+        """
+        Remove session of chat and stop its pending work.
+        """
+        with self._sessions_lock:
+            session = next(
+                (x for x in self.sessions if x.chat_id == chat_id), None
+            )
+            if session is None:
+                return
+            self.sessions = [x for x in self.sessions if x is not session]
+        session.close()
+        self.cleaner.discard(chat_id)
+
+    def migrate_session(self, chat_id: int, new_chat_id: int) -> None:
+        """
+        Move session of a group chat to the supergroup it migrated to.
+        """
+        session = self.get_session(chat_id)
+        if session is None or session.chat_id != chat_id:
+            return
+        self.cleaner.discard(chat_id)
+        session.migrate_chat(new_chat_id)
+
+    def health_report(self) -> Dict[str, int]:
+        """
+        Sessions count and unreachable chats counters.
+        """
+        return {"sessions": len(self.sessions), **self.chat_health.report()}
+
+    def memory_report(
+        self, sample: Optional[int] = None, top: int = MEMORY_REPORT_TOP
+    ) -> Dict[str, Any]:
+        """
+        Deep memory size of sessions.
+
+        Walking a session costs about a millisecond, use sample to bound
+        the cost on large deployments: totals are then extrapolated.
+
+        Parameters:
+            - sample: number of sessions walked, picked randomly, all if
+              None
+            - top: number of heaviest walked sessions detailed
+
+        Returns:
+            - sessions count, walked count, bytes by category and
+              estimated total, heaviest sessions
+        """
+        sessions = self.sessions[:]
+        if sample is not None and sample < len(sessions):
+            sessions = random.sample(sessions, sample)
+        footprints = [
+            (x.chat_id, session_footprint(x, self.request is not None))
+            for x in sessions
+        ]
+
+        categories: Dict[str, int] = {}
+        for _, footprint in footprints:
+            for key, value in footprint.items():
+                categories[key] = categories.get(key, 0) + value
+        walked_total = categories.get("total", 0)
+        heaviest = sorted(footprints, key=lambda x: -x[1]["total"])[:top]
+        return {
+            "sessions": len(self.sessions),
+            "sampled": len(footprints),
+            "bytes": categories,
+            "estimated_total": (
+                round(walked_total * len(self.sessions) / len(footprints))
+                if footprints
+                else 0
+            ),
+            "top": [{"chat_id": x, **y} for x, y in heaviest],
+        }
+
+    def schedule_memory_report(
+        self,
+        interval: Optional[float] = MEMORY_REPORT_INTERVAL,
+        sample: Optional[int] = MEMORY_REPORT_SAMPLE,
+    ) -> None:
+        """
+        Log memory report periodically.
+
+        Parameters:
+            - interval: seconds between reports, None stops reporting
+            - sample: number of sessions walked by each report
+        """
+        if interval is None:
+            if self.scheduler.get_job(self.memory_report_job) is not None:
+                self.scheduler.remove_job(self.memory_report_job)
+            return
+        self.scheduler.add_job(
+            lambda: logger.info(
+                f"Memory report: {self.memory_report(sample=sample)}"
+            ),
+            "interval",
+            id=self.memory_report_job,
+            seconds=interval,
+            replace_existing=True,
+        )
 
     def get_session(self, chat_id: int = 0) -> Optional["Handler"]:
         """
@@ -226,22 +667,15 @@ class Session:
 
     def _on_poll_answer(self, update: Update, _: CallbackContext) -> None:
         """
-        Poll message for user session.
+        Route poll answer to its poll.
         """
-        if update.effective_user is None:
-            raise AttributeError("Error! user object not found.")
-
-        session = next(
-            (
-                x
-                for x in self.sessions
-                if x.user_name == update.effective_user.first_name
-            ),
-            None,
-        )
-
-        if session:
-            session.poll_answer(update.poll_answer.option_ids[0])
+        answer = update.poll_answer
+        if answer is None:
+            raise AttributeError("Error! Poll answer not found.")
+        if not answer.option_ids:
+            return  # vote retracted
+        if not self.polls.answer(answer.poll_id, answer.option_ids):
+            logger.debug(f"Answer to closed poll {answer.poll_id}")
 
     def _on_inline_callback(
         self, update: Update, context: CallbackContext
@@ -262,44 +696,112 @@ class Session:
             update.callback_query.data, update.callback_query.id
         )
 
-    def _on_broadcast_message(
-        self, message: str, notification: bool = True
-    ) -> List[telegram.Message]:
+    def broadcast(
+        self,
+        send: TypeSend,
+        max_workers: Optional[int] = None,
+        max_rate: Optional[float] = None,
+        on_done: Optional[Callable[[BroadcastJob], None]] = None,
+    ) -> BroadcastJob:
         """
-        Broadcast messages for all sessions.
+        Run a broadcast over all sessions in background.
+
+        Parameters:
+            - send: sends content to one session, returns sent message
+            - max_workers: number of parallel sends
+            - max_rate: max messages per second
+            - on_done: called when the broadcast is finished
+
+        Returns:
+            - job handle with progress, pause/resume and cancel
         """
-        messages = []
-        for session in self.sessions:
-            mes = session.send_message(message, notification=notification)
-            if mes is not None:
-                messages.append(mes)
-        return messages
+        job = BroadcastJob(
+            send,
+            iter(self.sessions[:]),  # sessions may be dropped meanwhile
+            max_workers=max_workers or self.BROADCAST_WORKERS,
+            max_rate=max_rate or self.BROADCAST_RATE,
+            total=len(self.sessions),
+            on_done=on_done,
+        )
+        return job.start()
 
-    def _on_broadcast_picture(
-        self, picture_path: str, notification: bool = True
-    ) -> List[telegram.Message]:
+    def broadcast_message(
+        self, message: str, notification: bool = True, **kwargs: Any
+    ) -> BroadcastJob:
         """
-        Broadcast picture messages.
+        Broadcast text message to all sessions.
         """
-        messages = []
-        for session in self.sessions:
-            mes = session.send_photo(picture_path, notification=notification)
-            if mes is not None:
-                messages.append(mes)
-        return messages
+        return self.broadcast(
+            lambda x: x.send_message(message, notification=notification),
+            **kwargs,
+        )
 
-    def _on_broadcast_sticker(
-        self, sticker_path: str, notification: bool = True
-    ) -> List[telegram.Message]:
+    def broadcast_picture(
+        self, picture_path: str, notification: bool = True, **kwargs: Any
+    ) -> BroadcastJob:
         """
-        Broadcast sticker messages.
+        Broadcast picture to all sessions.
         """
-        messages = []
-        for session in self.sessions:
-            mes = session.send_sticker(sticker_path, notification=notification)
-            if mes is not None:
-                messages.append(mes)
-        return messages
+        return self.broadcast(
+            lambda x: x.send_photo(picture_path, notification=notification),
+            **kwargs,
+        )
+
+    def broadcast_sticker(
+        self, sticker_path: str, notification: bool = True, **kwargs: Any
+    ) -> BroadcastJob:
+        """
+        Broadcast sticker to all sessions.
+        """
+        return self.broadcast(
+            lambda x: x.send_sticker(sticker_path, notification=notification),
+            **kwargs,
+        )
+
+    def broadcast_poll(
+        self,
+        question: str,
+        options: List[str],
+        group: str,
+        callback: TypePollCallback = None,
+        **kwargs: Any,
+    ) -> BroadcastJob:
+        """
+        Broadcast poll to all sessions, votes are counted by group.
+
+        Parameters:
+            - question: poll question
+            - options: answers texts
+            - group: votes key, read with polls.results(group)
+            - callback: called with each answer text
+        """
+        return self.broadcast(
+            lambda x: x.send_poll(question, options, callback, group),
+            **kwargs,
+        )
+
+    def _on_broadcast_command(
+        self, update: Update, context: CallbackContext
+    ) -> None:
+        """
+        Broadcast command text, allowed for admin chats only.
+        """
+        chat = update.effective_chat
+        if chat is None:
+            raise AttributeError("Error! Chat object not found.")
+        if chat.id not in self.broadcast_admins:
+            logger.warning(f"Broadcast refused for chat {chat.id}")
+            return
+        text = " ".join(context.args or [])
+        if not text:
+            return
+
+        def report(job: BroadcastJob) -> None:
+            self.updater.bot.send_message(
+                chat_id=chat.id, text=f"Broadcast done: {job.result()}"
+            )
+
+        self.broadcast_message(text, on_done=report)
 
     @staticmethod
     def _on_error(update: object, context: CallbackContext) -> None:
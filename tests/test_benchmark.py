@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from python_telegram_menu import benchmark
+
+BASELINE = Path(__file__).parent / "benchmark_baseline.json"
+
+
+def test_micro_cases_cover_hot_paths():
+    results = benchmark.run_micro(
+        keyboard_sizes=(2,), session_counts=(3,), min_time=0.0, repeat=1
+    )
+    assert set(results) == {
+        "emoji_replace",
+        "add_button[keyboard=2]",
+        "gen_keyboard_content[keyboard=2]",
+        "get_button[keyboard=2]",
+        "_message_check_changes[keyboard=2]",
+        "get_message[queue=2]",
+        "get_session[sessions=3]",
+    }
+    assert all(x > 0 for x in results.values())
+
+
+def test_regression_detected():
+    baseline = {"fast": 1e-6, "slow": 1e-6}
+    results = {"fast": 1.2e-6, "slow": 2e-6, "new": 1.0}
+    regressions = benchmark.check_regressions(results, baseline, 0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+
+
+def test_baseline_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    benchmark.save_baseline(path, {"case": 1.5e-6})
+    assert benchmark.load_baseline(path) == {"case": 1.5e-6}
+
+
+@pytest.mark.skipif(
+    "PTM_BENCHMARK" not in os.environ,
+    reason="timings depend on the machine, set PTM_BENCHMARK to check",
+)
+def test_hot_paths_within_baseline():
+    tolerance = float(os.environ.get("PTM_BENCHMARK") or benchmark.TOLERANCE)
+    results = benchmark.run_micro()
+    baseline = benchmark.load_baseline(BASELINE)
+    assert not benchmark.check_regressions(results, baseline, tolerance)
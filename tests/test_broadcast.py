@@ -0,0 +1,67 @@
+import threading
+from unittest import mock
+
+import telegram
+
+from python_telegram_menu import BroadcastJob
+
+
+def make_sessions(count):
+    return [mock.Mock(chat_id=i) for i in range(count)]
+
+
+def test_results_aggregated():
+    def send(session):
+        if session.chat_id % 10 == 0:
+            raise telegram.error.Unauthorized("blocked")
+        if session.chat_id % 10 == 1:
+            return None
+        return mock.Mock()
+
+    done = mock.Mock()
+    job = BroadcastJob(send, make_sessions(50), total=50, on_done=done)
+    assert job.start().wait(5)
+    assert job.result() == {
+        "total": 50,
+        "sent": 40,
+        "failed": 10,
+        "error_Unauthorized": 5,
+        "error_NotSent": 5,
+    }
+    assert job.progress == 1.0
+    done.assert_called_once_with(job)
+
+
+def test_pause_resume_cancel():
+    gate = threading.Event()
+
+    def send(_):
+        gate.wait(5)
+        return mock.Mock()
+
+    job = BroadcastJob(send, make_sessions(100), max_workers=2).start()
+    job.pause()
+    gate.set()
+    assert not job.wait(0.2)
+    assert job.paused
+    paused_done = job.done
+    assert paused_done <= 2
+
+    job.cancel()
+    assert job.wait(5)
+    assert job.cancelled
+    assert job.done == paused_done
+
+
+def test_unexpected_errors_counted():
+    def send(session):
+        if session.chat_id % 2:
+            raise OSError("file missing")
+        return mock.Mock()
+
+    done = mock.Mock()
+    job = BroadcastJob(send, make_sessions(10), max_workers=3, on_done=done)
+    assert job.start().wait(5)
+    assert job.result()["error_OSError"] == 5
+    assert job.sent == 5
+    done.assert_called_once_with(job)
@@ -0,0 +1,91 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from python_telegram_menu import ABCMessage
+from python_telegram_menu.cache import ContentCache, content_cache
+
+
+def test_single_flight():
+    cache = ContentCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "stats"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get("key", compute, 60))
+        )
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["stats"] * 8
+    assert len(calls) == 1
+
+
+def test_ttl_and_errors():
+    cache = ContentCache()
+    compute = mock.Mock(side_effect=["a", "b"])
+    with mock.patch("time.monotonic", return_value=10.0):
+        assert cache.get("key", compute, 5) == "a"
+        assert cache.get("key", compute, 5) == "a"
+    with mock.patch("time.monotonic", return_value=15.0):
+        assert cache.get("key", compute, 5) == "b"
+
+    with pytest.raises(ValueError):
+        cache.get("error", mock.Mock(side_effect=ValueError), 5)
+    assert cache.get("error", lambda: "ok", 5) == "ok"
+
+
+class Dashboard(ABCMessage):
+    UPDATE_CACHE_TTL = 60
+    computed = 0
+
+    def update(self) -> str:
+        Dashboard.computed += 1
+        return f"computed {time.monotonic()}"
+
+
+class SharedDashboard(Dashboard):
+    UPDATE_CACHE_SHARED = True
+
+
+def test_message_cache_scope():
+    content_cache.invalidate()
+    first = Dashboard(mock.Mock(chat_id=1), "stats")
+    second = Dashboard(mock.Mock(chat_id=2), "stats")
+    assert first.get_content() == first.get_content()
+    assert first.get_content() != second.get_content()
+    assert Dashboard.computed == 2
+
+    first = SharedDashboard(
+        mock.Mock(chat_id=1, locale="en", catalog=None), "stats"
+    )
+    second = SharedDashboard(
+        mock.Mock(chat_id=2, locale="en", catalog=None), "stats"
+    )
+    assert first.get_content() == second.get_content()
+    assert Dashboard.computed == 3
+
+    # shared contents are translated, they are cached per locale
+    third = SharedDashboard(
+        mock.Mock(chat_id=3, locale="fr", catalog=None), "stats"
+    )
+    assert third.get_content() != first.get_content()
+    assert Dashboard.computed == 4
@@ -0,0 +1,86 @@
+from unittest import mock
+
+import telegram
+
+from python_telegram_menu.cleanup import MessageCleaner
+
+
+def make_cleaner():
+    bot = mock.Mock()
+    bot.base_url = "https://api.telegram.org/botTOKEN"
+    scheduler = mock.Mock()
+    return MessageCleaner(bot, scheduler), bot, scheduler
+
+
+def test_flush_job_registered():
+    _, _, scheduler = make_cleaner()
+    assert scheduler.add_job.call_count == 1
+
+
+def test_batched_per_chat():
+    cleaner, bot, _ = make_cleaner()
+    for message_id in (10, 11, 12, 12):
+        cleaner.schedule(1, message_id)
+    cleaner.schedule(2, 20)
+    cleaner.schedule(2, -1)
+    assert cleaner.pending == 4
+
+    assert cleaner.flush() == 2
+    bot.request.post.assert_called_once_with(
+        f"{bot.base_url}/deleteMessages",
+        {"chat_id": 1, "message_ids": [10, 11, 12]},
+    )
+    bot.delete_message.assert_called_once_with(chat_id=2, message_id=20)
+    assert cleaner.pending == 0
+
+
+def test_fallback_to_single_deletions():
+    cleaner, bot, _ = make_cleaner()
+    bot.request.post.side_effect = telegram.error.TelegramError("Not Found")
+    cleaner.schedule(1, 10)
+    cleaner.schedule(1, 11)
+
+    assert cleaner.flush() == 3  # failed bulk request and 2 deletions
+    assert bot.delete_message.call_count == 2
+
+    cleaner.schedule(1, 12)
+    cleaner.schedule(1, 13)
+    cleaner.flush()
+    assert bot.request.post.call_count == 1
+    assert bot.delete_message.call_count == 4
+
+
+def test_flush_respects_budget():
+    cleaner, bot, _ = make_cleaner()
+    cleaner.MAX_CALLS_PER_FLUSH = 2
+    for chat_id in range(5):
+        cleaner.schedule(chat_id, 1)
+    assert cleaner.flush() == 2
+    assert cleaner.pending == 3
+
+
+def test_transient_bulk_error_requeued():
+    cleaner, bot, _ = make_cleaner()
+    bot.request.post.side_effect = [telegram.error.TimedOut(), None]
+    cleaner.schedule(1, 10)
+    cleaner.schedule(1, 11)
+
+    assert cleaner.flush() == 1
+    assert cleaner.pending == 2
+    bot.delete_message.assert_not_called()
+
+    assert cleaner.flush() == 1
+    assert cleaner.pending == 0
+    assert bot.request.post.call_count == 2
+
+
+def test_fallback_respects_budget():
+    cleaner, bot, _ = make_cleaner()
+    cleaner.MAX_CALLS_PER_FLUSH = 5
+    bot.request.post.side_effect = telegram.error.InvalidToken()
+    for message_id in range(10):
+        cleaner.schedule(1, message_id)
+
+    assert cleaner.flush() == 5
+    assert bot.delete_message.call_count == 4
+    assert cleaner.pending == 6
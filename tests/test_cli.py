@@ -1,3 +1,4 @@
+import json
 import shlex
 import python_telegram_menu
 import time
@@ -14,3 +15,33 @@ def test_version(script_runner):
     assert ret.stderr == ""
     # make sure it took less than a second
     assert elapsed < 1.0
+
+
+def test_bench_json(script_runner):
+    command = "python_telegram_menu bench --chats 2 --rounds 1 --json"
+    ret = script_runner.run(*shlex.split(command))
+    assert ret.success
+    metrics = json.loads(ret.stdout)
+    assert metrics["updates"] == 10
+    assert metrics["api_calls"] > 0
+
+
+def test_profile_lists_package_functions(script_runner):
+    command = "python_telegram_menu profile --chats 2 --rounds 1 --top 5"
+    ret = script_runner.run(*shlex.split(command))
+    assert ret.success
+    assert "select_menu_button" in ret.stdout
+
+
+def test_memory_per_session(script_runner):
+    command = "python_telegram_menu memory --chats 3 --rounds 1 --json"
+    ret = script_runner.run(*shlex.split(command))
+    assert ret.success
+    assert json.loads(ret.stdout)["sessions"] == 3
+
+
+def test_save_baseline_requires_baseline(script_runner):
+    command = "python_telegram_menu bench --micro --save-baseline"
+    ret = script_runner.run(*shlex.split(command))
+    assert not ret.success
+    assert "--save-baseline requires --baseline" in ret.stderr
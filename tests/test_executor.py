@@ -0,0 +1,131 @@
+import threading
+from unittest import mock
+
+import pytest
+from telegram import Chat
+
+from python_telegram_menu import ABCMessage, ButtonTypes, Handler
+from python_telegram_menu.executor import CallbackExecutor, ProcessOffloader
+
+
+def test_result_delivered():
+    executor = CallbackExecutor(max_workers=2, timeout=5)
+    delivered = threading.Event()
+    on_result = mock.Mock(side_effect=lambda _: delivered.set())
+    on_timeout = mock.Mock()
+
+    executor.submit(lambda: "chart.png", on_result, on_timeout)
+    assert delivered.wait(5)
+    on_result.assert_called_once_with("chart.png")
+    on_timeout.assert_not_called()
+
+
+def test_late_result_dropped():
+    executor = CallbackExecutor(max_workers=1, timeout=0.05)
+    release = threading.Event()
+    timed_out = threading.Event()
+    on_result = mock.Mock()
+
+    future = executor.submit(lambda: release.wait(5), on_result, timed_out.set)
+    assert timed_out.wait(5)
+    release.set()
+    future.result(5)
+    on_result.assert_not_called()
+
+
+def test_process_offloader_per_chat_limit():
+    offloader = ProcessOffloader(max_workers=1, per_chat_limit=1)
+    try:
+        assert offloader.run(1, sum, [1, 2, 3]) == 6
+        assert not offloader.busy(1)
+
+        release = threading.Event()
+        with mock.patch.object(offloader, "_pool") as pool:
+            pool.submit.return_value.result.side_effect = release.wait
+            worker = threading.Thread(target=offloader.run, args=(1, sum))
+            worker.start()
+            while not offloader.busy(1):
+                pass
+            with pytest.raises(RuntimeError):
+                offloader.run(1, sum, [1])
+            assert not offloader.busy(2)
+            release.set()
+            worker.join(5)
+        assert not offloader.busy(1)
+    finally:
+        offloader.shutdown()
+
+
+class ReportMessage(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "report", inlined=True)
+        self.add_button(
+            "Sum", sum, ButtonTypes.MESSAGE, [1, 2], cpu_bound=True
+        )
+        self.add_button(
+            "Max", max, ButtonTypes.MESSAGE, [1, 2], cpu_bound=True
+        )
+
+    def update(self) -> str:
+        return "report"
+
+
+def test_cpu_bound_buttons_offloaded():
+    handler = Handler("123:ABC", Chat(1, "private"), mock.Mock())
+    handler._bot = mock.MagicMock()
+    handler.process_offloader = mock.Mock()
+    handler.process_offloader.busy.return_value = False
+    handler.process_offloader.run.return_value = "3"
+    message = ReportMessage(handler)
+    assert [y.cpu_bound for x in message.keyboard for y in x] == [True, True]
+
+    handler._send_app_message(message, "report")
+    markup = handler._bot.send_message.call_args.kwargs["reply_markup"]
+    for button in markup.inline_keyboard[0]:
+        handler.app_message_button_callback(button.callback_data, "query")
+    assert handler.process_offloader.run.call_args_list == [
+        mock.call(1, sum, [1, 2]),
+        mock.call(1, max, [1, 2]),
+    ]
+
+
+def test_queued_callback_skipped_after_timeout():
+    executor = CallbackExecutor(max_workers=1, timeout=0.05)
+    release = threading.Event()
+    timed_out = threading.Event()
+    queued = mock.Mock()
+
+    first = executor.submit(lambda: release.wait(5), mock.Mock())
+    second = executor.submit(queued, mock.Mock(), timed_out.set)
+    assert timed_out.wait(5)
+    release.set()
+    first.result(5)
+    second.result(5)
+    queued.assert_not_called()
+
+
+def test_pending_callbacks_bounded():
+    executor = CallbackExecutor(max_workers=1, timeout=5, max_pending=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    running = executor.submit(block, mock.Mock())
+    assert started.wait(5)
+    queued = executor.submit(lambda: None, mock.Mock())
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda: None, mock.Mock())
+    release.set()
+    running.result(5)
+    queued.result(5)
+    assert executor.pending == 0
+
+
+def test_send_failure_logged(caplog):
+    executor = CallbackExecutor(max_workers=1, timeout=5)
+    on_result = mock.Mock(side_effect=OSError("network down"))
+    executor.submit(lambda: "chart.png", on_result).result(5)
+    assert "network down" in caplog.text
@@ -0,0 +1,184 @@
+import os
+import time
+from unittest import mock
+
+import pytest
+from telegram import Chat
+from telegram.error import BadRequest, ChatMigrated, TimedOut, Unauthorized
+
+from python_telegram_menu import ABCMessage, Handler, Session
+from python_telegram_menu.guards import AdmissionControl, ChatHealth
+from python_telegram_menu.guards import ChatUnreachable
+from python_telegram_menu.guards import GuardedBot, UpdateDeduplicator
+from python_telegram_menu.replay import StubRequest
+
+
+def test_duplicates_detected():
+    deduplicator = UpdateDeduplicator()
+    assert not deduplicator.is_duplicate(1)
+    assert not deduplicator.is_duplicate(2)
+    assert deduplicator.is_duplicate(1)
+    assert deduplicator.duplicates == 1
+
+
+def test_capacity_bounded():
+    deduplicator = UpdateDeduplicator(capacity=3)
+    for update_id in range(5):
+        assert not deduplicator.is_duplicate(update_id)
+    assert deduplicator.is_duplicate(4)
+    assert not deduplicator.is_duplicate(0)
+    assert len(deduplicator._ids) == 3
+
+
+def test_blocked_chat_marked_dead():
+    on_dead = mock.Mock()
+    health = ChatHealth(on_dead=on_dead)
+    bot = mock.Mock()
+    bot.send_message.side_effect = Unauthorized("bot was blocked by the user")
+    guarded = GuardedBot(bot, 10, health)
+
+    with pytest.raises(Unauthorized):
+        guarded.send_message(chat_id=10, text="hi")
+    on_dead.assert_called_once_with(10)
+    with pytest.raises(ChatUnreachable):
+        guarded.send_message(chat_id=10, text="hi")
+    assert bot.send_message.call_count == 1
+    assert health.report()["dead"] == 1
+
+    health.revive(10)
+    assert health.allows(10)
+
+
+def test_circuit_opens_on_transient_errors():
+    health = ChatHealth()
+    for _ in range(health.FAILURE_THRESHOLD - 1):
+        health.record_failure(1, TimedOut())
+    health.record_failure(1, BadRequest("Message is not modified"))
+    assert health.allows(1)
+
+    health.record_failure(1, TimedOut())
+    assert not health.allows(1)
+    with mock.patch("time.monotonic", return_value=10**9):
+        assert health.allows(1)
+
+
+def _update(chat_id, callback=False):
+    update = mock.Mock()
+    update.effective_chat.id = chat_id
+    update.callback_query = mock.Mock() if callback else None
+    return update
+
+
+def test_admission_sheds_stale_chat_updates():
+    admission = AdmissionControl(max_per_chat=2, max_pending=100)
+    updates = [_update(1, callback=True) for _ in range(4)]
+    for update in updates:
+        admission.enter(update)
+    assert admission.leave(updates[0]) == "chat"
+    assert admission.leave(updates[1]) == "chat"
+    assert admission.leave(updates[2]) is None
+    assert admission.report() == {
+        "pending": 1,
+        "shed_chat": 2,
+        "shed_global": 0,
+    }
+
+
+def test_chat_limit_admits_navigation():
+    admission = AdmissionControl(max_per_chat=2, max_pending=100)
+    for _ in range(3):
+        admission.enter(_update(1, callback=True))
+    admission.enter(_update(1))
+    assert admission.leave(_update(1, callback=True)) == "chat"
+    # "Back" queued behind callbacks of the same chat is still processed
+    assert admission.leave(_update(1)) is None
+    for _ in range(4):
+        admission.enter(_update(1))
+    assert admission.leave(_update(1)) == "chat"
+
+
+def test_admission_prefers_navigation():
+    admission = AdmissionControl(max_per_chat=10, max_pending=2)
+    for chat_id in range(3):
+        admission.enter(_update(chat_id))
+    assert admission.leave(_update(0)) is None
+    assert admission.leave(_update(1, callback=True)) is None
+    admission.enter(_update(4))
+    admission.enter(_update(5))
+    assert admission.leave(_update(2, callback=True)) == "global"
+    assert admission.leave(_update(6)) is None
+
+
+def test_token_errors_do_not_kill_chats():
+    on_dead = mock.Mock()
+    health = ChatHealth(on_dead=on_dead)
+    health.record_failure(1, Unauthorized("Unauthorized"))
+    assert health.allows(1)
+    health.record_failure(2, Unauthorized("Forbidden: bot was kicked"))
+    on_dead.assert_called_once_with(2)
+
+
+def test_migrated_chat_session_moved():
+    session = Session("326:XYZ", request=StubRequest())
+    handler = Handler(
+        "326:XYZ",
+        Chat(-1, "group"),
+        session.scheduler,
+        cleaner=session.cleaner,
+        chat_health=session.chat_health,
+        request=session.request,
+    )
+    session.sessions = [handler]
+    session.chat_health.record_failure(-1, ChatMigrated(-100))
+    assert handler.chat_id == -100
+    assert handler._bot.chat_id == -100
+    assert session.chat_health.allows(-100)
+    assert session.get_session(-100) is handler
+
+    sessions = session.sessions
+    session.drop_session(-100)
+    assert session.sessions == []
+    assert sessions == [handler]  # readers keep a consistent list
+
+
+def test_processed_updates_skipped_after_restart(tmp_path):
+    state = str(tmp_path / "updates")
+    deduplicator = UpdateDeduplicator(state_path=state)
+    for update_id in (7, 9, 8):
+        assert not deduplicator.is_duplicate(update_id)
+    deduplicator.save()
+
+    restarted = UpdateDeduplicator(state_path=state)
+    assert restarted.last_id == 9
+    assert not restarted.is_duplicate(10)
+    assert restarted.is_duplicate(10)
+
+    # ids picked again by Telegram below the saved one are processed
+    assert not restarted.is_duplicate(3)
+    assert not restarted.is_duplicate(4)
+
+    # state left untouched for more than a week is ignored
+    restarted.save()
+    week_ago = time.time() - UpdateDeduplicator.STATE_TTL - 1
+    os.utime(state, (week_ago, week_ago))
+    assert UpdateDeduplicator(state_path=state).last_id == 0
+
+
+def test_polling_resumes_after_saved_update(tmp_path):
+    state = tmp_path / "updates"
+    state.write_text("41")
+    session = Session(
+        "327:XYZ", request=StubRequest(), update_state_path=str(state)
+    )
+    assert session.scheduler.get_job(session.update_state_job) is not None
+    with mock.patch.object(session.fetcher, "start") as start:
+        session.start(
+            SimpleMessage, polling=True, navigation_handler_class=Handler
+        )
+    session.scheduler.shutdown(wait=False)
+    start.assert_called_once_with(42)
+
+
+class SimpleMessage(ABCMessage):
+    def update(self):
+        return "home"
@@ -0,0 +1,48 @@
+from unittest import mock
+
+from telegram import Chat
+
+from python_telegram_menu import ABCMessage, Handler
+
+
+class LiveMessage(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "live", inlined=True)
+        self.pause = False
+        self.value = 0
+
+    def toggle(self) -> str:
+        self.pause = not self.pause
+        return "toggled"
+
+    def update(self) -> str:
+        self.keyboard = [[]]
+        self.add_button(":pause_button:" if self.pause else ":play_button:")
+        return f"value {self.value}"
+
+
+def make_handler():
+    handler = Handler("123:ABC", Chat(1, "private"), mock.Mock())
+    handler._bot = mock.MagicMock()
+    return handler
+
+
+def test_partial_edits():
+    handler = make_handler()
+    message = LiveMessage(handler)
+    handler._send_app_message(message, "live")
+    bot = handler._bot
+
+    assert not message.edit_message()
+
+    message.toggle()
+    assert message.edit_message()
+    bot.edit_message_reply_markup.assert_called_once()
+    bot.edit_message_text.assert_not_called()
+
+    message.value = 1
+    assert message.edit_message()
+    kwargs = bot.edit_message_text.call_args.kwargs
+    assert kwargs["text"] == "value 1"
+    assert kwargs["chat_id"] == 1
+    assert bot.edit_message_reply_markup.call_count == 1
@@ -0,0 +1,127 @@
+import datetime
+import json
+from unittest import mock
+
+import pytest
+
+from telegram import Chat, Message, MessageEntity, Update, User
+
+from python_telegram_menu import ABCMessage, Catalog, Handler, Session
+from python_telegram_menu.replay import StubRequest
+
+CATALOG = {
+    "fr": {":gear: Settings": ":gear: Paramètres", "Back": "Retour"},
+    "de": {"Back": "Zurück"},
+}
+
+
+class Settings(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "settings")
+        self.add_button_back()
+
+    def update(self):
+        return self.translate("Settings")
+
+
+class Home(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "home")
+        self.add_button(":gear: Settings", Settings(handler))
+
+    def update(self):
+        return "Home"
+
+
+def test_catalog_locales():
+    catalog = Catalog(CATALOG)
+    assert catalog.locale("fr-CA") == "fr"
+    assert catalog.locale("DE") == "de"
+    assert catalog.locale("es") == "en"
+    assert catalog.locale(None) == "en"
+    assert catalog.translate(":gear: Settings", "fr") == "⚙️ Paramètres"
+    assert catalog.source("⚙️ Paramètres", "fr") == "⚙️ Settings"
+    assert catalog.translate("Back", "en") == "Back"
+
+
+def test_catalog_from_directory(tmp_path):
+    (tmp_path / "fr.json").write_text('{"Back": "Retour"}', encoding="utf-8")
+    catalog = Catalog.from_directory(tmp_path)
+    assert catalog.locales == {"en", "fr"}
+    assert catalog.translate("Back", "fr") == "Retour"
+
+
+def _update(update_id, text, chat_id, language_code, bot):
+    entities = []
+    if text.startswith("/"):
+        entities = [MessageEntity(MessageEntity.BOT_COMMAND, 0, len(text))]
+    user = User(chat_id, "Bob", False, language_code=language_code)
+    message = Message(
+        update_id,
+        datetime.datetime.now(),
+        Chat(chat_id, "private", first_name="Bob"),
+        from_user=user,
+        text=text,
+        entities=entities,
+        bot=bot,
+    )
+    return Update(update_id, message=message)
+
+
+def test_translated_menus():
+    request = StubRequest()
+    session = Session("324:XYZ", request=request)
+    session.enable_translations(Catalog(CATALOG))
+    session.start(Home, polling=False, navigation_handler_class=Handler)
+    session.scheduler.shutdown(wait=False)
+    update_ids = iter(range(1, 100))
+
+    def dispatch(text, chat_id, language_code):
+        count = len(request.calls)
+        update = _update(
+            next(update_ids), text, chat_id, language_code, session.updater.bot
+        )
+        session.updater.dispatcher.process_update(update)
+        return request.calls[count:]
+
+    def buttons(call):
+        keyboard = json.loads(call[1]["reply_markup"])["keyboard"]
+        return [y["text"] for x in keyboard for y in x]
+
+    assert buttons(dispatch("/start", 1, "fr")[0]) == ["⚙️ Paramètres"]
+    assert buttons(dispatch("/start", 2, "fr-CA")[0]) == ["⚙️ Paramètres"]
+    assert buttons(dispatch("/start", 3, "es")[0]) == ["⚙️ Settings"]
+
+    call = dispatch("⚙️ Paramètres", 1, "fr")[0]
+    assert call[1]["text"] == "Settings"
+    assert buttons(call) == ["Retour"]
+    assert dispatch("Retour", 1, "fr")[0][1]["text"] == "Home"
+
+    # reply markups are shared by users of a locale
+    first, second, third = (
+        session.get_session(x)._menu_queue[0] for x in (1, 2, 3)
+    )
+    markup = first.gen_keyboard_content()
+    assert second.gen_keyboard_content() is markup
+    assert third.gen_keyboard_content() is not markup
+
+
+def test_catalog_collision():
+    with pytest.raises(AttributeError):
+        Catalog({"fr": {"Back": "Retour", "Return": "Retour"}})
+
+
+def test_keyboards_per_catalog():
+    menus = []
+    for back in ("Retour", "Arrière"):
+        handler = Handler(
+            "325:XYZ",
+            Chat(len(menus), "private"),
+            mock.Mock(),
+            catalog=Catalog({"fr": {"Back": back}}),
+            locale="fr",
+        )
+        menus.append(Settings(handler))
+    first, second = (x.gen_keyboard_content() for x in menus)
+    assert first.keyboard[0][0].text == "Retour"
+    assert second.keyboard[0][0].text == "Arrière"
@@ -0,0 +1,67 @@
+import datetime
+import threading
+
+import pytest
+from telegram import Chat, Message, Update, User
+
+from python_telegram_menu import ABCMessage, Handler, SessionManager
+from python_telegram_menu.replay import StubRequest
+
+
+class StartMenu(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "start")
+
+    def update(self):
+        return "start"
+
+
+def _update(update_id, chat_id, text):
+    chat = Chat(chat_id, "private", first_name="Alice")
+    message = Message(
+        update_id,
+        datetime.datetime.now(),
+        chat,
+        from_user=User(chat_id, "Alice", False),
+        text=text,
+    )
+    return Update(update_id, message=message)
+
+
+def test_bots_share_infrastructure():
+    request = StubRequest()
+    manager = SessionManager(dispatch_workers=2, request=request)
+    first = manager.add_session("111:AAA")
+    second = manager.add_session("222:BBB")
+    with pytest.raises(AttributeError):
+        manager.add_session("111:CCC")
+    for session in (first, second):
+        session.start(
+            StartMenu, polling=False, navigation_handler_class=Handler
+        )
+    manager.start()
+    workers = [x for x in threading.enumerate() if x.name[:9] == "dispatch_"]
+    assert len(workers) == 2
+    assert "update_fetcher" not in [x.name for x in threading.enumerate()]
+
+    # same user talking to both bots
+    manager.dispatch(first, _update(1, 5, "/start"))
+    manager.dispatch(second, _update(1, 5, "/start"))
+    manager.join()
+
+    assert first.scheduler is second.scheduler is manager.scheduler
+    assert first.updater.bot.request is second.updater.bot.request
+    assert len(first.sessions) == len(second.sessions) == 1
+    assert first.sessions[0].expiry_job_name != (
+        second.sessions[0].expiry_job_name
+    )
+    assert manager.scheduler.get_job(first.sessions[0].expiry_job_name)
+    assert manager.scheduler.get_job(second.sessions[0].expiry_job_name)
+    sent = [x for x in request.calls if x[0] == "sendMessage"]
+    assert len(sent) == 2
+
+    manager.remove_session(first.bot_id)
+    assert not first.sessions
+    assert list(manager.sessions) == [second.bot_id]
+    assert manager.scheduler.get_job(second.sessions[0].expiry_job_name)
+    manager.stop()
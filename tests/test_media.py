@@ -0,0 +1,160 @@
+import os
+import threading
+from pathlib import Path
+from unittest import mock
+
+from apscheduler.schedulers.background import BackgroundScheduler
+import pytz
+from telegram import Chat
+
+from python_telegram_menu import Handler, Session
+from python_telegram_menu.core import Button, ButtonTypes
+from python_telegram_menu.media import MediaValidationCache
+from python_telegram_menu.replay import StubRequest
+
+
+def test_local_file_revalidated_on_change(tmp_path):
+    picture = tmp_path / "chart.png"
+    picture.write_bytes(b"data")
+    validate = mock.Mock(side_effect=Path)
+    cache = MediaValidationCache()
+
+    assert cache.resolve("picture", str(picture), validate) == picture
+    assert cache.resolve("picture", str(picture), validate) == picture
+    assert validate.call_count == 1
+
+    stat = picture.stat()
+    os.utime(picture, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.resolve("picture", str(picture), validate)
+    assert validate.call_count == 2
+
+
+def test_url_expires_after_ttl():
+    url = "https://example.com/chart.png"
+    validate = mock.Mock(return_value=url)
+    cache = MediaValidationCache()
+
+    with mock.patch("time.monotonic", return_value=100.0):
+        cache.resolve("picture", url, validate)
+        cache.resolve("picture", url, validate)
+    assert validate.call_count == 1
+    assert cache.hits == 1
+
+    with mock.patch("time.monotonic", return_value=100.0 + cache.URL_TTL):
+        cache.resolve("picture", url, validate)
+    assert validate.call_count == 2
+
+
+def test_kinds_and_size_bounded():
+    cache = MediaValidationCache()
+    cache.MAX_ENTRIES = 2
+    validate = mock.Mock(return_value=None)
+    cache.resolve("picture", "a", validate)
+    cache.resolve("sticker", "a", validate)
+    cache.resolve("picture", "b", validate)
+    assert validate.call_count == 3
+
+    cache.resolve("picture", "a", validate)
+    assert validate.call_count == 4
+
+
+def _stub_handler(request):
+    scheduler = BackgroundScheduler(timezone=pytz.utc)
+    chat = Chat(1, Chat.PRIVATE, first_name="Bob")
+    return Handler("328:XYZ", chat, scheduler, request=request)
+
+
+def test_local_media_streamed(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"\x00" * 16)
+    document = tmp_path / "report.pdf"
+    document.write_bytes(b"%PDF")
+    request = StubRequest()
+    handler = _stub_handler(request)
+
+    assert handler.send_video(str(video)) is not None
+    assert handler.send_document(str(document), notification=False)
+    (method, video_data), (doc_method, doc_data) = request.calls
+    assert method == "sendVideo"
+    assert video_data["video"] == "<file clip.mp4>"
+    assert doc_method == "sendDocument"
+    assert doc_data["document"] == "<file report.pdf>"
+    assert doc_data["disable_notification"] is True
+
+    # urls are passed to Telegram as they are
+    handler.send_video("https://example.com/clip.mp4")
+    assert request.calls[-1][1]["video"] == "https://example.com/clip.mp4"
+
+
+class TwoUploadsHandler(Handler):
+    MAX_PARALLEL_UPLOADS = 2
+    UPLOAD_TIMEOUT = 0.2
+
+
+def test_upload_waits_for_slot(tmp_path):
+    document = tmp_path / "report.pdf"
+    document.write_bytes(b"%PDF")
+    request = StubRequest()
+    scheduler = BackgroundScheduler(timezone=pytz.utc)
+    chat = Chat(1, Chat.PRIVATE, first_name="Bob")
+    handler = TwoUploadsHandler("328:XYZ", chat, scheduler, request=request)
+    slots = handler.upload_slots
+    assert slots.acquire(blocking=False) and slots.acquire(blocking=False)
+    assert not slots.acquire(blocking=False)
+
+    # a slot released in time is taken
+    threading.Timer(0.05, slots.release).start()
+    assert handler.send_document(str(document)) is not None
+    assert request.calls[0][0] == "sendDocument"
+
+    # no slot released, the failure is reported
+    assert slots.acquire(blocking=False)
+    button = Button("Doc", button_type=ButtonTypes.DOCUMENT)
+    answer = handler._send_button_result(button, str(document))
+    assert answer == Handler.SEND_FAILED_TEXT
+    assert len(request.calls) == 1
+
+    handler._on_button_result(button, str(document))
+    assert request.calls[-1][1]["text"] == f"Doc: {answer}"
+
+
+def test_broadcast_waits_for_upload_slots(tmp_path):
+    picture = tmp_path / "chart.png"
+    picture.write_bytes(b"data")
+    request = StubRequest(latency=0.05)
+    session = Session("331:XYZ", request=request)
+    slots = threading.BoundedSemaphore(2)
+    for chat_id in range(8):
+        handler = Handler(
+            "331:XYZ",
+            Chat(chat_id, Chat.PRIVATE, first_name="Bob"),
+            session.scheduler,
+            cleaner=session.cleaner,
+            request=request,
+            poll_registry=session.polls,
+            upload_slots=slots,
+        )
+        session.sessions.append(handler)
+
+    job = session.broadcast_picture(str(picture), max_workers=8)
+    assert job.wait(5)
+    assert job.result()["sent"] == 8
+    assert [x[0] for x in request.calls].count("sendPhoto") == 8
+
+
+def test_media_buttons_send_files(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"\x00" * 16)
+    document = tmp_path / "report.pdf"
+    document.write_bytes(b"%PDF")
+    request = StubRequest()
+    handler = _stub_handler(request)
+
+    buttons = [
+        (Button("Video", button_type=ButtonTypes.VIDEO), str(video)),
+        (Button("Doc", button_type=ButtonTypes.DOCUMENT), str(document)),
+    ]
+    answers = [handler._send_button_result(x, y) for x, y in buttons]
+    assert answers == ["Video sent!", "Document sent!"]
+    assert [x[0] for x in request.calls] == ["sendVideo", "sendDocument"]
+    assert request.calls[1][1]["document"] == "<file report.pdf>"
@@ -0,0 +1,44 @@
+from python_telegram_menu.benchmark import Workload, run
+from python_telegram_menu.memory import deep_size, session_footprint
+
+
+def test_deep_size_counts_once():
+    shared = ["x" * 1000]
+    seen = set()
+    first = deep_size({"a": shared}, seen)
+    assert first > 1000
+    assert deep_size({"b": shared}, seen) < 1000
+
+
+def test_memory_report():
+    workload = Workload(chats=4, rounds=2)
+    session = workload.session()
+    run(workload, session)
+    session.scheduler.shutdown(wait=False)
+
+    footprint = session_footprint(session.sessions[0], shared_bot=True)
+    assert footprint["menu_stack"] > 0
+    assert footprint["inline_queue"] > 0
+    assert footprint["cached_markup"] > 0
+    assert footprint["total"] == sum(
+        v for k, v in footprint.items() if k != "total"
+    )
+
+    report = session.memory_report(top=2)
+    assert report["sessions"] == report["sampled"] == 4
+    assert len(report["top"]) == 2
+    assert report["top"][0]["total"] >= report["top"][1]["total"]
+    assert report["estimated_total"] == report["bytes"]["total"]
+
+    sampled = session.memory_report(sample=2)
+    assert sampled["sampled"] == 2
+    assert sampled["estimated_total"] > sampled["bytes"]["total"]
+
+
+def test_memory_report_job():
+    session = Workload(chats=0).session()
+    session.schedule_memory_report(interval=60, sample=10)
+    assert session.scheduler.get_job(session.memory_report_job)
+    session.schedule_memory_report(interval=None)
+    assert not session.scheduler.get_job(session.memory_report_job)
+    session.scheduler.shutdown(wait=False)
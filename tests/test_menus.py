@@ -0,0 +1,153 @@
+import datetime
+
+from telegram import Chat, Message, MessageEntity, Update, User
+
+from python_telegram_menu import ABCMessage, Handler, Session
+from python_telegram_menu.replay import StubRequest
+
+
+class Language(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "language")
+
+    def update(self):
+        self.keyboard = [[]]
+        self.add_button_back()
+        return "Choose language"
+
+
+class Settings(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "settings")
+        self.language = Language(handler)
+
+    def update(self):
+        self.keyboard = [[]]
+        self.add_button(":globe_with_meridians: Language", self.language)
+        self.add_button_back()
+        return "Settings"
+
+
+class Feedback(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "feedback")
+        self.received = []
+
+    def text_input(self, text):
+        self.received.append(text)
+
+    def update(self):
+        return "Type your feedback"
+
+
+class Home(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "home")
+        self.add_button("Settings", Settings(handler))
+        self.add_button("Statistics", Settings(handler))
+        self.add_button("Feedback", Feedback(handler))
+
+    def update(self):
+        return "Home"
+
+
+def _update(update_id, text, chat_id=9, bot=None):
+    entities = []
+    if text.startswith("/"):
+        command = text.split()[0]
+        entities = [MessageEntity(MessageEntity.BOT_COMMAND, 0, len(command))]
+    message = Message(
+        update_id,
+        datetime.datetime.now(),
+        Chat(chat_id, "private", first_name="Bob"),
+        from_user=User(chat_id, "Bob", False),
+        text=text,
+        entities=entities,
+        bot=bot,
+    )
+    return Update(update_id, message=message)
+
+
+def test_free_text_opens_menu():
+    request = StubRequest()
+    session = Session("321:XYZ", request=request)
+    session.enable_text_routing()
+    session.start(Home, polling=False, navigation_handler_class=Handler)
+    session.scheduler.shutdown(wait=False)
+    graph = session.menu_graph()
+    assert graph.route("hello") is None
+    assert graph.route("hi") is None
+    assert graph.route("Language") is None  # under two menus
+
+    texts = []
+
+    def dispatch(text):
+        count = len(request.calls)
+        update_id = len(texts) + 1
+        texts.append(text)
+        session.updater.dispatcher.process_update(_update(update_id, text))
+        return [x[1].get("text") for x in request.calls[count:]]
+
+    assert dispatch("/start") == ["Home"]
+    handler = session.get_session(9)
+    assert dispatch("settings") == ["Settings"]
+    assert dispatch("statistcs") == ["Settings"]
+    assert [x.label for x in handler._menu_queue] == ["home", "settings"]
+
+    assert dispatch("Back") == ["Home"]
+    assert dispatch("unknown words") == []
+
+    assert dispatch("feedback") == ["Type your feedback"]
+    assert dispatch("settings") == []
+    assert handler._menu_queue[-1].received == ["settings"]
+
+
+def test_deep_link_opens_menu():
+    request = StubRequest()
+    session = Session("322:XYZ", request=request)
+    session.enable_deep_links()
+    session.start(Home, polling=False, navigation_handler_class=Handler)
+    session.scheduler.shutdown(wait=False)
+    links = session.menu_graph().index_links()
+    assert "settings-language" in links
+    assert "feedback" in links
+    assert "language" not in links  # class opening two menus
+
+    def dispatch(update_id, text, chat_id):
+        count = len(request.calls)
+        update = _update(update_id, text, chat_id, session.updater.bot)
+        session.updater.dispatcher.process_update(update)
+        return [x[1].get("text") for x in request.calls[count:]]
+
+    assert dispatch(1, "/start statistics-language", 1) == ["Choose language"]
+    handler = session.get_session(1)
+    labels = [x.label for x in handler._menu_queue]
+    assert labels == ["home", "settings", "language"]
+    assert dispatch(2, "Back", 1) == ["Settings"]
+    assert dispatch(3, "Back", 1) == ["Home"]
+
+    assert dispatch(4, "/start unknown", 2) == ["Home"]
+    assert dispatch(5, "/start", 3) == ["Home"]
+
+
+def test_deep_link_in_open_chat():
+    request = StubRequest()
+    session = Session("332:XYZ", request=request)
+    session.enable_deep_links()
+    session.start(Home, polling=False, navigation_handler_class=Handler)
+    session.scheduler.shutdown(wait=False)
+
+    def dispatch(update_id, text):
+        count = len(request.calls)
+        update = _update(update_id, text, 1, session.updater.bot)
+        session.updater.dispatcher.process_update(update)
+        return [x[1].get("text") for x in request.calls[count:]]
+
+    assert dispatch(1, "/start") == ["Home"]
+    first = session.get_session(1)
+    assert dispatch(2, "/start settings-language") == ["Choose language"]
+    assert [x for x in session.sessions if x.chat_id == 1] == [
+        session.get_session(1)
+    ]
+    assert session.get_session(1) is not first
+    assert dispatch(3, "Back") == ["Settings"]
@@ -0,0 +1,106 @@
+import itertools
+from unittest import mock
+
+from apscheduler.schedulers.background import BackgroundScheduler
+import pytz
+from telegram import Chat
+
+from python_telegram_menu import ABCMessage, Handler, PaginatedKeyboard
+from python_telegram_menu.core import emoji_replace
+from python_telegram_menu.replay import StubRequest
+
+PREVIOUS = emoji_replace(PaginatedKeyboard.PREVIOUS_LABEL)
+NEXT = emoji_replace(PaginatedKeyboard.NEXT_LABEL)
+
+
+class FilesMenu(ABCMessage):
+    def __init__(self, handler, source):
+        super().__init__(handler, "files")
+        self.pages = PaginatedKeyboard(source, callback=self.open, page_size=5)
+
+    def open(self, item):
+        return item
+
+    def update(self) -> str:
+        self.keyboard = [[]]
+        self.add_pages(self.pages)
+        return "files"
+
+    def labels(self):
+        return [y.label for x in self.keyboard for y in x]
+
+
+def test_generator_read_lazily():
+    source = (f"file{i}" for i in itertools.count())
+    handler = mock.Mock()
+    menu = FilesMenu(handler, source)
+    menu.update()
+    assert menu.labels() == [f"file{i}" for i in range(5)] + [NEXT]
+    assert len(menu.pages._items_read) == 6
+
+    menu.get_button(NEXT).callback()
+    handler.refresh_menu.assert_called_once()
+    menu.update()
+    assert menu.labels() == [f"file{i}" for i in range(5, 10)] + [
+        PREVIOUS,
+        NEXT,
+    ]
+    assert menu.get_button("file7").args == "file7"
+    assert menu.get_button("file2") is None
+
+
+def test_sequence_last_page():
+    menu = FilesMenu(mock.Mock(), list(range(12)))
+    menu.pages.page = 2
+    menu.update()
+    assert menu.labels() == ["10", "11", PREVIOUS]
+
+    menu.pages.page = 7
+    menu.update()
+    assert menu.labels()[0] == "0"
+
+
+class CachedFilesMenu(FilesMenu):
+    UPDATE_CACHE_TTL = 60.0
+
+    def __init__(self, handler, source):
+        super().__init__(handler, source)
+        self.opened = []
+        self.refreshed = 0
+        self.add_button("Refresh", self.refresh, args="ignored")
+
+    def open(self, item):
+        self.opened.append(item)
+
+    def refresh(self):
+        self.refreshed += 1
+
+    def update(self) -> str:
+        self.keyboard = [[]]
+        self.add_button("Refresh", self.refresh, args="ignored")
+        self.add_pages(self.pages)
+        return f"files page {self.pages.page + 1}"
+
+
+def test_menu_pages_with_cached_content():
+    request = StubRequest()
+    scheduler = BackgroundScheduler(timezone=pytz.utc)
+    chat = Chat(1, Chat.PRIVATE, first_name="Bob")
+    handler = Handler("330:XYZ", chat, scheduler, request=request)
+    menu = CachedFilesMenu(handler, list(range(12)))
+    handler.goto_menu(menu)
+
+    # menu buttons callbacks are called without args
+    handler.select_menu_button("Refresh")
+    assert menu.refreshed == 1
+    handler.select_menu_button("3")
+    assert menu.opened == [3]
+
+    handler.select_menu_button(NEXT)
+    assert request.calls[-1][1]["text"] == "files page 2"
+    assert "7" in request.calls[-1][1]["reply_markup"]
+    handler.select_menu_button("7")
+    assert menu.opened == [3, 7]
+    handler.select_menu_button(PREVIOUS)
+    assert request.calls[-1][1]["text"] == "files page 1"
+    assert len(handler._menu_queue) == 1
@@ -0,0 +1,128 @@
+import datetime
+from unittest import mock
+
+from telegram import CallbackQuery, Chat, Message, Update, User
+from telegram.ext import CallbackQueryHandler, CommandHandler, Filters
+from telegram.ext import MessageHandler, PollAnswerHandler, TypeHandler
+
+from python_telegram_menu import BacklogPolicy, PollingConfig, Session
+from python_telegram_menu.polling import IntakeMeter, UpdateFetcher
+from python_telegram_menu.polling import handled_update_types
+from python_telegram_menu.replay import StubRequest
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+USER = User(1, "user", False)
+
+
+def text_update(update_id, chat_id, age=0):
+    date = NOW - datetime.timedelta(seconds=age)
+    chat = Chat(chat_id, "private")
+    message = Message(update_id, date, chat, text=f"button {update_id}")
+    return Update(update_id, message=message)
+
+
+def press_update(update_id, chat_id):
+    message = Message(update_id, NOW, Chat(chat_id, "private"))
+    query = CallbackQuery(str(update_id), USER, "1", message=message)
+    return Update(update_id, callback_query=query)
+
+
+def make_bot(updates):
+    batches = [updates[i : i + 2] for i in range(0, len(updates), 2)]
+    bot = mock.Mock()
+    bot.get_updates.side_effect = batches + [[]]
+    return bot
+
+
+def test_drop_old_updates():
+    updates = [text_update(1, 10, age=3600), text_update(2, 10, age=5)]
+    kept, offset = BacklogPolicy(max_age=60).drain(make_bot(updates))
+    assert [x.update_id for x in kept] == [2]
+    assert offset == 3
+
+
+def test_coalesce_per_chat():
+    updates = [
+        text_update(1, 10),
+        text_update(2, 20),
+        press_update(3, 10),
+        text_update(4, 30),
+        text_update(5, 20),
+    ]
+    bot = make_bot(updates)
+    kept, offset = BacklogPolicy(coalesce=True).drain(bot)
+    assert [x.update_id for x in kept] == [3, 4, 5]
+    assert offset == 6
+    assert bot.get_updates.call_args.kwargs["offset"] == 6
+
+
+def test_empty_backlog():
+    kept, offset = BacklogPolicy(max_age=60).drain(make_bot([]))
+    assert kept == [] and offset == 0
+
+
+def test_handled_update_types():
+    dispatcher = mock.Mock()
+    dispatcher.handlers = {
+        -1: [TypeHandler(Update, print)],
+        0: [
+            CommandHandler("start", print),
+            MessageHandler(Filters.text, print),
+            CallbackQueryHandler(print),
+            PollAnswerHandler(print),
+        ],
+    }
+    assert handled_update_types(dispatcher) == [
+        "message",
+        "callback_query",
+        "poll_answer",
+    ]
+
+
+def test_fetcher_queues_batches():
+    updater = mock.Mock(running=True)
+    batches = [[text_update(1, 10), text_update(2, 10)], [text_update(3, 20)]]
+
+    def get_updates(**kwargs):
+        if not batches:
+            updater.running = False
+            return []
+        return batches.pop(0)
+
+    updater.bot.get_updates.side_effect = get_updates
+    fetcher = UpdateFetcher(updater, PollingConfig(limit=2, timeout=0))
+    fetcher.allowed_updates = ["message"]
+    fetcher._fetch()
+
+    queued = [x.args[0].update_id for x in updater.update_queue.put.mock_calls]
+    assert queued == [1, 2, 3]
+    assert fetcher.offset == 4
+    assert updater.bot.get_updates.call_args.kwargs["limit"] == 2
+    assert fetcher.meter.report()["updates"] == 3
+
+
+def test_throughput_over_covered_time():
+    meter = IntakeMeter()
+    assert meter.throughput == 0.0
+    with mock.patch("time.monotonic", return_value=100.0):
+        meter.record(10, 0.5)
+    with mock.patch("time.monotonic", return_value=110.0):
+        meter.record(20, 0.5)
+        assert meter.throughput == 30 / 10.5
+    with mock.patch("time.monotonic", return_value=150.0):
+        assert meter.throughput == 30 / 50.5
+    with mock.patch("time.monotonic", return_value=165.0):
+        assert meter.throughput == 20 / IntakeMeter.WINDOW
+
+
+def test_session_timeouts_overridable():
+    class SlowSession(Session):
+        TIMEOUT_READ = 30
+        TIMEOUT_CONNECT = 12
+
+    session = SlowSession("329:XYZ", request=StubRequest())
+    assert session.polling_config.read_timeout == 30
+    assert session.polling_config.connect_timeout == 12
+    config = PollingConfig(read_timeout=7)
+    session = Session("329:XYZ", polling_config=config, request=StubRequest())
+    assert session.polling_config is config
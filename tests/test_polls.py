@@ -0,0 +1,105 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+import pytz
+from telegram import Chat, PollAnswer, Update, User
+
+from python_telegram_menu import Handler, Session
+from python_telegram_menu.cleanup import MessageCleaner
+from python_telegram_menu.polls import OpenPoll, PollRegistry
+from python_telegram_menu.replay import StubRequest
+
+
+class FakeCleaner:
+    def __init__(self):
+        self.deleted = []
+
+    def schedule(self, chat_id, message_id):
+        self.deleted.append((chat_id, message_id))
+
+
+def _poll(poll_id, chat_id, deadline, callback=None, group=None):
+    options = ["a", "b"]
+    message_id = 100 + chat_id
+    return OpenPoll(
+        poll_id, chat_id, message_id, "Q?", options, callback, deadline, group
+    )
+
+
+def test_registry_answers_and_expires():
+    scheduler = BackgroundScheduler(timezone=pytz.utc)
+    cleaner = FakeCleaner()
+    registry = PollRegistry(cleaner, scheduler)
+    assert scheduler.get_job("poll_registry") is not None
+
+    answers = []
+    registry.register(_poll("p1", 1, 10.0, answers.append))
+    registry.register(_poll("p2", 1, 20.0))
+    registry.register(_poll("p3", 2, 5.0))
+    assert len(registry) == 3
+    assert len(registry.chat_polls(1)) == 2
+
+    assert registry.answer("p1", [1])
+    assert not registry.answer("p1", [0])  # already closed
+    assert answers == ["b"]
+    assert cleaner.deleted == [(1, 101)]
+
+    assert registry.close_expired(now=15.0) == 1  # p1 answered, p3 expired
+    assert [x.poll_id for x in registry.chat_polls(1)] == ["p2"]
+    assert registry.close(1) == 1
+    assert len(registry) == 0
+
+
+def test_registry_group_votes():
+    registry = PollRegistry(
+        FakeCleaner(), BackgroundScheduler(timezone=pytz.utc)
+    )
+    for chat_id in range(3):
+        poll = _poll(f"p{chat_id}", chat_id, 10.0, group="survey")
+        registry.register(poll)
+    registry.answer("p0", [0])
+    registry.answer("p1", [0])
+    registry.answer("p2", [1])
+    registry.close_expired(now=20.0)
+    assert registry.results("survey") == {"a": 2, "b": 1}
+    registry.forget("survey")
+    assert registry.results("survey") == {}
+
+    # answers to open polls of a forgotten group are still routed
+    answers = []
+    registry.register(_poll("p3", 3, 30.0, answers.append, group="g"))
+    registry.forget("g")
+    assert registry.answer("p3", [0])
+    assert answers == ["a"]
+    assert registry.results("g") == {}
+
+
+def test_broadcast_poll_routes_answers():
+    request = StubRequest()
+    session = Session("323:XYZ", request=request)
+    assert isinstance(session.polls.cleaner, MessageCleaner)
+    for chat_id in (1, 2):
+        handler = Handler(
+            "323:XYZ",
+            Chat(chat_id, Chat.PRIVATE, first_name="Bob"),
+            session.scheduler,
+            cleaner=session.cleaner,
+            request=request,
+            poll_registry=session.polls,
+        )
+        session.sessions.append(handler)
+
+    session.broadcast_poll("Color?", ["red", "blue"], group="color").wait(5)
+    polls = [session.polls.chat_polls(x)[0].poll_id for x in (1, 2)]
+    assert len(set(polls)) == 2
+
+    # a second poll to the same chat does not replace the first one
+    session.sessions[0].send_poll("Size?", ["S", "L"])
+    assert len(session.polls.chat_polls(1)) == 2
+
+    user = User(1, "Bob", False)
+    for update_id, (poll_id, option) in enumerate(zip(polls, (1, 1))):
+        answer = PollAnswer(poll_id, user, [option])
+        update = Update(update_id + 1, poll_answer=answer)
+        session.updater.dispatcher.process_update(update)
+    assert session.polls.results("color") == {"red": 0, "blue": 2}
+    assert len(session.polls.chat_polls(1)) == 1
+    assert session.polls.cleaner.pending == 2
@@ -0,0 +1,104 @@
+import datetime
+import io
+import json
+
+from telegram import Chat, Message, Update, User
+
+from python_telegram_menu import ABCMessage, ButtonTypes, Handler, Session
+from python_telegram_menu.replay import StubRequest, UpdateRecorder
+from python_telegram_menu.replay import UpdateReplayer, diff_calls
+
+TOKEN = "123:ABC"
+
+
+class StartMenu(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "start")
+        self.add_button("Help", self.help, ButtonTypes.NOTIFICATION)
+
+    def help(self):
+        self.handler.send_message("help text")
+
+    def update(self):
+        return "start"
+
+
+def _session(request):
+    session = Session(TOKEN, request=request)
+    session.start(StartMenu, polling=False, navigation_handler_class=Handler)
+    return session
+
+
+def _text_update(update_id, chat_id, text):
+    user = User(chat_id, "Alice", False, username="alice")
+    message = Message(
+        update_id,
+        datetime.datetime.now(),
+        Chat(chat_id, "private", first_name="Alice"),
+        from_user=user,
+        text=text,
+    )
+    return Update(update_id, message=message)
+
+
+def test_record_and_replay(tmp_path):
+    recording = tmp_path / "updates.jsonl"
+    session = _session(StubRequest())
+    recorder = UpdateRecorder(recording, anonymize=True)
+    recorder.attach(session)
+    dispatcher = session.updater.dispatcher
+    dispatcher.process_update(_text_update(1, 555, "/start"))
+    dispatcher.process_update(_text_update(2, 555, "Help"))
+    recorder.close()
+    session.scheduler.shutdown(wait=False)
+
+    lines = [json.loads(x) for x in recording.read_text().splitlines()]
+    assert len(lines) == 2
+    chat = lines[0]["update"]["message"]["chat"]
+    assert chat["id"] == 1 and chat["first_name"] == "user1"
+    assert "alice" not in recording.read_text()
+
+    first = _session(StubRequest())
+    report = UpdateReplayer(first, recording, speed=None).run()
+    first.scheduler.shutdown(wait=False)
+    assert report.percentiles()["count"] == 2
+    methods = [x[0] for x in report.calls]
+    assert methods.count("sendMessage") == 2
+    assert report.calls[-1][1]["text"] == "help text"
+
+    second = _session(StubRequest())
+    again = UpdateReplayer(second, recording, speed=None).run()
+    second.scheduler.shutdown(wait=False)
+    assert not diff_calls(report.calls, again.calls)
+    assert diff_calls(report.calls, again.calls[:-1])
+
+
+def test_recorder_writes_file_object():
+    output = io.StringIO()
+    recorder = UpdateRecorder(output)
+    recorder.record(_text_update(7, 42, "hi"))
+    entry = json.loads(output.getvalue())
+    assert entry["at"] == 0
+    assert entry["update"]["message"]["chat"]["id"] == 42
+
+
+def test_forwarded_senders_anonymized():
+    output = io.StringIO()
+    recorder = UpdateRecorder(output, anonymize=True)
+    update = _text_update(3, 555, "hello")
+    update.message.forward_from = User(
+        98765, "Carol", False, last_name="Smith", username="carol"
+    )
+    update.message.forward_from_chat = Chat(
+        -100777, Chat.CHANNEL, title="Secret channel"
+    )
+    update.message.sender_chat = Chat(-100888, Chat.SUPERGROUP, title="Team")
+    recorder.record(update)
+
+    text = output.getvalue()
+    for secret in ("98765", "100777", "100888", "Carol", "Smith", "Secret"):
+        assert secret not in text
+    message = json.loads(text)["update"]["message"]
+    assert message["forward_from"]["first_name"].startswith("user")
+    assert message["forward_from_chat"]["id"] < 0
+    assert message["text"] == "hello"
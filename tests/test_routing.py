@@ -0,0 +1,92 @@
+from unittest import mock
+
+from python_telegram_menu import ABCMessage, Button
+from python_telegram_menu.routing import CallbackRouter
+
+
+def test_tokens_stable_and_compact():
+    router = CallbackRouter()
+    message = mock.Mock()
+    label = ":chart_with_upwards_trend:.v2 " * 4
+    first = router.register(message, Button(label))
+    second = router.register(message, Button("other.label"))
+
+    assert first != second
+    assert len(first.encode()) <= 64
+    assert router.register(message, Button(label)) == first
+    assert len(router) == 2
+
+
+def test_resolve_latest_button():
+    router = CallbackRouter()
+    message = mock.Mock()
+    router.register(message, Button("play"))
+    button = Button("play")
+    token = router.register(message, button)
+
+    assert router.resolve(token) == (message, button)
+    assert router.resolve("not a token") is None
+    assert router.resolve("zz") is None
+
+
+def test_forget_message():
+    router = CallbackRouter()
+    kept, removed = mock.Mock(), mock.Mock()
+    kept_token = router.register(kept, Button("a"))
+    removed_token = router.register(removed, Button("a"))
+
+    router.forget(removed)
+    assert router.resolve(removed_token) is None
+    assert router.resolve(kept_token) is not None
+    assert len(router) == 1
+
+
+def test_tokens_of_other_routers_rejected():
+    previous, current = CallbackRouter(), CallbackRouter()
+    message = mock.Mock()
+    stale = previous.register(message, Button("delete"))
+    current.register(message, Button("keep"))
+
+    assert current.nonce != previous.nonce
+    assert current.resolve(stale) is None
+    assert previous.resolve(stale) is not None
+
+
+def test_same_label_buttons_routed_apart():
+    router = CallbackRouter()
+    message = mock.Mock()
+    first, second = Button("Buy"), Button("Buy")
+    first_token = router.register(message, first)
+    second_token = router.register(message, second, rank=1)
+
+    assert first_token != second_token
+    assert router.resolve(first_token) == (message, first)
+    assert router.resolve(second_token) == (message, second)
+    router.forget(message)
+    assert len(router) == 0 and not router._ids
+
+
+class ShopMessage(ABCMessage):
+    def __init__(self, handler):
+        super().__init__(handler, "shop", inlined=True)
+        self.add_button("Buy", self.buy_apple, args="apple")
+        self.add_button("Buy", self.buy_pear, args="pear")
+
+    def buy_apple(self, item):
+        return item
+
+    def buy_pear(self, item):
+        return item
+
+    def update(self):
+        return "shop"
+
+
+def test_inline_keyboard_same_labels():
+    handler = mock.Mock(callback_router=CallbackRouter())
+    handler.translate.side_effect = lambda x: x
+    message = ShopMessage(handler)
+    markup = message.gen_keyboard_content()
+    tokens = [x.callback_data for x in markup.inline_keyboard[0]]
+    buttons = [handler.callback_router.resolve(x)[1] for x in tokens]
+    assert [x.args for x in buttons] == ["apple", "pear"]
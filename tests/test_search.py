@@ -0,0 +1,53 @@
+from telegram import InlineQuery, Update, User
+
+from python_telegram_menu.benchmark import Workload
+from python_telegram_menu.search import SearchIndex, words
+
+
+def test_words_normalized():
+    assert words("<b>Hello</b>, World! :star:") == ["hello", "world", "star"]
+
+
+def test_prefix_and_typo_match():
+    index = SearchIndex()
+    index.add("settings", "Settings", "Language and notifications")
+    index.add("stats", "Statistics", "Daily settings report")
+    index.add("help", "Help")
+
+    assert index.search("sett") == ["settings", "stats"]
+    assert index.search("notif") == ["settings"]
+    assert index.search("statistcs") == ["stats"]
+    assert index.search("weather") == []
+
+
+def test_inline_query_answered_from_menus():
+    session = Workload(chats=0, keyboard_size=3).session()
+    session.scheduler.shutdown(wait=False)
+    session.enable_inline_queries(cache_time=60)
+
+    graph = session.menu_graph()
+    assert graph is session.menu_graph()
+    assert graph.get(("Item 1",)).content == "Item 1"
+    assert graph.get(("Item 1", "Details")).inlined
+
+    update_ids = iter(range(1, 100))
+
+    def query(text):
+        user = User(7, "user", False)
+        inline_query = InlineQuery(
+            "q1", user, text, "", bot=session.updater.bot
+        )
+        update = Update(next(update_ids), inline_query=inline_query)
+        session.updater.dispatcher.process_update(update)
+        method, data = session.request.calls[-1]
+        assert method == "answerInlineQuery"
+        assert data["cache_time"] == 60
+        return data["results"]
+
+    results = query("item 2")
+    assert results[0]["title"] == "Item 2"
+    assert results[0]["input_message_content"]["message_text"] == "Item 2"
+    assert len(query("")) == 6  # 3 items and their details messages
+
+    query("item 2")
+    assert session.inline_results_cache.hits == 1